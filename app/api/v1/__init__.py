@@ -14,6 +14,7 @@ from .vaccinations import router as vaccinations_router
 from .appointments import router as appointments_router
 from .services import router as services_router
 from .products import router as products_router
+from .reference_data import router as reference_data_router
 
 
 api_router = APIRouter()
@@ -32,4 +33,5 @@ api_router.include_router(allergies_router, prefix="/allergies", tags=["allergie
 api_router.include_router(vaccinations_router, prefix="/vaccinations", tags=["vaccinations"])
 api_router.include_router(appointments_router, prefix="/appointments", tags=["appointments"])
 api_router.include_router(services_router, prefix="/services", tags=["services"])
-api_router.include_router(products_router, prefix="/products", tags=["products"]) 
\ No newline at end of file
+api_router.include_router(products_router, prefix="/products", tags=["products"])
+api_router.include_router(reference_data_router, prefix="/reference-data", tags=["reference-data"]) 
\ No newline at end of file
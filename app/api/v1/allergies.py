@@ -1,3 +1,4 @@
+import logging
 from fastapi import APIRouter, HTTPException, status, Depends, Query
 from typing import List, Optional
 from bson import ObjectId
@@ -7,17 +8,24 @@ from app.db.database import database, COLLECTIONS
 from app.crud.allergy_type import allergy_type_crud
 from app.schemas.allergy_type import AllergyTypeDB, AllergyTypeCreate, AllergyTypeUpdate, AllergyTypeResponse
 from app.schemas.base import APIResponse
+from app.services.fields import FieldSet, InvalidFields
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 @router.get("/", response_model=APIResponse)
 async def get_allergies(
     status: Optional[str] = Query("active"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,name"),
     current_user=Depends(get_current_active_user)
 ):
     """Get all allergies with filtering"""
+    try:
+        field_set = FieldSet(fields, AllergyTypeResponse)
+    except InvalidFields as e:
+        raise HTTPException(status_code=400, detail=str(e))
     try:
         collection = database.get_collection(COLLECTIONS["allergies"])
         
@@ -29,12 +37,14 @@ async def get_allergies(
             elif status == "inactive":
                 filters["status"] = False
         
-        print(f"🔍 Fetching allergies with filters: {filters}")
+        logger.debug("🔍 Fetching allergies with filters: %s", filters)
         
         # Get allergies with pagination
-        allergies = await allergy_type_crud.get_multi(collection, skip=skip, limit=limit, filters=filters)
+        allergies = await allergy_type_crud.get_multi(collection, skip=skip, limit=limit, filters=filters, fields=field_set.names)
+        if field_set.is_sparse:
+            return APIResponse(success=True, message=f"Retrieved {len(allergies)} allergies", data=[field_set.row(item.model_dump()) for item in allergies])
         
-        print(f"📊 Found {len(allergies)} allergies")
+        logger.debug("📊 Found %s allergies", len(allergies))
         
         # Simple response without complex schema validation
         allergy_response = []
@@ -49,7 +59,7 @@ async def get_allergies(
                     "status": allergy.status
                 })
             except Exception as e:
-                print(f"⚠️ Error processing allergy {allergy.id}: {e}")
+                logger.warning("⚠️ Error processing allergy %s: %s", allergy.id, e)
                 continue
         
         return APIResponse(
@@ -59,7 +69,7 @@ async def get_allergies(
         )
         
     except Exception as e:
-        print(f"❌ Error in get_allergies: {e}")
+        logger.error("❌ Error in get_allergies: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to retrieve allergies: {str(e)}"
@@ -92,7 +102,7 @@ async def create_allergy(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error in create_allergy: {e}")
+        logger.error("❌ Error in create_allergy: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to create allergy: {str(e)}"
@@ -123,7 +133,7 @@ async def get_allergy(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error in get_allergy: {e}")
+        logger.error("❌ Error in get_allergy: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to retrieve allergy: {str(e)}"
@@ -164,7 +174,7 @@ async def update_allergy(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error in update_allergy: {e}")
+        logger.error("❌ Error in update_allergy: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to update allergy: {str(e)}"
@@ -197,7 +207,7 @@ async def toggle_allergy_status(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error in toggle_allergy_status: {e}")
+        logger.error("❌ Error in toggle_allergy_status: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to toggle allergy status: {str(e)}"
@@ -217,14 +227,14 @@ async def delete_allergy(
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Allergy not found")
         
         # Soft delete by setting status to False
-        await allergy_type_crud.update(collection, allergy_id, {"status": False})
+        await allergy_type_crud.update(collection, allergy_id, {"status": False}, changed_only=True)
         
         return APIResponse(success=True, message="Allergy deleted successfully")
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error in delete_allergy: {e}")
+        logger.error("❌ Error in delete_allergy: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to delete allergy: {str(e)}"
@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Path
+import logging
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Path, Request
 from typing import List, Optional
 from datetime import datetime
 from app.core.deps import get_current_active_user
@@ -10,13 +11,25 @@ from app.schemas.base import APIResponse
 from app.schemas.client import ClientResponse
 from app.schemas.pet import PetResponse
 from app.schemas.service import ServiceResponse
+from app.services.catalog_cache import catalog_cache
+from app.services.relation_loader import RelationLoader, collect_ids
+from app.services.pagination import InvalidCursor, InvalidSort, PageRequest
+from app.services.relations import InvalidJoinMode, relation_fields, resolve_join_mode, run_list_query
+from app.services.fields import FieldSet, InvalidFields
+from app.services.bulk_import import NDJSON_REQUEST_BODY, BulkImportSpec, run_bulk_import
+from app.services.exports import export_response
+from app.services.rollups import record_appointment_change, record_appointments_created
 from bson import ObjectId
-import traceback
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Fields `sort_by` and list cursors may use
+APPOINTMENT_SORT_FIELDS = ("appointment_date", "created_at", "updated_at", "_id")
 
 @router.get("/", response_model=APIResponse)
 async def get_appointments(
+    request: Request,
     appointment_status: Optional[str] = Query(None),
     appointment_date_from: Optional[str] = Query(None),
     appointment_date_to: Optional[str] = Query(None),
@@ -30,14 +43,17 @@ async def get_appointments(
     limit: int = Query(100, ge=1, le=1000),
     page: int = Query(1, ge=1),
     per_page: int = Query(15, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Continue after this cursor (from links.next) instead of using page"),
     include: Optional[str] = Query(None),
     sort_by: Optional[str] = Query("appointment_date"),
     sort_order: Optional[str] = Query("asc"),
+    join_mode: Optional[str] = Query(None, description="Relation join strategy: 'loader' or 'lookup'"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,appointment_date"),
     current_user: UserDB = Depends(get_current_active_user)
 ):
     try:
-        print(f"📥 Incoming query parameters for get_appointments: {locals()}")
-        collection = database.get_collection(COLLECTIONS["appointments"])
+        logger.debug("📥 Incoming query parameters for get_appointments: %s", locals())
+        collection = database.get_collection(COLLECTIONS["appointments"], read="list")
         filters = {"status": True}
         
         if appointment_status:
@@ -67,62 +83,66 @@ async def get_appointments(
             start_date = datetime.fromisoformat(appointment_date_from.replace('Z', '+00:00'))
             end_date = datetime.fromisoformat(appointment_date_to.replace('Z', '+00:00'))
             filters["appointment_date"] = {"$gte": start_date, "$lte": end_date}
-            print(f"🔍 Date filter: {appointment_date_from} to {appointment_date_to}")
-            print(f"🔍 Converted dates: {start_date} to {end_date}")
-        
-        print(f"🔎 Filters for get_appointments: {filters}")
-        
-        # Debug: Check total appointments in database
-        total_all_appointments = await collection.count_documents({})
-        print(f"🔍 Total appointments in database (no filters): {total_all_appointments}")
-        
-        # Debug: Show a few appointments without filters
-        sample_appointments = await collection.find({}).limit(3).to_list(length=None)
-        print(f"🔍 Sample appointments in database:")
-        for i, appt in enumerate(sample_appointments):
-            print(f"  - {i+1}: {appt.get('appointment_date')} - {appt.get('appointment_status')} - {appt.get('client_id')}")
-        
-        # Calculate skip from page and per_page
-        skip = (page - 1) * per_page
-        limit = per_page
-        
-        # Get total count for pagination
-        total_count = await collection.count_documents(filters)
-        print(f"🔍 Total appointments found with filters: {total_count}")
-        
-        # Get appointments with pagination
-        cursor = collection.find(filters)
-        
-        # Apply sorting
-        sort_direction = 1 if sort_order == "asc" else -1
-        cursor = cursor.sort(sort_by, sort_direction)
-        
-        # Apply pagination
-        cursor = cursor.skip(skip).limit(limit)
-        
-        appointments = await cursor.to_list(length=None)
-        print(f"🔎 Raw appointments from DB: {len(appointments)} appointments")
-        
-        # Debug: Show first few appointments
-        for i, appt in enumerate(appointments[:3]):
-            print(f"🔍 Appointment {i+1}: {appt.get('appointment_date')} - {appt.get('appointment_status')}")
-        
-        # Prepare related collections
-        clients_collection = database.get_collection(COLLECTIONS["clients"])
-        pets_collection = database.get_collection(COLLECTIONS["pets"])
-        users_collection = database.get_collection(COLLECTIONS["users"])
-        services_collection = database.get_collection(COLLECTIONS["services"])
+            logger.debug("🔍 Date filter: %s to %s", appointment_date_from, appointment_date_to)
+            logger.debug("🔍 Converted dates: %s to %s", start_date, end_date)
+        
+        logger.debug("🔎 Filters for get_appointments: %s", filters)
+        
+        # Page number or keyset cursor
+        try:
+            paging = PageRequest(page, per_page, sort_by, 1 if sort_order == "asc" else -1, cursor, APPOINTMENT_SORT_FIELDS)
+        except (InvalidCursor, InvalidSort) as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        try:
+            join_mode = resolve_join_mode(join_mode)
+        except InvalidJoinMode as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        query_filters = paging.apply(filters)
+        
+        include_fields = include.split(',') if include else []
+        loader = RelationLoader(read="list")
+        
+        # Sparse fieldset: fetch only what is returned, plus sort keys and joined references
+        try:
+            field_set = FieldSet(fields, APPOINTMENT_EXPORT_COLUMNS, include_fields)
+        except InvalidFields as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        projection = field_set.projection(*(key for key, _ in paging.sort), *relation_fields("appointments", include_fields))
+        
+        total_count = None
+        if join_mode == "lookup":
+            # Page and relations in one aggregation; the total (page mode only) is counted alongside
+            appointments, total_count = await run_list_query(
+                collection, "appointments", query_filters, paging.sort,
+                paging.skip, paging.limit, include_fields, loader, projection,
+                count=not paging.is_cursor
+            )
+        else:
+            # Get total count for pagination
+            if not paging.is_cursor:
+                total_count = await collection.count_documents(filters)
+                logger.debug("🔍 Total appointments found with filters: %s", total_count)
+            
+            # Get appointments with pagination
+            appointments = await collection.find(query_filters, projection).sort(paging.sort).skip(paging.skip).limit(paging.limit).to_list(length=None)
+        appointments, next_cursor = paging.split(appointments)
+        logger.debug("🔎 Raw appointments from DB: %s appointments", len(appointments))
+        
+        # Batch-load related documents for the whole page
+        if 'client' in include_fields:
+            await loader.load_many("clients", collect_ids(appointments, "client_id"))
+        if 'pet' in include_fields:
+            pet_docs = await loader.load_many("pets", collect_ids(appointments, "pet_id"))
+            await loader.load_many("species", collect_ids(list(pet_docs.values()), "species_id"))
+        if 'user' in include_fields:
+            await loader.load_many("users", collect_ids(appointments, "veterinarian_id"))
+        if 'service' in include_fields:
+            await loader.load_many("services", collect_ids(appointments, "service_id"))
         
         appointments_response = []
         for appt in appointments:
-            print(f"🔎 appt type: {type(appt)} value: {repr(appt)}")
-            if hasattr(appt, 'model_dump'):
-                data = appt.model_dump()
-                print(f"🔎 data after model_dump: {data}")
-            else:
-                data = dict(appt)
-                print(f"🔎 data after dict: {data}")
-                data['id'] = str(data['_id'])
+            data = dict(appt)
+            data['id'] = str(data['_id'])
             
             # Convert ObjectId fields to str
             for key in ["client_id", "pet_id", "veterinarian_id", "service_id", "id"]:
@@ -132,124 +152,108 @@ async def get_appointments(
             if '_id' in data and isinstance(data['_id'], ObjectId):
                 data['_id'] = str(data['_id'])
             # Populate related fields if include parameter is provided
-            if include:
-                include_fields = include.split(',')
-                
-                if 'client' in include_fields and data.get('client_id'):
-                    client_doc = await clients_collection.find_one({'_id': ObjectId(data['client_id'])})
-                    print(f"🔎 related client_doc: {repr(client_doc)}")
-                    if client_doc:
-                        client_doc['id'] = str(client_doc['_id'])
-                        # Convert all ObjectId fields in client_doc to str
-                        for key in client_doc:
-                            if isinstance(client_doc[key], ObjectId):
-                                client_doc[key] = str(client_doc[key])
-                        if '_id' in client_doc and isinstance(client_doc['_id'], ObjectId):
-                            client_doc['_id'] = str(client_doc['_id'])
-                        data['client'] = {
-                            'id': client_doc['id'],
-                            'name': client_doc.get('name'),
-                            'email': client_doc.get('email'),
-                            'phone': client_doc.get('phone_number'),
-                            'other_contact_info': client_doc.get('other_contact_info'),
-                        }
-                
-                if 'pet' in include_fields and data.get('pet_id'):
-                    pet_doc = await pets_collection.find_one({'_id': ObjectId(data['pet_id'])})
-                    print(f"🔎 related pet_doc: {repr(pet_doc)}")
-                    if pet_doc:
-                        # Convert all ObjectId fields in pet_doc to str
-                        for key in pet_doc:
-                            if isinstance(pet_doc[key], ObjectId):
-                                pet_doc[key] = str(pet_doc[key])
-                        if '_id' in pet_doc and isinstance(pet_doc['_id'], ObjectId):
-                            pet_doc['_id'] = str(pet_doc['_id'])
-                        # Get species info
-                        species_info = None
-                        if pet_doc.get('species_id'):
-                            species_collection = database.get_collection(COLLECTIONS["species"])
-                            species_doc = await species_collection.find_one({'_id': ObjectId(pet_doc['species_id'])})
-                            print(f"🔎 related species_doc: {repr(species_doc)}")
-                            if species_doc:
-                                if '_id' in species_doc and isinstance(species_doc['_id'], ObjectId):
-                                    species_doc['_id'] = str(species_doc['_id'])
-                                species_info = {
-                                    'id': str(species_doc['_id']),
-                                    'name': species_doc.get('name')
-                                }
-                        
-                        data['pet'] = {
-                            'id': str(pet_doc['_id']),
-                            'name': pet_doc.get('name'),
-                            'species': species_info,
-                            'breed_id': str(pet_doc.get('breed_id')) if pet_doc.get('breed_id') else None,
-                        }
-                
-                if 'user' in include_fields and data.get('veterinarian_id'):
-                    vet_doc = await users_collection.find_one({'_id': ObjectId(data['veterinarian_id'])})
-                    print(f"🔎 related vet_doc: {repr(vet_doc)}")
-                    if vet_doc:
-                        # Convert all ObjectId fields in vet_doc to str
-                        for key in vet_doc:
-                            if isinstance(vet_doc[key], ObjectId):
-                                vet_doc[key] = str(vet_doc[key])
-                        if '_id' in vet_doc and isinstance(vet_doc['_id'], ObjectId):
-                            vet_doc['_id'] = str(vet_doc['_id'])
-                        data['user'] = {
-                            'id': str(vet_doc['_id']),
-                            'name': f"{vet_doc.get('first_name', '')} {vet_doc.get('last_name', '')}".strip(),
-                            'email': vet_doc.get('email'),
-                            'role': vet_doc.get('role'),
-                        }
-                
-                if 'service' in include_fields and data.get('service_id'):
-                    service_doc = await services_collection.find_one({'_id': ObjectId(data['service_id'])})
-                    print(f"🔎 related service_doc: {repr(service_doc)}")
-                    if service_doc:
-                        # Convert all ObjectId fields in service_doc to str
-                        for key in service_doc:
-                            if isinstance(service_doc[key], ObjectId):
-                                service_doc[key] = str(service_doc[key])
-                        if '_id' in service_doc and isinstance(service_doc['_id'], ObjectId):
-                            service_doc['_id'] = str(service_doc['_id'])
-                        data['service'] = {
-                            'id': str(service_doc['_id']),
-                            'name': service_doc.get('name'),
-                            'description': service_doc.get('description'),
-                            'price': service_doc.get('price'),
+            if 'client' in include_fields and data.get('client_id'):
+                client_doc = loader.get("clients", data['client_id'])
+                if client_doc:
+                    data['client'] = {
+                        'id': str(client_doc['_id']),
+                        'name': client_doc.get('name'),
+                        'email': client_doc.get('email'),
+                        'phone': client_doc.get('phone_number'),
+                        'other_contact_info': client_doc.get('other_contact_info'),
+                    }
+            
+            if 'pet' in include_fields and data.get('pet_id'):
+                pet_doc = loader.get("pets", data['pet_id'])
+                if pet_doc:
+                    species_info = None
+                    species_doc = loader.get("species", pet_doc.get('species_id'))
+                    if species_doc:
+                        species_info = {
+                            'id': str(species_doc['_id']),
+                            'name': species_doc.get('name')
                         }
+                    data['pet'] = {
+                        'id': str(pet_doc['_id']),
+                        'name': pet_doc.get('name'),
+                        'species': species_info,
+                        'breed_id': str(pet_doc.get('breed_id')) if pet_doc.get('breed_id') else None,
+                    }
             
-            appointments_response.append(data)
-        
-        # Calculate pagination metadata
-        last_page = (total_count + per_page - 1) // per_page
-        from_item = skip + 1
-        to_item = min(skip + len(appointments_response), total_count)
+            if 'user' in include_fields and data.get('veterinarian_id'):
+                vet_doc = loader.get("users", data['veterinarian_id'])
+                if vet_doc:
+                    data['user'] = {
+                        'id': str(vet_doc['_id']),
+                        'name': f"{vet_doc.get('first_name', '')} {vet_doc.get('last_name', '')}".strip(),
+                        'email': vet_doc.get('email'),
+                        'role': vet_doc.get('role'),
+                    }
+            
+            if 'service' in include_fields and data.get('service_id'):
+                service_doc = loader.get("services", data['service_id'])
+                if service_doc:
+                    data['service'] = {
+                        'id': str(service_doc['_id']),
+                        'name': service_doc.get('name'),
+                        'description': service_doc.get('description'),
+                        'price': service_doc.get('price'),
+                    }
+            
+            appointments_response.append(field_set.row(data) if field_set.is_sparse else data)
         
         # Build paginated response
         paginated_response = {
             "data": appointments_response,
-            "meta": {
-                "current_page": page,
-                "from": from_item,
-                "last_page": last_page,
-                "per_page": per_page,
-                "to": to_item,
-                "total": total_count
-            },
-            "links": {
-                "first": f"/api/v1/appointments?page=1&per_page={per_page}",
-                "last": f"/api/v1/appointments?page={last_page}&per_page={per_page}",
-                "prev": f"/api/v1/appointments?page={page-1}&per_page={per_page}" if page > 1 else None,
-                "next": f"/api/v1/appointments?page={page+1}&per_page={per_page}" if page < last_page else None
-            }
+            "meta": paging.meta(total_count, len(appointments_response), next_cursor),
+            "links": paging.links("/api/v1/appointments", total_count, next_cursor, request.query_params)
         }
         
         return APIResponse(success=True, message="Appointments retrieved successfully", data=paginated_response)
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"❌ Error in get_appointments: {e}\n{traceback.format_exc()}")
+        logger.exception("❌ Error in get_appointments: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to get appointments: {str(e)}")
 
+APPOINTMENT_EXPORT_COLUMNS = [
+    "id", "appointment_date", "duration_minutes", "appointment_status",
+    "client_id", "pet_id", "veterinarian_id", "service_id",
+    "notes", "diagnosis", "treatment", "follow_up_date",
+    "status", "created_at", "updated_at",
+]
+
+@router.get("/export")
+async def export_appointments(
+    format: str = Query("csv", pattern="^(ndjson|csv)$", description="Export format: 'csv' or 'ndjson'"),
+    date_from: Optional[datetime] = Query(None, description="Appointment date from (inclusive)"),
+    date_to: Optional[datetime] = Query(None, description="Appointment date to (exclusive)"),
+    appointment_status: Optional[str] = Query(None),
+    veterinarian_id: Optional[str] = Query(None),
+    include_inactive: Optional[bool] = Query(False),
+    gzip: bool = Query(False, description="Gzip the download"),
+    current_user: UserDB = Depends(get_current_active_user)
+):
+    """Stream appointments in date order as a CSV or NDJSON download."""
+    filters = {} if include_inactive else {"status": True}
+    if appointment_status:
+        filters["appointment_status"] = appointment_status
+    if veterinarian_id:
+        if not ObjectId.is_valid(veterinarian_id):
+            raise HTTPException(status_code=400, detail="Invalid veterinarian_id")
+        filters["veterinarian_id"] = ObjectId(veterinarian_id)
+    if date_from or date_to:
+        filters["appointment_date"] = {}
+        if date_from:
+            filters["appointment_date"]["$gte"] = date_from
+        if date_to:
+            filters["appointment_date"]["$lt"] = date_to
+    
+    collection = database.get_collection(COLLECTIONS["appointments"], read="export")
+    projection = {column: 1 for column in APPOINTMENT_EXPORT_COLUMNS if column != "id"}
+    cursor = collection.find(filters, projection).sort([("appointment_date", 1), ("_id", 1)])
+    return export_response(cursor, APPOINTMENT_EXPORT_COLUMNS, format, "appointments", compress=gzip)
+
 @router.get("/{appointment_id}", response_model=APIResponse)
 async def get_appointment(
     appointment_id: str = Path(..., description="Appointment ID"),
@@ -268,17 +272,17 @@ async def get_appointment(
         
         if hasattr(appointment_doc, 'model_dump'):
             data = appointment_doc.model_dump()
-            print(f"🔎 data after model_dump: {data}")
+            logger.debug("🔎 data after model_dump: %s", data)
         else:
             data = dict(appointment_doc)
-            print(f"🔎 data after dict: {data}")
+            logger.debug("🔎 data after dict: %s", data)
         data['id'] = str(data['_id'])
         
         # Convert ObjectIds to strings
         for key in ["client_id", "pet_id", "veterinarian_id", "service_id", "id"]:
             if key in data and isinstance(data[key], ObjectId):
                 data[key] = str(data[key])
-        print(f"🔎 data after ObjectId-to-str: {data}")
+        logger.debug("🔎 data after ObjectId-to-str: %s", data)
         
         # Populate related fields if include parameter is provided
         if include:
@@ -286,7 +290,6 @@ async def get_appointment(
             clients_collection = database.get_collection(COLLECTIONS["clients"])
             pets_collection = database.get_collection(COLLECTIONS["pets"])
             users_collection = database.get_collection(COLLECTIONS["users"])
-            services_collection = database.get_collection(COLLECTIONS["services"])
             
             if 'client' in include_fields and data.get('client_id'):
                 client_doc = await clients_collection.find_one({'_id': ObjectId(data['client_id'])})
@@ -318,11 +321,8 @@ async def get_appointment(
                     # Get species info
                     species_info = None
                     if pet_doc.get('species_id'):
-                        species_collection = database.get_collection(COLLECTIONS["species"])
-                        species_doc = await species_collection.find_one({'_id': ObjectId(pet_doc['species_id'])})
+                        species_doc = await catalog_cache.get("species", pet_doc['species_id'])
                         if species_doc:
-                            if '_id' in species_doc and isinstance(species_doc['_id'], ObjectId):
-                                species_doc['_id'] = str(species_doc['_id'])
                             species_info = {
                                 'id': str(species_doc['_id']),
                                 'name': species_doc.get('name')
@@ -352,14 +352,8 @@ async def get_appointment(
                     }
             
             if 'service' in include_fields and data.get('service_id'):
-                service_doc = await services_collection.find_one({'_id': ObjectId(data['service_id'])})
+                service_doc = await catalog_cache.get("services", data['service_id'])
                 if service_doc:
-                    # Convert all ObjectId fields in service_doc to str
-                    for key in service_doc:
-                        if isinstance(service_doc[key], ObjectId):
-                            service_doc[key] = str(service_doc[key])
-                    if '_id' in service_doc and isinstance(service_doc['_id'], ObjectId):
-                        service_doc['_id'] = str(service_doc['_id'])
                     data['service'] = {
                         'id': str(service_doc['_id']),
                         'name': service_doc.get('name'),
@@ -372,7 +366,7 @@ async def get_appointment(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error in get_appointment: {e}\n{traceback.format_exc()}")
+        logger.exception("❌ Error in get_appointment: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to get appointment: {str(e)}")
 
 @router.post("/", response_model=APIResponse)
@@ -381,14 +375,13 @@ async def create_appointment(
     current_user: UserDB = Depends(get_current_active_user)
 ):
     try:
-        print("📥 Incoming appointment data:", appointment_data)
+        logger.debug("📥 Incoming appointment data: %s", appointment_data)
         collection = database.get_collection(COLLECTIONS["appointments"])
         
         # Validate that all referenced entities exist
         clients_collection = database.get_collection(COLLECTIONS["clients"])
         pets_collection = database.get_collection(COLLECTIONS["pets"])
         users_collection = database.get_collection(COLLECTIONS["users"])
-        services_collection = database.get_collection(COLLECTIONS["services"])
         
         # Check if client exists
         if not await clients_collection.find_one({"_id": ObjectId(appointment_data.client_id), "status": True}):
@@ -403,11 +396,12 @@ async def create_appointment(
             raise HTTPException(status_code=400, detail="Veterinarian not found")
         
         # Check if service exists
-        if not await services_collection.find_one({"_id": ObjectId(appointment_data.service_id), "status": True}):
+        service = await catalog_cache.get("services", appointment_data.service_id)
+        if not service or not service.get("status"):
             raise HTTPException(status_code=400, detail="Service not found")
         
         appointment_doc = appointment_data.model_dump() if hasattr(appointment_data, 'model_dump') else dict(appointment_data)
-        print(f"🔎 appointment_doc after model_dump/dict: {appointment_doc}")
+        logger.debug("🔎 appointment_doc after model_dump/dict: %s", appointment_doc)
         appointment_doc["status"] = True
         from datetime import datetime
         now = datetime.utcnow()
@@ -418,10 +412,11 @@ async def create_appointment(
         appointment_doc["pet_id"] = ObjectId(appointment_data.pet_id)
         appointment_doc["veterinarian_id"] = ObjectId(appointment_data.veterinarian_id)
         appointment_doc["service_id"] = ObjectId(appointment_data.service_id)
-        print("📄 Appointment doc to insert:", appointment_doc)
+        logger.debug("📄 Appointment doc to insert: %s", appointment_doc)
         
         result = await collection.insert_one(appointment_doc)
         appointment_doc["_id"] = result.inserted_id
+        await record_appointment_change(None, appointment_doc)
         appointment_doc["id"] = str(result.inserted_id)
         for key in ["client_id", "pet_id", "veterinarian_id", "service_id"]:
             if key in appointment_doc and isinstance(appointment_doc[key], ObjectId):
@@ -429,15 +424,39 @@ async def create_appointment(
         # Convert or remove _id
         if '_id' in appointment_doc and isinstance(appointment_doc['_id'], ObjectId):
             appointment_doc['_id'] = str(appointment_doc['_id'])
-        print(f"🔎 appointment_doc after ObjectId-to-str: {appointment_doc}")
+        logger.debug("🔎 appointment_doc after ObjectId-to-str: %s", appointment_doc)
         return APIResponse(success=True, message="Appointment created successfully", data=appointment_doc)
     except HTTPException:
         raise
     except Exception as e:
-        import traceback
-        print(f"❌ Exception: {e}\n{traceback.format_exc()}")
+        logger.exception("❌ Exception: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to create appointment: {str(e)}")
 
+# Same reference checks as create_appointment, one $in query per field and batch
+appointment_import = BulkImportSpec(
+    "appointments", AppointmentCreate, appointment_crud,
+    references={
+        "client_id": "clients",
+        "pet_id": "pets",
+        "veterinarian_id": "users",
+        "service_id": "services",
+    },
+    on_created=lambda appointments: record_appointments_created(appointments)
+)
+
+@router.post("/bulk", response_model=APIResponse, openapi_extra=NDJSON_REQUEST_BODY)
+async def bulk_create_appointments(
+    request: Request,
+    current_user: UserDB = Depends(get_current_active_user)
+):
+    """Create appointments from an NDJSON body, one AppointmentCreate object per line."""
+    result = await run_bulk_import(appointment_import, request.stream())
+    return APIResponse(
+        success=result.failed == 0,
+        message=f"Imported {len(result.created)} of {result.received} appointments",
+        data=result.to_dict()
+    )
+
 @router.put("/{appointment_id}", response_model=APIResponse)
 async def update_appointment(
     appointment_data: AppointmentUpdate,
@@ -468,13 +487,13 @@ async def update_appointment(
         
         # Get updated appointment with related data
         updated_appointment = await collection.find_one({"_id": ObjectId(appointment_id)})
+        await record_appointment_change(existing_appointment, updated_appointment)
         updated_appointment["id"] = str(updated_appointment["_id"])
         
         # Include related data like in the get_appointments endpoint
         clients_collection = database.get_collection(COLLECTIONS["clients"])
         pets_collection = database.get_collection(COLLECTIONS["pets"])
         users_collection = database.get_collection(COLLECTIONS["users"])
-        services_collection = database.get_collection(COLLECTIONS["services"])
         
         # Add client data
         if "client_id" in updated_appointment:
@@ -492,10 +511,9 @@ async def update_appointment(
             pet = await pets_collection.find_one({"_id": ObjectId(updated_appointment["pet_id"])})
             if pet:
                 # Get species data
-                species_collection = database.get_collection(COLLECTIONS["species"])
                 species = None
                 if "species_id" in pet:
-                    species = await species_collection.find_one({"_id": ObjectId(pet["species_id"])})
+                    species = await catalog_cache.get("species", pet["species_id"])
                 
                 updated_appointment["pet"] = {
                     "id": str(pet["_id"]),
@@ -508,7 +526,7 @@ async def update_appointment(
         
         # Add service data
         if "service_id" in updated_appointment:
-            service = await services_collection.find_one({"_id": ObjectId(updated_appointment["service_id"])})
+            service = await catalog_cache.get("services", updated_appointment["service_id"])
             if service:
                 updated_appointment["service"] = {
                     "id": str(service["_id"]),
@@ -562,7 +580,7 @@ async def update_appointment(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error in update_appointment: {e}\n{traceback.format_exc()}")
+        logger.exception("❌ Error in update_appointment: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to update appointment: {str(e)}")
 
 @router.delete("/{appointment_id}", response_model=APIResponse)
@@ -586,10 +604,11 @@ async def delete_appointment(
             {"_id": ObjectId(appointment_id)},
             {"$set": {"status": False}}
         )
+        await record_appointment_change(existing_appointment, None)
         
         return APIResponse(success=True, message="Appointment deleted successfully")
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error in delete_appointment: {e}\n{traceback.format_exc()}")
+        logger.exception("❌ Error in delete_appointment: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to delete appointment: {str(e)}") 
\ No newline at end of file
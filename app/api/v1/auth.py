@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Body, Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials
+from typing import Optional
 
 from app.core.deps import security, get_current_active_user
-from app.core.security import create_access_token, create_refresh_token, decode_token
+from app.core.security import create_access_token, create_refresh_token, decode_token, revoke_token
 from app.db.database import database, COLLECTIONS
 from app.crud import user_crud
 from app.schemas.user import UserLogin, Token, UserResponse
@@ -83,7 +84,7 @@ async def refresh_token(credentials: HTTPAuthorizationCredentials = Depends(secu
     
     try:
         token = credentials.credentials
-        payload = decode_token(token)
+        payload = await decode_token(token)
         if payload is None:
             raise credentials_exception
         
@@ -137,8 +138,22 @@ async def get_current_user_info(current_user: UserResponse = Depends(get_current
 
 
 @router.post("/logout", response_model=APIResponse)
-async def logout(current_user: UserResponse = Depends(get_current_active_user)):
-    """Logout user (client-side token removal)."""
+async def logout(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    refresh_token: Optional[str] = Body(None, embed=True),
+    current_user: UserResponse = Depends(get_current_active_user)
+):
+    """Logout user by revoking the access token (and refresh token, if given)."""
+    if refresh_token:
+        # Only the caller's own refresh token may be revoked
+        payload = await decode_token(refresh_token)
+        if payload is None or payload.get("sub") != current_user.email:
+            raise HTTPException(status_code=400, detail="Invalid refresh token")
+    
+    await revoke_token(credentials.credentials)
+    if refresh_token:
+        await revoke_token(refresh_token)
+    
     return APIResponse(
         success=True,
         message="Logout successful",
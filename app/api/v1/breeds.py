@@ -1,3 +1,4 @@
+import logging
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Path
 from typing import List, Optional
 
@@ -6,8 +7,11 @@ from app.db.database import database, COLLECTIONS
 from app.crud import breed_crud
 from app.schemas.breed import BreedDB, BreedCreate, BreedUpdate, BreedResponse
 from app.schemas.base import APIResponse
+from app.services.catalog_cache import catalog_cache
+from app.services.fields import FieldSet, InvalidFields
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 @router.get("/", response_model=APIResponse)
 async def get_breeds(
@@ -15,6 +19,7 @@ async def get_breeds(
     status: Optional[str] = Query(None),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,name"),
     current_user=Depends(get_current_active_user)
 ):
     """Get all breeds, optionally filtered by species_id and status."""
@@ -31,15 +36,20 @@ async def get_breeds(
             filters["status"] = False
     # If status is "all" or not provided, don't filter by status
     
-    breeds = await breed_crud.get_multi(collection, skip=skip, limit=limit, filters=filters)
+    try:
+        field_set = FieldSet(fields, BreedResponse)
+    except InvalidFields as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    breeds = await breed_crud.get_multi(collection, skip=skip, limit=limit, filters=filters, fields=field_set.names)
+    if field_set.is_sparse:
+        return APIResponse(success=True, message="Breeds retrieved successfully", data=[field_set.row(item.model_dump()) for item in breeds])
     
     # Simple response without complex schema validation
     breed_response = []
     for breed in breeds:
         try:
             # Get species information
-            species_collection = database.get_collection(COLLECTIONS["species"])
-            species = await species_collection.find_one({"_id": breed.species_id})
+            species = await catalog_cache.get("species", breed.species_id)
             species_name = species.get("name", "Unknown") if species else "Unknown"
             
             breed_response.append({
@@ -55,7 +65,7 @@ async def get_breeds(
                 "status": breed.status
             })
         except Exception as e:
-            print(f"⚠️ Error processing breed {breed.id}: {e}")
+            logger.warning("⚠️ Error processing breed %s: %s", breed.id, e)
             continue
     return APIResponse(success=True, message="Breeds retrieved successfully", data=breed_response)
 
@@ -71,8 +81,7 @@ async def create_breed(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Breed name already exists for this species")
     breed = await breed_crud.create(collection, breed_create)
     # Get species information
-    species_collection = database.get_collection(COLLECTIONS["species"])
-    species = await species_collection.find_one({"_id": breed.species_id})
+    species = await catalog_cache.get("species", breed.species_id)
     species_name = species.get("name", "Unknown") if species else "Unknown"
     
     return APIResponse(success=True, message="Breed created successfully", data={
@@ -99,8 +108,7 @@ async def get_breed_by_id(
     if not breed:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Breed not found")
     # Get species information
-    species_collection = database.get_collection(COLLECTIONS["species"])
-    species = await species_collection.find_one({"_id": breed.species_id})
+    species = await catalog_cache.get("species", breed.species_id)
     species_name = species.get("name", "Unknown") if species else "Unknown"
     
     return APIResponse(success=True, message="Breed retrieved successfully", data={
@@ -135,8 +143,7 @@ async def update_breed(
     if not breed:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Breed not found")
     # Get species information
-    species_collection = database.get_collection(COLLECTIONS["species"])
-    species = await species_collection.find_one({"_id": breed.species_id})
+    species = await catalog_cache.get("species", breed.species_id)
     species_name = species.get("name", "Unknown") if species else "Unknown"
     
     return APIResponse(success=True, message="Breed updated successfully", data={
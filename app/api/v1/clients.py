@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
 from typing import List, Optional
 
 from app.core.deps import get_current_active_user
@@ -7,6 +7,11 @@ from app.crud import client_crud
 from app.schemas.client import ClientDB, ClientCreate, ClientUpdate, ClientResponse
 from app.schemas.user import UserDB
 from app.schemas.base import APIResponse
+from app.services.fields import FieldSet, InvalidFields
+from app.services.bulk_import import NDJSON_REQUEST_BODY, BulkImportSpec, run_bulk_import
+from app.services.rollups import record_created, record_created_many
+from app.services.search import refresh_invoice_search
+from bson import ObjectId
 
 
 router = APIRouter()
@@ -16,11 +21,18 @@ router = APIRouter()
 async def get_clients(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,name"),
     current_user: UserDB = Depends(get_current_active_user)
 ):
     """Get all clients."""
     collection = database.get_collection(COLLECTIONS["clients"])
-    clients = await client_crud.get_multi(collection, skip=skip, limit=limit)
+    try:
+        field_set = FieldSet(fields, ClientResponse)
+    except InvalidFields as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    clients = await client_crud.get_multi(collection, skip=skip, limit=limit, fields=field_set.names)
+    if field_set.is_sparse:
+        return APIResponse(success=True, message="Clients retrieved successfully", data=[field_set.row(item.model_dump()) for item in clients])
     
     clients_response = [
         ClientResponse(
@@ -60,6 +72,7 @@ async def create_client(
     
     # Create client
     client = await client_crud.create(collection, client_create)
+    await record_created("new_clients", client.created_at)
     
     return APIResponse(
         success=True,
@@ -77,6 +90,28 @@ async def create_client(
     )
 
 
+# Phone numbers are checked per batch; the unique index catches any race
+client_import = BulkImportSpec(
+    "clients", ClientCreate, client_crud,
+    unique={"phone_number": "Phone number already registered"},
+    on_created=lambda clients: record_created_many("new_clients", (c["created_at"] for c in clients))
+)
+
+
+@router.post("/bulk", response_model=APIResponse, openapi_extra=NDJSON_REQUEST_BODY)
+async def bulk_create_clients(
+    request: Request,
+    current_user: UserDB = Depends(get_current_active_user)
+):
+    """Create clients from an NDJSON body, one ClientCreate object per line."""
+    result = await run_bulk_import(client_import, request.stream())
+    return APIResponse(
+        success=result.failed == 0,
+        message=f"Imported {len(result.created)} of {result.received} clients",
+        data=result.to_dict()
+    )
+
+
 @router.get("/{client_id}", response_model=APIResponse)
 async def get_client(
     client_id: str,
@@ -141,6 +176,10 @@ async def update_client(
             detail="Client not found"
         )
     
+    # Invoices are searched by client name
+    if client_update.name is not None and client_update.name != existing_client.name:
+        await refresh_invoice_search({"client_id": ObjectId(client_id)})
+    
     return APIResponse(
         success=True,
         message="Client updated successfully",
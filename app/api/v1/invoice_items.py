@@ -1,3 +1,4 @@
+import logging
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Path
 from typing import List, Optional
 from app.core.deps import get_current_active_user
@@ -5,70 +6,17 @@ from app.db.database import database, COLLECTIONS
 from app.schemas.user import UserDB
 from app.schemas.base import APIResponse
 from app.schemas.invoice import InvoiceItemCreate, InvoiceItemUpdate, InvoiceItemDB
+from app.crud.base import projection
 from app.crud.invoice_item import invoice_items_crud
-from bson import ObjectId
-from datetime import datetime
+from app.services.catalog_cache import catalog_cache
+from app.services.fields import FieldSet, InvalidFields
+from app.services.invoice_totals import apply_item_delta, item_net_price
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
-async def recalculate_invoice_totals(invoice_id: str):
-    """Recalculate invoice totals based on its items"""
-    try:
-        print(f"🔄 Recalculating totals for invoice: {invoice_id}")
-        
-        # Get all items for this invoice - try both ObjectId and string formats
-        items_collection = database.get_collection(COLLECTIONS["invoice_items"])
-        
-        # First try with ObjectId
-        items = await items_collection.find({"invoice_id": ObjectId(invoice_id)}).to_list(length=None)
-        print(f"🔍 Found {len(items)} items with ObjectId invoice_id")
-        
-        # If no items found, try with string
-        if not items:
-            items = await items_collection.find({"invoice_id": invoice_id}).to_list(length=None)
-            print(f"🔍 Found {len(items)} items with string invoice_id")
-        
-        # Calculate subtotal from items
-        subtotal = 0
-        for item in items:
-            unit_price = float(item.get('unit_price', 0))
-            quantity = float(item.get('quantity', 0))
-            discount_percent = float(item.get('discount_percent', 0))
-            
-            # Calculate item total with discount
-            item_total = unit_price * quantity * (1 - discount_percent / 100)
-            subtotal += item_total
-        
-        # Get invoice to apply discount
-        invoices_collection = database.get_collection(COLLECTIONS["invoices"])
-        invoice = await invoices_collection.find_one({"_id": ObjectId(invoice_id)})
-        
-        if invoice:
-            discount_percent = float(invoice.get('discount_percent', 0))
-            discount_amount = subtotal * (discount_percent / 100)
-            total = subtotal - discount_amount
-            
-            # Update invoice with new totals
-            await invoices_collection.update_one(
-                {"_id": ObjectId(invoice_id)},
-                {
-                    "$set": {
-                        "subtotal": round(subtotal, 2),
-                        "total": round(total, 2),
-                        "discount_amount": round(discount_amount, 2),
-                        "updated_at": datetime.utcnow()
-                    }
-                }
-            )
-            
-            print(f"💰 Updated invoice {invoice_id}: subtotal=${subtotal:.2f}, total=${total:.2f}, discount=${discount_amount:.2f}")
-        else:
-            print(f"❌ Invoice {invoice_id} not found for total recalculation")
-            
-    except Exception as e:
-        print(f"❌ Error recalculating invoice totals: {e}")
-        import traceback
-        print(f"❌ Traceback: {traceback.format_exc()}")
+# Small item fields this module reads itself; always fetched for sparse fieldsets
+ITEM_HANDLER_FIELDS = ("invoice_id", "item_name", "service_id", "product_id")
 
 @router.get("/", response_model=APIResponse)
 async def get_invoice_items(
@@ -76,67 +24,71 @@ async def get_invoice_items(
     include: Optional[str] = Query(None),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,item_name,net_price"),
     current_user: UserDB = Depends(get_current_active_user)
 ):
     collection = database.get_collection(COLLECTIONS["invoice_items"])
     
+    # Sparse fieldset, e.g. to leave out the original_*_data snapshots
+    include_fields = [field.strip() for field in include.split(',')] if include else []
+    try:
+        field_set = FieldSet(fields, InvoiceItemDB, include_fields)
+    except InvalidFields as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    fetched = field_set.fetched(*ITEM_HANDLER_FIELDS, *include_fields)
+    
     if invoice_id:
-        print(f"🔍 Getting items for invoice: {invoice_id}")
-        items = await invoice_items_crud.get_by_invoice(collection, invoice_id)
-        print(f"📦 Found {len(items)} items for invoice {invoice_id}")
+        logger.debug("🔍 Getting items for invoice: %s", invoice_id)
+        items = await invoice_items_crud.get_by_invoice(collection, invoice_id, fetched)
+        logger.debug("📦 Found %s items for invoice %s", len(items), invoice_id)
         for item in items:
-            print(f"📦 Item: {item.id} - {item.item_name} - invoice_id: {item.invoice_id}")
+            logger.debug("📦 Item: %s - %s - invoice_id: %s", item.id, item.item_name, item.invoice_id)
     else:
         # Get all items with pagination
-        cursor = collection.find().skip(skip).limit(limit)
+        cursor = collection.find({}, projection(fetched) if fetched else None).skip(skip).limit(limit)
         docs = await cursor.to_list(length=limit)
-        items = []
-        for doc in docs:
-            doc['id'] = str(doc['_id'])
-            for key in ['_id', 'id', 'invoice_id', 'service_id', 'product_id']:
-                if key in doc and isinstance(doc[key], ObjectId):
-                    doc[key] = str(doc[key])
-            items.append(InvoiceItemDB(**doc))
+        items = invoice_items_crud.to_models(docs, fetched)
     
     # Handle include parameter to populate related data
     if include and items:
-        print(f"🔍 Including fields: {include}")
-        include_fields = [field.strip() for field in include.split(',')]
-        print(f"🔍 Include fields: {include_fields}")
+        logger.debug("🔍 Including fields: %s", include)
+        logger.debug("🔍 Include fields: %s", include_fields)
         
         for item in items:
             item_dict = item.model_dump()
-            print(f"🔍 Processing item: {item.id}, service_id: {item.service_id}, product_id: {item.product_id}")
+            logger.debug("🔍 Processing item: %s, service_id: %s, product_id: %s", item.id, item.service_id, item.product_id)
             
             # Populate service data
             if 'service' in include_fields and item.service_id:
-                print(f"🔍 Fetching service with ID: {item.service_id}")
-                service_collection = database.get_collection(COLLECTIONS["services"])
-                service_doc = await service_collection.find_one({'_id': ObjectId(item.service_id)})
+                logger.debug("🔍 Fetching service with ID: %s", item.service_id)
+                service_doc = await catalog_cache.get("services", item.service_id)
                 if service_doc:
-                    print(f"🔍 Found service: {service_doc}")
+                    logger.debug("🔍 Found service: %s", service_doc)
+                    service_doc = dict(service_doc)
                     service_doc['id'] = str(service_doc['_id'])
                     service_doc['_id'] = str(service_doc['_id'])
                     item_dict['service'] = service_doc
                 else:
-                    print(f"❌ Service not found for ID: {item.service_id}")
+                    logger.warning("⚠️ Service not found for ID: %s", item.service_id)
             
             # Populate product data
             if 'product' in include_fields and item.product_id:
-                print(f"🔍 Fetching product with ID: {item.product_id}")
-                product_collection = database.get_collection(COLLECTIONS["products"])
-                product_doc = await product_collection.find_one({'_id': ObjectId(item.product_id)})
+                logger.debug("🔍 Fetching product with ID: %s", item.product_id)
+                product_doc = await catalog_cache.get("products", item.product_id)
                 if product_doc:
-                    print(f"🔍 Found product: {product_doc}")
+                    logger.debug("🔍 Found product: %s", product_doc)
+                    product_doc = dict(product_doc)
                     product_doc['id'] = str(product_doc['_id'])
                     product_doc['_id'] = str(product_doc['_id'])
                     item_dict['product'] = product_doc
                 else:
-                    print(f"❌ Product not found for ID: {item.product_id}")
+                    logger.warning("⚠️ Product not found for ID: %s", item.product_id)
             
             # Update the item with populated data
-            items[items.index(item)] = InvoiceItemDB(**item_dict)
+            items[items.index(item)] = type(item)(**item_dict)
     
+    if field_set.is_sparse:
+        return APIResponse(success=True, message="Invoice items retrieved successfully", data=[field_set.row(item.model_dump()) for item in items])
     return APIResponse(success=True, message="Invoice items retrieved successfully", data=[item.model_dump() for item in items])
 
 @router.get("/{item_id}", response_model=APIResponse)
@@ -156,8 +108,8 @@ async def create_invoice_item(
     current_user: UserDB = Depends(get_current_active_user)
 ):
     try:
-        print(f"🔄 Creating invoice item for invoice: {item_data.invoice_id}")
-        print(f"📦 Item data: {item_data.model_dump()}")
+        logger.debug("🔄 Creating invoice item for invoice: %s", item_data.invoice_id)
+        logger.debug("📦 Item data: %s", item_data.model_dump())
         
         collection = database.get_collection(COLLECTIONS["invoice_items"])
         
@@ -165,23 +117,22 @@ async def create_invoice_item(
         services_collection = database.get_collection(COLLECTIONS["services"])
         products_collection = database.get_collection(COLLECTIONS["products"])
         
-        item = await invoice_items_crud.create(
-            collection, 
-            item_data, 
-            services_collection, 
-            products_collection
-        )
-        
-        print(f"✅ Invoice item created successfully: {item.model_dump()}")
+        # Insert the item and shift the invoice totals by its net price together
+        async with database.transaction() as session:
+            item = await invoice_items_crud.create(
+                collection, 
+                item_data, 
+                services_collection, 
+                products_collection,
+                session=session
+            )
+            await apply_item_delta(item_data.invoice_id, item_net_price(item), session=session)
         
-        # Recalculate invoice totals after creating item
-        await recalculate_invoice_totals(item_data.invoice_id)
+        logger.debug("✅ Invoice item created successfully: %s", item.model_dump())
         
         return APIResponse(success=True, message="Invoice item created successfully", data=item.model_dump())
     except Exception as e:
-        print(f"❌ Error creating invoice item: {e}")
-        import traceback
-        print(f"❌ Traceback: {traceback.format_exc()}")
+        logger.exception("❌ Error creating invoice item: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to create invoice item: {str(e)}")
 
 @router.put("/{item_id}", response_model=APIResponse)
@@ -191,12 +142,14 @@ async def update_invoice_item(
     current_user: UserDB = Depends(get_current_active_user)
 ):
     collection = database.get_collection(COLLECTIONS["invoice_items"])
-    item = await invoice_items_crud.update(collection, item_id, item_update)
-    if not item:
-        raise HTTPException(status_code=404, detail="Invoice item not found")
-    
-    # Recalculate invoice totals after updating item
-    await recalculate_invoice_totals(item.invoice_id)
+    async with database.transaction() as session:
+        updated = await invoice_items_crud.update(collection, item_id, item_update, session=session)
+        if not updated:
+            raise HTTPException(status_code=404, detail="Invoice item not found")
+        previous, item = updated
+        
+        # Shift invoice totals by the change in the item's net price
+        await apply_item_delta(item.invoice_id, item_net_price(item) - item_net_price(previous), session=session)
     
     return APIResponse(success=True, message="Invoice item updated successfully", data=item.model_dump())
 
@@ -206,17 +159,12 @@ async def delete_invoice_item(
     current_user: UserDB = Depends(get_current_active_user)
 ):
     collection = database.get_collection(COLLECTIONS["invoice_items"])
-    
-    # Get the item first to get the invoice_id for recalculation
-    item = await invoice_items_crud.get(collection, item_id)
-    if not item:
-        raise HTTPException(status_code=404, detail="Invoice item not found")
-    
-    success = await invoice_items_crud.delete(collection, item_id)
-    if not success:
-        raise HTTPException(status_code=404, detail="Invoice item not found or already deleted")
-    
-    # Recalculate invoice totals after deleting item
-    await recalculate_invoice_totals(item.invoice_id)
+    async with database.transaction() as session:
+        # The deleted document says which invoice to adjust, and by how much
+        item = await invoice_items_crud.delete(collection, item_id, session=session)
+        if not item:
+            raise HTTPException(status_code=404, detail="Invoice item not found")
+        
+        await apply_item_delta(item.invoice_id, -item_net_price(item), session=session)
     
     return APIResponse(success=True, message="Invoice item deleted successfully") 
\ No newline at end of file
@@ -1,74 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Path
+import logging
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Path, Request
 from typing import List, Optional
-from app.core.deps import get_current_active_user
+from app.core.deps import get_current_active_user, get_current_admin_user
 from app.db.database import database, COLLECTIONS
 from app.schemas.user import UserDB
 from app.schemas.base import APIResponse
 from app.schemas.invoice import InvoiceCreate, InvoiceUpdate, InvoiceDB
 from app.crud.invoice import invoices_crud
+from app.services.relation_loader import RelationLoader, collect_ids
+from app.services.pagination import InvalidCursor, InvalidSort, PageRequest
+from app.services.relations import InvalidJoinMode, relation_fields, resolve_join_mode, run_list_query
+from app.services.fields import FieldSet, InvalidFields
+from app.services.counters import allocate_invoice_numbers
+from app.services.rollups import record_created, record_revenue_delta
+from app.services.search import refresh_invoice_search, search_filter
+from app.services.exports import export_response
+from app.services.invoice_totals import (
+    recalculate_invoice_totals,
+    refresh_invoice_discount,
+    reconcile_invoice_totals,
+)
 from bson import ObjectId
 from datetime import datetime
 
-async def recalculate_invoice_totals(invoice_id: str):
-    """Recalculate invoice totals based on its items"""
-    try:
-        print(f"🔄 Recalculating totals for invoice: {invoice_id}")
-        
-        # Get all items for this invoice - try both ObjectId and string formats
-        items_collection = database.get_collection(COLLECTIONS["invoice_items"])
-        
-        # First try with ObjectId
-        items = await items_collection.find({"invoice_id": ObjectId(invoice_id)}).to_list(length=None)
-        print(f"🔍 Found {len(items)} items with ObjectId invoice_id")
-        
-        # If no items found, try with string
-        if not items:
-            items = await items_collection.find({"invoice_id": invoice_id}).to_list(length=None)
-            print(f"🔍 Found {len(items)} items with string invoice_id")
-        
-        # Calculate subtotal from items
-        subtotal = 0
-        for item in items:
-            unit_price = float(item.get('unit_price', 0))
-            quantity = float(item.get('quantity', 0))
-            discount_percent = float(item.get('discount_percent', 0))
-            
-            # Calculate item total with discount
-            item_total = unit_price * quantity * (1 - discount_percent / 100)
-            subtotal += item_total
-        
-        # Get invoice to apply discount
-        invoices_collection = database.get_collection(COLLECTIONS["invoices"])
-        invoice = await invoices_collection.find_one({"_id": ObjectId(invoice_id)})
-        
-        if invoice:
-            discount_percent = float(invoice.get('discount_percent', 0))
-            discount_amount = subtotal * (discount_percent / 100)
-            total = subtotal - discount_amount
-            
-            # Update invoice with new totals
-            await invoices_collection.update_one(
-                {"_id": ObjectId(invoice_id)},
-                {
-                    "$set": {
-                        "subtotal": round(subtotal, 2),
-                        "total": round(total, 2),
-                        "discount_amount": round(discount_amount, 2),
-                        "updated_at": datetime.utcnow()
-                    }
-                }
-            )
-            
-            print(f"💰 Updated invoice {invoice_id}: subtotal=${subtotal:.2f}, total=${total:.2f}, discount=${discount_amount:.2f}")
-        else:
-            print(f"❌ Invoice {invoice_id} not found for total recalculation")
-            
-    except Exception as e:
-        print(f"❌ Error recalculating invoice totals: {e}")
-        import traceback
-        print(f"❌ Traceback: {traceback.format_exc()}")
-
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Fields `sort_by` and list cursors may use
+INVOICE_SORT_FIELDS = ("invoice_date", "invoice_number", "total", "created_at", "updated_at", "_id")
 
 @router.get("/debug", response_model=APIResponse)
 async def debug_invoices(
@@ -80,19 +39,19 @@ async def debug_invoices(
         
         # Check for invoices with null invoice_number
         null_invoices = await collection.find({'invoice_number': None}).to_list(length=None)
-        print(f"🔍 Found {len(null_invoices)} invoices with null invoice_number")
+        logger.debug("🔍 Found %s invoices with null invoice_number", len(null_invoices))
         
         # Check for invoices with missing invoice_number field
         missing_invoices = await collection.find({'invoice_number': {'$exists': False}}).to_list(length=None)
-        print(f"🔍 Found {len(missing_invoices)} invoices with missing invoice_number field")
+        logger.debug("🔍 Found %s invoices with missing invoice_number field", len(missing_invoices))
         
         # Check for invoices with empty invoice_number
         empty_invoices = await collection.find({'invoice_number': ''}).to_list(length=None)
-        print(f"🔍 Found {len(empty_invoices)} invoices with empty invoice_number")
+        logger.debug("🔍 Found %s invoices with empty invoice_number", len(empty_invoices))
         
         # Get total count
         total_invoices = await collection.count_documents({})
-        print(f"🔍 Total invoices in collection: {total_invoices}")
+        logger.debug("🔍 Total invoices in collection: %s", total_invoices)
         
         return APIResponse(
             success=True, 
@@ -108,11 +67,20 @@ async def debug_invoices(
             }
         )
     except Exception as e:
-        print(f"❌ Error in debug endpoint: {e}")
-        import traceback
-        print(f"❌ Debug Traceback: {traceback.format_exc()}")
+        logger.exception("❌ Error in debug endpoint: %s", e)
         raise HTTPException(status_code=500, detail=f"Debug failed: {str(e)}")
 
+@router.post("/reconcile-totals", response_model=APIResponse)
+async def reconcile_totals(
+    current_user: UserDB = Depends(get_current_admin_user)
+):
+    """Recompute all invoice totals from their items and repair any drift"""
+    try:
+        result = await reconcile_invoice_totals()
+        return APIResponse(success=True, message="Invoice totals reconciled", data=result)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to reconcile totals: {str(e)}")
+
 @router.post("/debug/fix-null-invoices", response_model=APIResponse)
 async def fix_null_invoices(
     current_user: UserDB = Depends(get_current_active_user)
@@ -130,32 +98,14 @@ async def fix_null_invoices(
             ]
         }).to_list(length=None)
         
-        print(f"🔍 Found {len(null_invoices)} invoices to fix")
+        logger.debug("🔍 Found %s invoices to fix", len(null_invoices))
+        
+        # Reserve one block of numbers for all invoices being fixed
+        new_numbers = await allocate_invoice_numbers(len(null_invoices)) if null_invoices else []
         
         fixed_count = 0
-        for invoice in null_invoices:
+        for invoice, new_invoice_number in zip(null_invoices, new_numbers):
             try:
-                # Generate new invoice number
-                now = datetime.utcnow()
-                month_prefix = f'INV-00{now.strftime("%y%m")}'
-                
-                # Find the last invoice number for this month
-                last_invoice = await collection.find_one(
-                    {'invoice_number': {'$regex': f'^{month_prefix}'}}, 
-                    sort=[('invoice_number', -1)]
-                )
-                
-                if last_invoice and last_invoice.get('invoice_number'):
-                    last_number_str = last_invoice['invoice_number'].replace(month_prefix, '')
-                    if last_number_str.isdigit():
-                        auto_number = int(last_number_str) + 1
-                    else:
-                        auto_number = 1
-                else:
-                    auto_number = 1
-                
-                new_invoice_number = f'{month_prefix}{str(auto_number).zfill(3)}'
-                
                 # Update the invoice
                 result = await collection.update_one(
                     {'_id': invoice['_id']},
@@ -164,10 +114,11 @@ async def fix_null_invoices(
                 
                 if result.modified_count > 0:
                     fixed_count += 1
-                    print(f"✅ Fixed invoice {invoice['_id']} with new number: {new_invoice_number}")
+                    await refresh_invoice_search({'_id': invoice['_id']})
+                    logger.debug("✅ Fixed invoice %s with new number: %s", invoice['_id'], new_invoice_number)
                 
             except Exception as e:
-                print(f"❌ Failed to fix invoice {invoice['_id']}: {e}")
+                logger.error("❌ Failed to fix invoice %s: %s", invoice['_id'], e)
         
         return APIResponse(
             success=True,
@@ -176,17 +127,17 @@ async def fix_null_invoices(
         )
         
     except Exception as e:
-        print(f"❌ Error fixing null invoices: {e}")
-        import traceback
-        print(f"❌ Fix Traceback: {traceback.format_exc()}")
+        logger.exception("❌ Error fixing null invoices: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to fix invoices: {str(e)}")
 
 @router.get("/", response_model=APIResponse)
 async def get_invoices(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     page: int = Query(1, ge=1),
     per_page: int = Query(15, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Continue after this cursor (from links.next) instead of using page"),
     client_id: Optional[str] = Query(None),
     payment_status: Optional[str] = Query(None),
     search: Optional[str] = Query(None),
@@ -194,12 +145,13 @@ async def get_invoices(
     include_deleted: Optional[bool] = Query(False, description="Include deleted invoices"),
     sort_by: Optional[str] = Query("invoice_date"),
     sort_order: Optional[str] = Query("desc"),
-    auto_fix_totals: Optional[bool] = Query(True, description="Automatically fix $0.00 totals"),
+    join_mode: Optional[str] = Query(None, description="Relation join strategy: 'loader' or 'lookup'"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,invoice_number"),
     current_user: UserDB = Depends(get_current_active_user)
 ):
     try:
-        print(f"📥 Incoming query parameters for get_invoices: {locals()}")
-        collection = database.get_collection(COLLECTIONS["invoices"])
+        logger.debug("📥 Incoming query parameters for get_invoices: %s", locals())
+        collection = database.get_collection(COLLECTIONS["invoices"], read="list")
         
         # Build filters - only include active invoices unless include_deleted is True
         filters = {}
@@ -207,39 +159,62 @@ async def get_invoices(
             filters["status"] = True
         
         if client_id:
-            filters["client_id"] = client_id
+            if not ObjectId.is_valid(client_id):
+                raise HTTPException(status_code=400, detail="Invalid client_id")
+            filters["client_id"] = ObjectId(client_id)
         if payment_status:
             filters["payment_status"] = payment_status
-        
-        # Calculate skip from page and per_page
-        skip = (page - 1) * per_page
-        limit = per_page
-        
-        # Get invoices with basic filters first
-        cursor = collection.find(filters)
-        
-        # Apply sorting
-        sort_direction = 1 if sort_order == "asc" else -1
-        cursor = cursor.sort(sort_by, sort_direction)
-        
-        # Apply pagination
-        cursor = cursor.skip(skip).limit(limit)
-        
-        invoices = await cursor.to_list(length=None)
-        print(f"🔎 Raw invoices from DB: {invoices}")
-        
-        # Prepare related collections
-        clients_collection = database.get_collection(COLLECTIONS["clients"])
-        pets_collection = database.get_collection(COLLECTIONS["pets"])
+        if search:
+            # Matches invoice number, client and pet names via the denormalized search_text
+            filters.update(search_filter(search))
+        
+        # Page number or keyset cursor
+        try:
+            paging = PageRequest(page, per_page, sort_by, 1 if sort_order == "asc" else -1, cursor, INVOICE_SORT_FIELDS)
+        except (InvalidCursor, InvalidSort) as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        try:
+            join_mode = resolve_join_mode(join_mode)
+        except InvalidJoinMode as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        query_filters = paging.apply(filters)
+        
+        include_fields = include.split(',') if include else []
+        loader = RelationLoader(read="list")
+        
+        # Sparse fieldset: fetch only what is returned, plus sort keys and joined references
+        try:
+            field_set = FieldSet(fields, INVOICE_EXPORT_COLUMNS, include_fields)
+        except InvalidFields as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        projection = field_set.projection(*(key for key, _ in paging.sort), *relation_fields("invoices", include_fields))
+        
+        if join_mode == "lookup":
+            invoices, filtered_count = await run_list_query(
+                collection, "invoices", query_filters, paging.sort,
+                paging.skip, paging.limit, include_fields, loader, projection,
+                count=not paging.is_cursor
+            )
+        else:
+            filtered_count = None
+            
+            # Get invoices with basic filters first
+            invoices = await collection.find(query_filters, projection).sort(paging.sort).skip(paging.skip).limit(paging.limit).to_list(length=None)
+        invoices, next_cursor = paging.split(invoices)
+        logger.debug("🔎 Raw invoices from DB: %s invoices", len(invoices))
+        
+        # Batch-load related documents for the whole page
+        if 'client' in include_fields:
+            await loader.load_many("clients", collect_ids(invoices, "client_id"))
+        if 'pet' in include_fields:
+            pet_docs = await loader.load_many("pets", collect_ids(invoices, "pet_id"))
+            await loader.load_many("species", collect_ids(list(pet_docs.values()), "species_id"))
         
         invoices_response = []
         for inv in invoices:
-            print(f"🔎 Processing invoice: {inv}")
-            if hasattr(inv, 'model_dump'):
-                data = inv.model_dump()
-            else:
-                data = dict(inv)
+            data = dict(inv)
             data['id'] = str(data['_id'])
+            data.pop('search_text', None)
             
             # Convert ObjectId fields to str
             for key in ["client_id", "pet_id", "id"]:
@@ -248,179 +223,98 @@ async def get_invoices(
             if '_id' in data and isinstance(data['_id'], ObjectId):
                 data['_id'] = str(data['_id'])
             
-            # Get client and pet names for search
-            client_name = None
-            pet_name = None
-            
-            if data.get('client_id'):
-                client_doc = await clients_collection.find_one({'_id': ObjectId(data['client_id'])})
-                if client_doc:
-                    client_name = client_doc.get('name')
-                    print(f"🔎 Client name for invoice {data['id']}: {client_name}")
-            
-            if data.get('pet_id'):
-                pet_doc = await pets_collection.find_one({'_id': ObjectId(data['pet_id'])})
-                if pet_doc:
-                    pet_name = pet_doc.get('name')
-                    print(f"🔎 Pet name for invoice {data['id']}: {pet_name}")
-            
-            # Apply search filter if search term is provided
-            if search:
-                search_lower = search.lower()
-                invoice_number_match = data.get('invoice_number', '').lower().find(search_lower) != -1
-                client_name_match = client_name and client_name.lower().find(search_lower) != -1
-                pet_name_match = pet_name and pet_name.lower().find(search_lower) != -1
-                
-                print(f"🔎 Search: '{search}' -> invoice_number: {invoice_number_match}, client: {client_name_match}, pet: {pet_name_match}")
-                
-                if not (invoice_number_match or client_name_match or pet_name_match):
-                    print(f"🔎 Skipping invoice {data['id']} - no match")
-                    continue
+            client_doc = loader.get("clients", data.get('client_id'))
+            pet_doc = loader.get("pets", data.get('pet_id'))
             
             # Populate related fields if include parameter is provided
-            if include:
-                include_fields = include.split(',')
-                
-                if 'client' in include_fields and data.get('client_id'):
-                    client_doc = await clients_collection.find_one({'_id': ObjectId(data['client_id'])})
-                    if client_doc:
-                        client_doc['id'] = str(client_doc['_id'])
-                        for key in client_doc:
-                            if isinstance(client_doc[key], ObjectId):
-                                client_doc[key] = str(client_doc[key])
-                        if '_id' in client_doc and isinstance(client_doc['_id'], ObjectId):
-                            client_doc['_id'] = str(client_doc['_id'])
-                        data['client'] = {
-                            'id': client_doc['id'],
-                            'name': client_doc.get('name'),
-                            'email': client_doc.get('email'),
-                            'phone': client_doc.get('phone_number'),
-                            'other_contact_info': client_doc.get('other_contact_info'),
-                        }
-                
-                if 'pet' in include_fields and data.get('pet_id'):
-                    pet_doc = await pets_collection.find_one({'_id': ObjectId(data['pet_id'])})
-                    if pet_doc:
-                        for key in pet_doc:
-                            if isinstance(pet_doc[key], ObjectId):
-                                pet_doc[key] = str(pet_doc[key])
-                        if '_id' in pet_doc and isinstance(pet_doc['_id'], ObjectId):
-                            pet_doc['_id'] = str(pet_doc['_id'])
-                        species_info = None
-                        if pet_doc.get('species_id'):
-                            species_collection = database.get_collection(COLLECTIONS["species"])
-                            species_doc = await species_collection.find_one({'_id': ObjectId(pet_doc['species_id'])})
-                            if species_doc:
-                                species_info = {
-                                    'id': str(species_doc['_id']),
-                                    'name': species_doc.get('name')
-                                }
-                        data['pet'] = {
-                            'id': str(pet_doc['_id']),
-                            'name': pet_doc.get('name'),
-                            'species': species_info,
-                            'breed_id': str(pet_doc.get('breed_id')) if pet_doc.get('breed_id') else None,
-                        }
+            if 'client' in include_fields and client_doc:
+                data['client'] = {
+                    'id': str(client_doc['_id']),
+                    'name': client_doc.get('name'),
+                    'email': client_doc.get('email'),
+                    'phone': client_doc.get('phone_number'),
+                    'other_contact_info': client_doc.get('other_contact_info'),
+                }
             
-            # Auto-fix totals if enabled
-            if auto_fix_totals:
-                print(f"🔧 Checking invoice totals for: {data['id']} (current total: ${data.get('total', 0)})")
-                try:
-                    # Get items for this invoice
-                    items_collection = database.get_collection(COLLECTIONS["invoice_items"])
-                    items_with_objectid = await items_collection.find({"invoice_id": ObjectId(data['id'])}).to_list(length=None)
-                    items_with_string = await items_collection.find({"invoice_id": data['id']}).to_list(length=None)
-                    
-                    # Combine both results
-                    all_items = items_with_objectid + items_with_string
-                    
-                    if all_items:
-                        # Calculate what the total should be
-                        calculated_subtotal = 0
-                        for item in all_items:
-                            unit_price = float(item.get('unit_price', 0))
-                            quantity = float(item.get('quantity', 0))
-                            discount_percent = float(item.get('discount_percent', 0))
-                            item_total = unit_price * quantity * (1 - discount_percent / 100)
-                            calculated_subtotal += item_total
-                        
-                        # Apply invoice discount
-                        discount_percent = float(data.get('discount_percent', 0))
-                        discount_amount = calculated_subtotal * (discount_percent / 100)
-                        calculated_total = calculated_subtotal - discount_amount
-                        
-                        current_total = float(data.get('total', 0))
-                        
-                        # If totals don't match, recalculate
-                        if abs(calculated_total - current_total) > 0.01:  # Allow for small rounding differences
-                            print(f"🔧 Total mismatch for invoice {data['id']}: current=${current_total}, calculated=${calculated_total}")
-                            
-                            # Convert string format to ObjectId format if needed
-                            for item in items_with_string:
-                                await items_collection.update_one(
-                                    {"_id": item["_id"]},
-                                    {"$set": {"invoice_id": ObjectId(data['id'])}}
-                                )
-                            
-                            # Recalculate totals
-                            await recalculate_invoice_totals(data['id'])
-                            
-                            # Get the updated invoice data
-                            updated_invoice = await collection.find_one({"_id": ObjectId(data['id'])})
-                            if updated_invoice:
-                                data['total'] = updated_invoice.get('total', 0)
-                                data['subtotal'] = updated_invoice.get('subtotal', 0)
-                                data['discount_amount'] = updated_invoice.get('discount_amount', 0)
-                                print(f"✅ Auto-fixed invoice {data['id']}: total=${data['total']}")
-                        else:
-                            print(f"✅ Invoice {data['id']} totals are correct: ${current_total}")
-                    else:
-                        print(f"📭 Invoice {data['id']} has no items")
-                        
-                except Exception as e:
-                    print(f"❌ Error auto-fixing invoice {data['id']}: {e}")
+            if 'pet' in include_fields and pet_doc:
+                species_info = None
+                species_doc = loader.get("species", pet_doc.get('species_id'))
+                if species_doc:
+                    species_info = {
+                        'id': str(species_doc['_id']),
+                        'name': species_doc.get('name')
+                    }
+                data['pet'] = {
+                    'id': str(pet_doc['_id']),
+                    'name': pet_doc.get('name'),
+                    'species': species_info,
+                    'breed_id': str(pet_doc.get('breed_id')) if pet_doc.get('breed_id') else None,
+                }
             
-            invoices_response.append(data)
+            invoices_response.append(field_set.row(data) if field_set.is_sparse else data)
         
         # Calculate total count for pagination
-        if search:
-            # For search, we need to count the filtered results
-            total_count = len(invoices_response)
+        if paging.is_cursor:
+            total_count = None
+        elif filtered_count is not None:
+            total_count = filtered_count
         else:
             total_count = await collection.count_documents(filters)
         
-        # Calculate pagination metadata
-        last_page = (total_count + per_page - 1) // per_page
-        from_item = skip + 1
-        to_item = min(skip + len(invoices_response), total_count)
-        
         # Build paginated response
         paginated_response = {
             "data": invoices_response,
-            "meta": {
-                "current_page": page,
-                "from": from_item,
-                "last_page": last_page,
-                "per_page": per_page,
-                "to": to_item,
-                "total": total_count
-            },
-            "links": {
-                "first": f"/api/v1/invoices?page=1&per_page={per_page}",
-                "last": f"/api/v1/invoices?page={last_page}&per_page={per_page}",
-                "prev": f"/api/v1/invoices?page={page-1}&per_page={per_page}" if page > 1 else None,
-                "next": f"/api/v1/invoices?page={page+1}&per_page={per_page}" if page < last_page else None
-            }
+            "meta": paging.meta(total_count, len(invoices_response), next_cursor),
+            "links": paging.links("/api/v1/invoices", total_count, next_cursor, request.query_params)
         }
         
-        print(f"🔎 Final response: {len(invoices_response)} invoices found")
+        logger.debug("🔎 Final response: %s invoices found", len(invoices_response))
         return APIResponse(success=True, message="Invoices retrieved successfully", data=paginated_response)
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"❌ Error in get_invoices: {e}")
-        import traceback
-        print(f"❌ Traceback: {traceback.format_exc()}")
+        logger.exception("❌ Error in get_invoices: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
+INVOICE_EXPORT_COLUMNS = [
+    "id", "invoice_number", "invoice_date", "due_date", "client_id", "pet_id",
+    "subtotal", "discount_percent", "total", "deposit", "payment_status",
+    "notes", "status", "created_at", "updated_at",
+]
+
+@router.get("/export")
+async def export_invoices(
+    format: str = Query("csv", pattern="^(ndjson|csv)$", description="Export format: 'csv' or 'ndjson'"),
+    date_from: Optional[datetime] = Query(None, description="Invoice date from (inclusive)"),
+    date_to: Optional[datetime] = Query(None, description="Invoice date to (exclusive)"),
+    client_id: Optional[str] = Query(None),
+    payment_status: Optional[str] = Query(None),
+    include_deleted: Optional[bool] = Query(False, description="Include deleted invoices"),
+    gzip: bool = Query(False, description="Gzip the download"),
+    current_user: UserDB = Depends(get_current_active_user)
+):
+    """Stream invoices in invoice date order as a CSV or NDJSON download"""
+    filters = {}
+    if not include_deleted:
+        filters["status"] = True
+    if client_id:
+        if not ObjectId.is_valid(client_id):
+            raise HTTPException(status_code=400, detail="Invalid client_id")
+        filters["client_id"] = ObjectId(client_id)
+    if payment_status:
+        filters["payment_status"] = payment_status
+    if date_from or date_to:
+        filters["invoice_date"] = {}
+        if date_from:
+            filters["invoice_date"]["$gte"] = date_from
+        if date_to:
+            filters["invoice_date"]["$lt"] = date_to
+    
+    collection = database.get_collection(COLLECTIONS["invoices"], read="export")
+    projection = {column: 1 for column in INVOICE_EXPORT_COLUMNS if column != "id"}
+    cursor = collection.find(filters, projection).sort([("invoice_date", 1), ("_id", 1)])
+    return export_response(cursor, INVOICE_EXPORT_COLUMNS, format, "invoices", compress=gzip)
+
 @router.get("/{invoice_id}", response_model=APIResponse)
 async def get_invoice(
     invoice_id: str = Path(..., description="Invoice ID"),
@@ -439,7 +333,7 @@ async def get_invoice(
     # Handle include parameter to populate related data
     if include:
         include_fields = [field.strip() for field in include.split(',')]
-        print(f"🔍 Including fields for invoice: {include_fields}")
+        logger.debug("🔍 Including fields for invoice: %s", include_fields)
         
         # Prepare related collections
         clients_collection = database.get_collection(COLLECTIONS["clients"])
@@ -447,10 +341,10 @@ async def get_invoice(
         
         # Populate client data
         if 'client' in include_fields and invoice_data.get('client_id'):
-            print(f"🔍 Fetching client with ID: {invoice_data['client_id']}")
+            logger.debug("🔍 Fetching client with ID: %s", invoice_data['client_id'])
             client_doc = await clients_collection.find_one({'_id': ObjectId(invoice_data['client_id'])})
             if client_doc:
-                print(f"🔍 Found client: {client_doc}")
+                logger.debug("🔍 Found client: %s", client_doc)
                 # Convert all ObjectId fields to strings
                 for key in client_doc:
                     if isinstance(client_doc[key], ObjectId):
@@ -459,14 +353,14 @@ async def get_invoice(
                 client_doc['_id'] = str(client_doc['_id'])
                 invoice_data['client'] = client_doc
             else:
-                print(f"❌ Client not found for ID: {invoice_data['client_id']}")
+                logger.warning("⚠️ Client not found for ID: %s", invoice_data['client_id'])
         
         # Populate pet data
         if 'pet' in include_fields and invoice_data.get('pet_id'):
-            print(f"🔍 Fetching pet with ID: {invoice_data['pet_id']}")
+            logger.debug("🔍 Fetching pet with ID: %s", invoice_data['pet_id'])
             pet_doc = await pets_collection.find_one({'_id': ObjectId(invoice_data['pet_id'])})
             if pet_doc:
-                print(f"🔍 Found pet: {pet_doc}")
+                logger.debug("🔍 Found pet: %s", pet_doc)
                 # Convert all ObjectId fields to strings
                 for key in pet_doc:
                     if isinstance(pet_doc[key], ObjectId):
@@ -475,7 +369,7 @@ async def get_invoice(
                 pet_doc['_id'] = str(pet_doc['_id'])
                 invoice_data['pet'] = pet_doc
             else:
-                print(f"❌ Pet not found for ID: {invoice_data['pet_id']}")
+                logger.warning("⚠️ Pet not found for ID: %s", invoice_data['pet_id'])
     
     return APIResponse(success=True, message="Invoice retrieved successfully", data=invoice_data)
 
@@ -485,15 +379,16 @@ async def create_invoice(
     current_user: UserDB = Depends(get_current_active_user)
 ):
     try:
-        print(f"📥 Creating invoice with data: {invoice_data}")
+        logger.debug("📥 Creating invoice with data: %s", invoice_data)
         collection = database.get_collection(COLLECTIONS["invoices"])
         invoice = await invoices_crud.create(collection, invoice_data)
-        print(f"✅ Invoice created successfully: {invoice}")
+        await record_created("invoices", invoice.created_at)
+        # Embedded items set the opening subtotal; later item writes shift it by deltas
+        await record_revenue_delta(invoice.created_at, invoice.subtotal)
+        logger.debug("✅ Invoice created successfully: %s", invoice)
         return APIResponse(success=True, message="Invoice created successfully", data=invoice.model_dump())
     except Exception as e:
-        print(f"❌ Error creating invoice: {e}")
-        import traceback
-        print(f"❌ Traceback: {traceback.format_exc()}")
+        logger.exception("❌ Error creating invoice: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to create invoice: {str(e)}")
 
 @router.put("/{invoice_id}", response_model=APIResponse)
@@ -507,9 +402,10 @@ async def update_invoice(
     if not invoice:
         raise HTTPException(status_code=404, detail="Invoice not found")
     
-    # Recalculate totals if discount_percent was updated
-    if hasattr(invoice_update, 'discount_percent') and invoice_update.discount_percent is not None:
-        await recalculate_invoice_totals(invoice_id)
+    # Re-derive totals from the maintained subtotal if discount_percent was updated
+    if invoice_update.discount_percent is not None:
+        await refresh_invoice_discount(invoice_id)
+        invoice = await invoices_crud.get(collection, invoice_id)
     
     return APIResponse(success=True, message="Invoice updated successfully", data=invoice.model_dump())
 
@@ -568,27 +464,18 @@ async def fix_invoice_id_format(
 ):
     """Fix invoice_id format in invoice items to ensure consistency"""
     try:
-        print(f"🔧 Fixing invoice_id format for invoice: {invoice_id}")
+        logger.debug("🔧 Fixing invoice_id format for invoice: %s", invoice_id)
         
         items_collection = database.get_collection(COLLECTIONS["invoice_items"])
         
-        # Find all items for this invoice (both formats)
-        items_with_objectid = await items_collection.find({"invoice_id": ObjectId(invoice_id)}).to_list(length=None)
-        items_with_string = await items_collection.find({"invoice_id": invoice_id}).to_list(length=None)
-        
-        print(f"🔧 Found {len(items_with_objectid)} items with ObjectId format")
-        print(f"🔧 Found {len(items_with_string)} items with string format")
-        
-        # Convert string format to ObjectId format
-        updated_count = 0
-        for item in items_with_string:
-            await items_collection.update_one(
-                {"_id": item["_id"]},
-                {"$set": {"invoice_id": ObjectId(invoice_id)}}
-            )
-            updated_count += 1
+        # Convert any items still stored with a string invoice_id
+        result = await items_collection.update_many(
+            {"invoice_id": invoice_id},
+            {"$set": {"invoice_id": ObjectId(invoice_id)}}
+        )
+        updated_count = result.modified_count
         
-        print(f"🔧 Updated {updated_count} items to ObjectId format")
+        logger.debug("🔧 Updated %s items to ObjectId format", updated_count)
         
         # Recalculate totals after fixing
         await recalculate_invoice_totals(invoice_id)
@@ -598,9 +485,7 @@ async def fix_invoice_id_format(
             message=f"Fixed invoice_id format for {updated_count} items and recalculated totals"
         )
     except Exception as e:
-        print(f"❌ Error fixing invoice_id format: {e}")
-        import traceback
-        print(f"❌ Traceback: {traceback.format_exc()}")
+        logger.exception("❌ Error fixing invoice_id format: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to fix invoice_id format: {str(e)}")
 
 @router.post("/{invoice_id}/fix-item-prices", response_model=APIResponse)
@@ -610,15 +495,11 @@ async def fix_invoice_item_prices(
 ):
     """Fix invoice item prices by getting them from original service/product data"""
     try:
-        print(f"🔧 Fixing item prices for invoice: {invoice_id}")
+        logger.debug("🔧 Fixing item prices for invoice: %s", invoice_id)
         
         # Get items for this invoice
         items_collection = database.get_collection(COLLECTIONS["invoice_items"])
-        items_with_objectid = await items_collection.find({"invoice_id": ObjectId(invoice_id)}).to_list(length=None)
-        items_with_string = await items_collection.find({"invoice_id": invoice_id}).to_list(length=None)
-        
-        # Combine both results
-        all_items = items_with_objectid + items_with_string
+        all_items = await items_collection.find({"invoice_id": ObjectId(invoice_id)}).to_list(length=None)
         
         if not all_items:
             return APIResponse(
@@ -626,7 +507,7 @@ async def fix_invoice_item_prices(
                 message="No items found for this invoice"
             )
         
-        print(f"📦 Found {len(all_items)} items to fix")
+        logger.debug("📦 Found %s items to fix", len(all_items))
         
         # Get services and products collections
         services_collection = database.get_collection(COLLECTIONS["services"])
@@ -639,7 +520,7 @@ async def fix_invoice_item_prices(
             
             # Skip if price is already correct
             if current_unit_price > 0:
-                print(f"✅ Item {item.get('item_name', 'Unknown')} already has correct price: ${current_unit_price}")
+                logger.debug("✅ Item %s already has correct price: $%s", item.get('item_name', 'Unknown'), current_unit_price)
                 continue
             
             new_unit_price = 0
@@ -650,9 +531,9 @@ async def fix_invoice_item_prices(
                     service_doc = await services_collection.find_one({'_id': ObjectId(item['service_id'])})
                     if service_doc:
                         new_unit_price = float(service_doc.get('price', 0))
-                        print(f"💰 Found service price for {item.get('item_name', 'Unknown')}: ${new_unit_price}")
+                        logger.debug("💰 Found service price for %s: $%s", item.get('item_name', 'Unknown'), new_unit_price)
                 except Exception as e:
-                    print(f"⚠️ Error getting service price: {e}")
+                    logger.warning("⚠️ Error getting service price: %s", e)
             
             # Try to get price from product if service didn't work
             if new_unit_price == 0 and item.get('product_id'):
@@ -660,9 +541,9 @@ async def fix_invoice_item_prices(
                     product_doc = await products_collection.find_one({'_id': ObjectId(item['product_id'])})
                     if product_doc:
                         new_unit_price = float(product_doc.get('price', 0))
-                        print(f"💰 Found product price for {item.get('item_name', 'Unknown')}: ${new_unit_price}")
+                        logger.debug("💰 Found product price for %s: $%s", item.get('item_name', 'Unknown'), new_unit_price)
                 except Exception as e:
-                    print(f"⚠️ Error getting product price: {e}")
+                    logger.warning("⚠️ Error getting product price: %s", e)
             
             # Update the item if we found a price
             if new_unit_price > 0:
@@ -680,15 +561,15 @@ async def fix_invoice_item_prices(
                         }
                     }
                 )
-                print(f"✅ Updated item {item.get('item_name', 'Unknown')}: unit_price=${new_unit_price}, net_price=${new_net_price}")
+                logger.debug("✅ Updated item %s: unit_price=$%s, net_price=$%s", item.get('item_name', 'Unknown'), new_unit_price, new_net_price)
                 updated_count += 1
             else:
-                print(f"❌ Could not find price for item {item.get('item_name', 'Unknown')}")
+                logger.error("❌ Could not find price for item %s", item.get('item_name', 'Unknown'))
         
         if updated_count > 0:
             # Recalculate invoice totals
             await recalculate_invoice_totals(invoice_id)
-            print(f"✅ Recalculated invoice totals after fixing {updated_count} items")
+            logger.debug("✅ Recalculated invoice totals after fixing %s items", updated_count)
         
         return APIResponse(
             success=True, 
@@ -696,9 +577,7 @@ async def fix_invoice_item_prices(
         )
         
     except Exception as e:
-        print(f"❌ Error fixing item prices: {e}")
-        import traceback
-        print(f"❌ Traceback: {traceback.format_exc()}")
+        logger.exception("❌ Error fixing item prices: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to fix item prices: {str(e)}")
 
 @router.post("/{invoice_id}/force-recalculate", response_model=APIResponse)
@@ -708,31 +587,16 @@ async def force_recalculate_invoice(
 ):
     """Force recalculation of invoice totals"""
     try:
-        print(f"🔄 Force recalculating invoice: {invoice_id}")
+        logger.debug("🔄 Force recalculating invoice: %s", invoice_id)
         
         # Get items for this invoice
         items_collection = database.get_collection(COLLECTIONS["invoice_items"])
-        items_with_objectid = await items_collection.find({"invoice_id": ObjectId(invoice_id)}).to_list(length=None)
-        items_with_string = await items_collection.find({"invoice_id": invoice_id}).to_list(length=None)
-        
-        print(f"🔍 Found {len(items_with_objectid)} items with ObjectId format")
-        print(f"🔍 Found {len(items_with_string)} items with string format")
-        
-        # Combine both results
-        all_items = items_with_objectid + items_with_string
+        all_items = await items_collection.find({"invoice_id": ObjectId(invoice_id)}).to_list(length=None)
         
         if all_items:
-            print(f"📦 Total items found: {len(all_items)}")
+            logger.debug("📦 Total items found: %s", len(all_items))
             for item in all_items:
-                print(f"📦 Item: {item.get('item_name', 'Unknown')} - Qty: {item.get('quantity', 0)} - Price: ${item.get('unit_price', 0)}")
-            
-            # Convert string format to ObjectId format if needed
-            for item in items_with_string:
-                await items_collection.update_one(
-                    {"_id": item["_id"]},
-                    {"$set": {"invoice_id": ObjectId(invoice_id)}}
-                )
-                print(f"🔧 Converted item {item['_id']} to ObjectId format")
+                logger.debug("📦 Item: %s - Qty: %s - Price: $%s", item.get('item_name', 'Unknown'), item.get('quantity', 0), item.get('unit_price', 0))
             
             # Recalculate totals
             await recalculate_invoice_totals(invoice_id)
@@ -750,7 +614,7 @@ async def force_recalculate_invoice(
                     "discount_amount": updated_invoice.get("discount_amount", 0),
                     "items_count": len(all_items)
                 }
-                print(f"✅ Force recalculation completed: {result}")
+                logger.debug("✅ Force recalculation completed: %s", result)
                 return APIResponse(
                     success=True, 
                     message=f"Force recalculation completed. Found {len(all_items)} items.",
@@ -762,16 +626,14 @@ async def force_recalculate_invoice(
                     message="Invoice not found after recalculation"
                 )
         else:
-            print(f"📭 No items found for invoice {invoice_id}")
+            logger.debug("📭 No items found for invoice %s", invoice_id)
             return APIResponse(
                 success=False, 
                 message="No items found for this invoice"
             )
             
     except Exception as e:
-        print(f"❌ Error force recalculating invoice: {e}")
-        import traceback
-        print(f"❌ Traceback: {traceback.format_exc()}")
+        logger.exception("❌ Error force recalculating invoice: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to force recalculate invoice: {str(e)}")
 
 @router.get("/{invoice_id}/debug", response_model=APIResponse)
@@ -781,7 +643,7 @@ async def debug_invoice(
 ):
     """Debug endpoint to check specific invoice data"""
     try:
-        print(f"🔍 Debugging invoice: {invoice_id}")
+        logger.debug("🔍 Debugging invoice: %s", invoice_id)
         
         # Get invoice data
         invoices_collection = database.get_collection(COLLECTIONS["invoices"])
@@ -790,17 +652,10 @@ async def debug_invoice(
         if not invoice:
             return APIResponse(success=False, message="Invoice not found", data=None)
         
-        # Get invoice items - try both ObjectId and string formats
+        # Get invoice items
         items_collection = database.get_collection(COLLECTIONS["invoice_items"])
-        
-        # First try with ObjectId
         items = await items_collection.find({"invoice_id": ObjectId(invoice_id)}).to_list(length=None)
-        print(f"🔍 Found {len(items)} items with ObjectId invoice_id")
-        
-        # If no items found, try with string
-        if not items:
-            items = await items_collection.find({"invoice_id": invoice_id}).to_list(length=None)
-            print(f"🔍 Found {len(items)} items with string invoice_id")
+        logger.debug("🔍 Found %s items", len(items))
         
         # Calculate what the totals should be
         subtotal = 0
@@ -842,11 +697,9 @@ async def debug_invoice(
             ]
         }
         
-        print(f"🔍 Debug data: {debug_data}")
+        logger.debug("🔍 Debug data: %s", debug_data)
         return APIResponse(success=True, message="Invoice debug data retrieved", data=debug_data)
         
     except Exception as e:
-        print(f"❌ Error in debug endpoint: {e}")
-        import traceback
-        print(f"❌ Debug Traceback: {traceback.format_exc()}")
+        logger.exception("❌ Error in debug endpoint: %s", e)
         raise HTTPException(status_code=500, detail=f"Debug failed: {str(e)}") 
\ No newline at end of file
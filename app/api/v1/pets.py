@@ -1,37 +1,49 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Path
+import logging
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Path, Request
 from typing import List, Optional
 from app.core.deps import get_current_active_user
 from app.db.database import database, COLLECTIONS
 from app.crud import pet_crud
 from app.crud.allergy import allergy_crud
-from app.crud.allergy_type import allergy_type_crud
 from app.schemas.pet import PetDB, PetCreate, PetUpdate, PetResponse
 from app.schemas.allergy import AllergyCreate, AllergyDB, AllergyResponse
 from app.schemas.user import UserDB
 from app.schemas.base import APIResponse
-import traceback
+from app.services.catalog_cache import catalog_cache
+from app.services.relation_loader import RelationLoader, collect_ids
+from app.services.pagination import InvalidCursor, PageRequest
+from app.services.relations import InvalidJoinMode, relation_fields, resolve_join_mode, run_list_query
+from app.services.fields import FieldSet, InvalidFields
+from app.services.bulk_import import NDJSON_REQUEST_BODY, BulkImportSpec, run_bulk_import
+from app.services.rollups import record_created, record_created_many
+from app.services.search import refresh_invoice_search
 from bson import ObjectId
 from datetime import datetime, timezone
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 @router.get("/", response_model=APIResponse)
 async def get_pets(
+    request: Request,
     status: Optional[str] = Query("active"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     page: int = Query(1, ge=1),
     per_page: int = Query(15, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Continue after this cursor (from links.next) instead of using page"),
     client_id: Optional[str] = Query(None),
     species_id: Optional[str] = Query(None),
     breed_id: Optional[str] = Query(None),
     gender: Optional[str] = Query(None),
     include: Optional[str] = Query(None),
+    join_mode: Optional[str] = Query(None, description="Relation join strategy: 'loader' or 'lookup'"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,name"),
     current_user: UserDB = Depends(get_current_active_user)
 ):
     """Get all pets with optional filters."""
     try:
-        collection = database.get_collection(COLLECTIONS["pets"])
+        collection = database.get_collection(COLLECTIONS["pets"], read="list")
         filters = {}
         if status and status != "all":
             if status == "active":
@@ -44,89 +56,123 @@ async def get_pets(
             except Exception:
                 filters["client_id"] = client_id  # fallback, but ObjectId is preferred
         # Debug print
-        print("🐾 PETS FILTER:", filters)
+        logger.debug("🐾 Pets filter: %s", filters)
         
-        # Calculate skip from page and per_page
-        skip = (page - 1) * per_page
-        limit = per_page
+        # Page number or keyset cursor (pets are listed in _id order)
+        try:
+            paging = PageRequest(page, per_page, "_id", 1, cursor)
+        except InvalidCursor as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        try:
+            join_mode = resolve_join_mode(join_mode)
+        except InvalidJoinMode as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        query_filters = paging.apply(filters)
         
-        # Get total count for pagination
-        total_count = await collection.count_documents(filters)
+        include_fields = include.split(',') if include else []
+        loader = RelationLoader(read="list")
         
-        pets = await pet_crud.get_multi(collection, skip=skip, limit=limit, filters=filters)
-        print("🐾 PETS FOUND:", len(pets))
+        # Sparse fieldset: fetch only what is returned, plus sort keys and joined references
+        try:
+            field_set = FieldSet(fields, PetResponse, include_fields)
+        except InvalidFields as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        required = [key for key, _ in paging.sort] + relation_fields("pets", include_fields)
+        fetched, projection = field_set.fetched(*required), field_set.projection(*required)
+        
+        total_count = None
+        if join_mode == "lookup":
+            # Page and relations in one aggregation; the total (page mode only) is counted alongside
+            documents, total_count = await run_list_query(
+                collection, "pets", query_filters, paging.sort, paging.skip, paging.limit, include_fields, loader, projection,
+                count=not paging.is_cursor
+            )
+        else:
+            # Get total count for pagination
+            if not paging.is_cursor:
+                total_count = await collection.count_documents(filters)
+            documents = await collection.find(query_filters, projection).sort(paging.sort).skip(paging.skip).limit(paging.limit).to_list(length=None)
+        documents, next_cursor = paging.split(documents)
+        pets = pet_crud.to_models(documents, fetched)
+        logger.debug("🐾 Pets found: %d", len(pets))
+        
+        # Batch-load related documents for the whole page
+        pet_rows = [pet.model_dump() for pet in pets]
+        if 'client' in include_fields:
+            await loader.load_many("clients", collect_ids(pet_rows, "client_id"))
+        if 'species' in include_fields:
+            await loader.load_many("species", collect_ids(pet_rows, "species_id"))
+        if 'breed' in include_fields:
+            await loader.load_many("breeds", collect_ids(pet_rows, "breed_id"))
+        if 'allergies' in include_fields:
+            await loader.load_many("allergies", collect_ids(pet_rows, "allergies"))
+        if 'vaccinations' in include_fields:
+            vaccination_ids = [
+                record.get('vaccination_id')
+                for row in pet_rows
+                for record in (row.get('vaccinations') or [])
+            ]
+            await loader.load_many("vaccinations", vaccination_ids)
         
-        clients_collection = database.get_collection(COLLECTIONS["clients"])
-        species_collection = database.get_collection(COLLECTIONS["species"])
-        breeds_collection = database.get_collection(COLLECTIONS["breeds"])
         pets_response = []
-        for pet in pets:
-            data = pet.model_dump()
+        for pet, data in zip(pets, pet_rows):
             data['id'] = str(pet.id)
             for key in ['species_id', 'breed_id', 'client_id']:
                 if key in data and data[key] is not None:
                     data[key] = str(data[key])
             # Fetch client info
             client = None
-            if include and 'client' in include.split(','):
-                clients_collection = database.get_collection(COLLECTIONS["clients"])
-                if data.get('client_id'):
-                    client_doc = await clients_collection.find_one({'_id': ObjectId(data['client_id'])})
-                    if client_doc:
-                        client_doc['id'] = str(client_doc['_id'])
-                        client = {
-                            'id': client_doc['id'],
-                            'name': client_doc.get('name'),
-                            'gender': client_doc.get('gender'),
-                            'phone_number': client_doc.get('phone_number'),
-                            'other_contact_info': client_doc.get('other_contact_info'),
-                            'status': client_doc.get('status'),
-                            'created_at': client_doc.get('created_at'),
-                            'updated_at': client_doc.get('updated_at'),
-                        }
+            if 'client' in include_fields:
+                client_doc = loader.get("clients", data.get('client_id'))
+                if client_doc:
+                    client = {
+                        'id': str(client_doc['_id']),
+                        'name': client_doc.get('name'),
+                        'gender': client_doc.get('gender'),
+                        'phone_number': client_doc.get('phone_number'),
+                        'other_contact_info': client_doc.get('other_contact_info'),
+                        'status': client_doc.get('status'),
+                        'created_at': client_doc.get('created_at'),
+                        'updated_at': client_doc.get('updated_at'),
+                    }
             data['client'] = client
             
             # Fetch species info
             species = None
-            if include and 'species' in include.split(','):
-                species_collection = database.get_collection(COLLECTIONS["species"])
-                if data.get('species_id'):
-                    species_doc = await species_collection.find_one({'_id': ObjectId(data['species_id'])})
-                    if species_doc:
-                        species = {
-                            'id': str(species_doc['_id']),
-                            'name': species_doc.get('name'),
-                            'description': species_doc.get('description'),
-                            'created_at': species_doc.get('created_at'),
-                            'updated_at': species_doc.get('updated_at'),
-                            'status': species_doc.get('status'),
-                        }
+            if 'species' in include_fields:
+                species_doc = loader.get("species", data.get('species_id'))
+                if species_doc:
+                    species = {
+                        'id': str(species_doc['_id']),
+                        'name': species_doc.get('name'),
+                        'description': species_doc.get('description'),
+                        'created_at': species_doc.get('created_at'),
+                        'updated_at': species_doc.get('updated_at'),
+                        'status': species_doc.get('status'),
+                    }
             data['species'] = species
             
             # Fetch breed info
             breed = None
-            if include and 'breed' in include.split(','):
-                breeds_collection = database.get_collection(COLLECTIONS["breeds"])
-                if data.get('breed_id'):
-                    breed_doc = await breeds_collection.find_one({'_id': ObjectId(data['breed_id'])})
-                    if breed_doc:
-                        breed = {
-                            'id': str(breed_doc['_id']),
-                            'name': breed_doc.get('name'),
-                            'species_id': str(breed_doc.get('species_id')) if breed_doc.get('species_id') else None,
-                            'created_at': breed_doc.get('created_at'),
-                            'updated_at': breed_doc.get('updated_at'),
-                            'status': breed_doc.get('status'),
-                        }
+            if 'breed' in include_fields:
+                breed_doc = loader.get("breeds", data.get('breed_id'))
+                if breed_doc:
+                    breed = {
+                        'id': str(breed_doc['_id']),
+                        'name': breed_doc.get('name'),
+                        'species_id': str(breed_doc.get('species_id')) if breed_doc.get('species_id') else None,
+                        'created_at': breed_doc.get('created_at'),
+                        'updated_at': breed_doc.get('updated_at'),
+                        'status': breed_doc.get('status'),
+                    }
             data['breed'] = breed
             
             # Handle allergies - either populate full objects or remove from response
-            if include and 'allergies' in include.split(','):
+            if 'allergies' in include_fields:
                 allergies = []
-                allergies_collection = database.get_collection(COLLECTIONS["allergies"])
                 if data.get('allergies'):
                     for allergy_id in data['allergies']:
-                        allergy_doc = await allergies_collection.find_one({'_id': ObjectId(allergy_id)})
+                        allergy_doc = loader.get("allergies", allergy_id)
                         if allergy_doc:
                             allergies.append({
                                 'id': str(allergy_doc['_id']),
@@ -142,59 +188,41 @@ async def get_pets(
                 data.pop('allergies', None)
             
             # Handle vaccinations - either populate full objects or remove from response
-            if include and 'vaccinations' in include.split(','):
+            if 'vaccinations' in include_fields:
                 vaccinations = []
-                vaccinations_collection = database.get_collection(COLLECTIONS["vaccinations"])
                 if data.get('vaccinations'):
                     for vaccination_record in data['vaccinations']:
-                        vaccination_id = vaccination_record.get('vaccination_id')
-                        if vaccination_id:
-                            vaccination_doc = await vaccinations_collection.find_one({'_id': ObjectId(vaccination_id)})
-                            if vaccination_doc:
-                                vaccination_detail = {
-                                    'id': str(vaccination_doc['_id']),
-                                    'name': vaccination_doc.get('name'),
-                                    'description': vaccination_doc.get('description'),
-                                    'created_at': vaccination_doc.get('created_at'),
-                                    'updated_at': vaccination_doc.get('updated_at'),
-                                    'status': vaccination_doc.get('status'),
-                                }
-                                # Merge vaccination details with the record
-                                vaccination_record.update(vaccination_detail)
+                        vaccination_doc = loader.get("vaccinations", vaccination_record.get('vaccination_id'))
+                        if vaccination_doc:
+                            vaccination_detail = {
+                                'id': str(vaccination_doc['_id']),
+                                'name': vaccination_doc.get('name'),
+                                'description': vaccination_doc.get('description'),
+                                'created_at': vaccination_doc.get('created_at'),
+                                'updated_at': vaccination_doc.get('updated_at'),
+                                'status': vaccination_doc.get('status'),
+                            }
+                            # Merge vaccination details with the record
+                            vaccination_record.update(vaccination_detail)
                         vaccinations.append(vaccination_record)
                     data['vaccinations'] = vaccinations
             else:
                 # Remove vaccinations from response if not requested
                 data.pop('vaccinations', None)
-            pets_response.append(PetResponse(**data))
-        
-        # Calculate pagination metadata
-        last_page = (total_count + per_page - 1) // per_page
-        from_item = skip + 1
-        to_item = min(skip + len(pets_response), total_count)
+            pets_response.append(field_set.row(data) if field_set.is_sparse else PetResponse(**data))
         
         # Build paginated response
         paginated_response = {
             "data": pets_response,
-            "meta": {
-                "current_page": page,
-                "from": from_item,
-                "last_page": last_page,
-                "per_page": per_page,
-                "to": to_item,
-                "total": total_count
-            },
-            "links": {
-                "first": f"/api/v1/pets?page=1&per_page={per_page}",
-                "last": f"/api/v1/pets?page={last_page}&per_page={per_page}",
-                "prev": f"/api/v1/pets?page={page-1}&per_page={per_page}" if page > 1 else None,
-                "next": f"/api/v1/pets?page={page+1}&per_page={per_page}" if page < last_page else None
-            }
+            "meta": paging.meta(total_count, len(pets_response), next_cursor),
+            "links": paging.links("/api/v1/pets", total_count, next_cursor, request.query_params)
         }
         
         return APIResponse(success=True, message="Pets retrieved successfully", data=paginated_response)
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"❌ Error in get_pets: {e}\n{traceback.format_exc()}")
+        logger.exception("❌ Error in get_pets: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to get pets: {str(e)}")
 
 @router.post("/", response_model=APIResponse)
@@ -206,6 +234,7 @@ async def create_pet(
     try:
         collection = database.get_collection(COLLECTIONS["pets"])
         pet = await pet_crud.create(collection, pet_create)
+        await record_created("new_pets", pet.created_at)
         data = pet.model_dump()
         data['id'] = str(pet.id)
         for key in ['species_id', 'breed_id', 'client_id']:
@@ -231,9 +260,8 @@ async def create_pet(
         data['client'] = client
         # Fetch species info
         species = None
-        species_collection = database.get_collection(COLLECTIONS["species"])
         if data.get('species_id'):
-            species_doc = await species_collection.find_one({'_id': ObjectId(data['species_id'])})
+            species_doc = await catalog_cache.get("species", data['species_id'])
             if species_doc:
                 species = {
                     'id': str(species_doc['_id']),
@@ -246,9 +274,8 @@ async def create_pet(
         data['species'] = species
         # Fetch breed info
         breed = None
-        breeds_collection = database.get_collection(COLLECTIONS["breeds"])
         if data.get('breed_id'):
-            breed_doc = await breeds_collection.find_one({'_id': ObjectId(data['breed_id'])})
+            breed_doc = await catalog_cache.get("breeds", data['breed_id'])
             if breed_doc:
                 breed = {
                     'id': str(breed_doc['_id']),
@@ -261,9 +288,27 @@ async def create_pet(
         data['breed'] = breed
         return APIResponse(success=True, message="Pet created successfully", data=PetResponse(**data))
     except Exception as e:
-        print(f"❌ Error in create_pet: {e}\n{traceback.format_exc()}")
+        logger.exception("❌ Error in create_pet: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to create pet: {str(e)}")
 
+pet_import = BulkImportSpec(
+    "pets", PetCreate, pet_crud,
+    on_created=lambda pets: record_created_many("new_pets", (p["created_at"] for p in pets))
+)
+
+@router.post("/bulk", response_model=APIResponse, openapi_extra=NDJSON_REQUEST_BODY)
+async def bulk_create_pets(
+    request: Request,
+    current_user: UserDB = Depends(get_current_active_user)
+):
+    """Create pets from an NDJSON body, one PetCreate object per line."""
+    result = await run_bulk_import(pet_import, request.stream())
+    return APIResponse(
+        success=result.failed == 0,
+        message=f"Imported {len(result.created)} of {result.received} pets",
+        data=result.to_dict()
+    )
+
 @router.get("/{pet_id}", response_model=APIResponse)
 async def get_pet(
     pet_id: str,
@@ -280,9 +325,9 @@ async def get_pet(
         data['id'] = str(pet.id)
         
         # Debug: Log the original data structure
-        print(f"🔍 Original data from pet.model_dump():")
-        print(f"🔍 Allergies: {data.get('allergies')}")
-        print(f"🔍 Vaccinations: {data.get('vaccinations')}")
+        logger.debug("🔍 Original data from pet.model_dump():")
+        logger.debug("🔍 Allergies: %s", data.get('allergies'))
+        logger.debug("🔍 Vaccinations: %s", data.get('vaccinations'))
         
         for key in ['species_id', 'breed_id', 'client_id']:
             if key in data and data[key] is not None:
@@ -307,9 +352,8 @@ async def get_pet(
         data['client'] = client
         # Fetch species info
         species = None
-        species_collection = database.get_collection(COLLECTIONS["species"])
         if data.get('species_id'):
-            species_doc = await species_collection.find_one({'_id': ObjectId(data['species_id'])})
+            species_doc = await catalog_cache.get("species", data['species_id'])
             if species_doc:
                 species = {
                     'id': str(species_doc['_id']),
@@ -322,9 +366,8 @@ async def get_pet(
         data['species'] = species
         # Fetch breed info
         breed = None
-        breeds_collection = database.get_collection(COLLECTIONS["breeds"])
         if data.get('breed_id'):
-            breed_doc = await breeds_collection.find_one({'_id': ObjectId(data['breed_id'])})
+            breed_doc = await catalog_cache.get("breeds", data['breed_id'])
             if breed_doc:
                 breed = {
                     'id': str(breed_doc['_id']),
@@ -338,12 +381,11 @@ async def get_pet(
         
         # Handle allergies if requested
         if include and 'allergies' in include.split(','):
-            allergies_collection = database.get_collection(COLLECTIONS["allergies"])
             allergies = []
             if data.get('allergies'):
                 for allergy_id in data['allergies']:
                     try:
-                        allergy_doc = await allergies_collection.find_one({'_id': ObjectId(allergy_id)})
+                        allergy_doc = await catalog_cache.get("allergies", allergy_id)
                         if allergy_doc:
                             allergies.append({
                                 'id': str(allergy_doc['_id']),
@@ -352,7 +394,7 @@ async def get_pet(
                                 'status': allergy_doc.get('status', True)
                             })
                     except Exception as e:
-                        print(f"❌ Error processing allergy {allergy_id}: {e}")
+                        logger.error("❌ Error processing allergy %s: %s", allergy_id, e)
                         continue
             data['allergies'] = allergies
         else:
@@ -361,14 +403,13 @@ async def get_pet(
         
         # Handle vaccinations if requested
         if include and 'vaccinations' in include.split(','):
-            vaccinations_collection = database.get_collection(COLLECTIONS["vaccinations"])
             vaccinations = []
             if data.get('vaccinations'):
                 for vaccination_record in data['vaccinations']:
                     try:
                         vaccination_id = vaccination_record.get('vaccination_id')
                         if vaccination_id:
-                            vaccination_doc = await vaccinations_collection.find_one({'_id': ObjectId(vaccination_id)})
+                            vaccination_doc = await catalog_cache.get("vaccinations", vaccination_id)
                             if vaccination_doc:
                                 vaccination_detail = {
                                     'id': str(vaccination_doc['_id']),
@@ -380,7 +421,7 @@ async def get_pet(
                                 }
                                 vaccinations.append(vaccination_detail)
                     except Exception as e:
-                        print(f"❌ Error processing vaccination {vaccination_record}: {e}")
+                        logger.error("❌ Error processing vaccination %s: %s", vaccination_record, e)
                         continue
             data['vaccinations'] = vaccinations
         else:
@@ -395,15 +436,15 @@ async def get_pet(
             data['vaccinations'] = []
         
         # Debug: Log the data structure before validation
-        print(f"🔍 Data structure before PetResponse validation:")
-        print(f"🔍 Allergies: {data.get('allergies')}")
-        print(f"🔍 Vaccinations: {data.get('vaccinations')}")
+        logger.debug("🔍 Data structure before PetResponse validation:")
+        logger.debug("🔍 Allergies: %s", data.get('allergies'))
+        logger.debug("🔍 Vaccinations: %s", data.get('vaccinations'))
         
         try:
             return APIResponse(success=True, message="Pet retrieved successfully", data=PetResponse(**data))
         except Exception as validation_error:
-            print(f"❌ PetResponse validation error: {validation_error}")
-            print(f"🔍 Full data structure: {data}")
+            logger.error("❌ PetResponse validation error: %s", validation_error)
+            logger.debug("🔍 Full data structure: %s", data)
             # Return a simplified response without the problematic fields
             safe_data = {k: v for k, v in data.items() if k not in ['allergies', 'vaccinations']}
             safe_data['allergies'] = []
@@ -411,7 +452,7 @@ async def get_pet(
             return APIResponse(success=True, message="Pet retrieved successfully", data=PetResponse(**safe_data))
         
     except Exception as e:
-        print(f"❌ Error in get_pet: {e}\n{traceback.format_exc()}")
+        logger.exception("❌ Error in get_pet: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to get pet: {str(e)}")
 
 @router.put("/{pet_id}", response_model=APIResponse)
@@ -426,6 +467,9 @@ async def update_pet(
         pet = await pet_crud.update(collection, pet_id, pet_update)
         if not pet:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Pet not found")
+        if pet_update.name is not None:
+            # Invoices are searched by pet name
+            await refresh_invoice_search({"pet_id": ObjectId(pet_id)})
         data = pet.model_dump()
         data['id'] = str(pet.id)
         for key in ['species_id', 'breed_id', 'client_id']:
@@ -433,7 +477,7 @@ async def update_pet(
                 data[key] = str(data[key])
         return APIResponse(success=True, message="Pet updated successfully", data=PetResponse(**data))
     except Exception as e:
-        print(f"❌ Error in update_pet: {e}\n{traceback.format_exc()}")
+        logger.exception("❌ Error in update_pet: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to update pet: {str(e)}")
 
 @router.delete("/{pet_id}", response_model=APIResponse)
@@ -449,7 +493,7 @@ async def delete_pet(
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Pet not found")
         return APIResponse(success=True, message="Pet deleted successfully", data=None)
     except Exception as e:
-        print(f"❌ Error in delete_pet: {e}\n{traceback.format_exc()}")
+        logger.exception("❌ Error in delete_pet: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to delete pet: {str(e)}")
 
 @router.post("/{pet_id}/allergies", response_model=APIResponse)
@@ -472,46 +516,9 @@ async def add_pet_allergy(
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="allergy_id is required")
         
         # Verify allergy type exists
-        allergies_collection = database.get_collection(COLLECTIONS["allergies"])
-        print(f"🔍 Looking for allergy type with ID: {allergy_id}")
-        print(f"🔍 ObjectId valid: {ObjectId.is_valid(allergy_id)}")
-        
-        # First, let's check what's actually in the collection
-        all_allergies = await allergies_collection.find({}).to_list(length=None)
-        print(f"🔍 All allergies in collection: {len(all_allergies)}")
-        for allergy in all_allergies:
-            print(f"🔍 Allergy: {allergy.get('_id')} - {allergy.get('name')} - {allergy.get('description', 'No description')}")
-        
-        # Try to find the specific allergy
-        try:
-            allergy_doc = await allergies_collection.find_one({"_id": ObjectId(allergy_id)})
-            print(f"🔍 Direct MongoDB query result: {allergy_doc}")
-            if allergy_doc:
-                print(f"🔍 Allergy document fields: {list(allergy_doc.keys())}")
-        except Exception as e:
-            print(f"🔍 Error in direct query: {e}")
-        
-        # Try the CRUD method first
-        allergy_type = await allergy_type_crud.get(allergies_collection, allergy_id)
-        print(f"🔍 Found allergy type via CRUD: {allergy_type}")
-        
-        # If CRUD method fails, try direct query and create a simple object
-        if not allergy_type:
-            print(f"🔍 CRUD method failed, trying direct query...")
-            allergy_doc = await allergies_collection.find_one({"_id": ObjectId(allergy_id)})
-            if allergy_doc:
-                print(f"🔍 Found allergy via direct query: {allergy_doc}")
-                # Create a simple allergy type object with the required fields
-                allergy_type = type('AllergyType', (), {
-                    'id': allergy_doc['_id'],
-                    'name': allergy_doc.get('name', ''),
-                    'description': allergy_doc.get('description', ''),
-                    'created_at': allergy_doc.get('created_at'),
-                    'updated_at': allergy_doc.get('updated_at'),
-                    'status': allergy_doc.get('status', True)
-                })()
-            else:
-                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Allergy type not found")
+        allergy_doc = await catalog_cache.get("allergies", allergy_id)
+        if not allergy_doc:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Allergy type not found")
         
         # Check if this allergy is already assigned to this pet
         # We'll store this as a simple relationship in the pet document
@@ -536,13 +543,13 @@ async def add_pet_allergy(
         return APIResponse(success=True, message="Allergy added to pet successfully", data={
             "pet_id": pet_id,
             "allergy_id": allergy_id,
-            "allergy_name": allergy_type.name
+            "allergy_name": allergy_doc.get("name", "")
         })
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error in add_pet_allergy: {e}\n{traceback.format_exc()}")
+        logger.exception("❌ Error in add_pet_allergy: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to add allergy to pet: {str(e)}")
 
 @router.delete("/{pet_id}/allergies/{allergy_id}", response_model=APIResponse)
@@ -583,7 +590,7 @@ async def remove_pet_allergy(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error in remove_pet_allergy: {e}\n{traceback.format_exc()}")
+        logger.exception("❌ Error in remove_pet_allergy: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to remove allergy from pet: {str(e)}")
 
 
@@ -610,29 +617,8 @@ async def add_pet_vaccination(
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="vaccination_id is required")
         
         # Verify vaccination type exists
-        vaccinations_collection = database.get_collection(COLLECTIONS["vaccinations"])
-        print(f"🔍 Looking for vaccination type with ID: {vaccination_id}")
-        print(f"🔍 ObjectId valid: {ObjectId.is_valid(vaccination_id)}")
-        
-        # First, let's check what's actually in the collection
-        all_vaccinations = await vaccinations_collection.find({}).to_list(length=None)
-        print(f"🔍 All vaccinations in collection: {len(all_vaccinations)}")
-        for vaccination in all_vaccinations:
-            print(f"🔍 Vaccination: {vaccination.get('_id')} - {vaccination.get('name')} - {vaccination.get('description', 'No description')}")
-        
-        # Try direct query first
-        vaccination_doc = await vaccinations_collection.find_one({"_id": ObjectId(vaccination_id)})
-        if vaccination_doc:
-            print(f"🔍 Found vaccination via direct query: {vaccination_doc}")
-            vaccination_type = type('VaccinationType', (), {
-                'id': vaccination_doc['_id'],
-                'name': vaccination_doc.get('name', ''),
-                'description': vaccination_doc.get('description', ''),
-                'created_at': vaccination_doc.get('created_at'),
-                'updated_at': vaccination_doc.get('updated_at'),
-                'status': vaccination_doc.get('status', True)
-            })()
-        else:
+        vaccination_doc = await catalog_cache.get("vaccinations", vaccination_id)
+        if not vaccination_doc:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Vaccination type not found")
         
         # Get pet data and vaccinations
@@ -665,7 +651,7 @@ async def add_pet_vaccination(
         return APIResponse(success=True, message="Vaccination added to pet successfully", data={
             "pet_id": pet_id,
             "vaccination_id": vaccination_id,
-            "vaccination_name": vaccination_type.name,
+            "vaccination_name": vaccination_doc.get("name", ""),
             "vaccination_date": vaccination_date,
             "next_due_date": next_due_date
         })
@@ -673,7 +659,7 @@ async def add_pet_vaccination(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error in add_pet_vaccination: {e}\n{traceback.format_exc()}")
+        logger.exception("❌ Error in add_pet_vaccination: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to add vaccination to pet: {str(e)}")
 
 
@@ -716,5 +702,5 @@ async def remove_pet_vaccination(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error in remove_pet_vaccination: {e}\n{traceback.format_exc()}")
+        logger.exception("❌ Error in remove_pet_vaccination: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to remove vaccination from pet: {str(e)}") 
\ No newline at end of file
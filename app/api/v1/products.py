@@ -7,6 +7,7 @@ from app.crud import product_crud
 from app.schemas.product import ProductDB, ProductCreate, ProductUpdate, ProductResponse
 from app.schemas.user import UserDB
 from app.schemas.base import APIResponse
+from app.services.fields import FieldSet, InvalidFields
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -16,6 +17,7 @@ async def get_products(
     status: Optional[str] = Query(None),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,name"),
     current_user: UserDB = Depends(get_current_active_user)
 ):
     collection = database.get_collection(COLLECTIONS["products"])
@@ -25,7 +27,13 @@ async def get_products(
             filters["status"] = True
         elif status == "inactive":
             filters["status"] = False
-    products = await product_crud.get_multi(collection, skip=skip, limit=limit, filters=filters)
+    try:
+        field_set = FieldSet(fields, ProductResponse)
+    except InvalidFields as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    products = await product_crud.get_multi(collection, skip=skip, limit=limit, filters=filters, fields=field_set.names)
+    if field_set.is_sparse:
+        return APIResponse(success=True, message="Products retrieved successfully", data=[field_set.row(item.model_dump()) for item in products])
     products_response = [
         ProductResponse(
             id=str(product.id),
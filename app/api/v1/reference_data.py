@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends, Header, Response
+from typing import Optional
+
+from app.core.deps import get_current_active_user
+from app.schemas.user import UserDB
+from app.schemas.base import APIResponse
+from app.services.reference_data import current_versions, etag_for, etag_matches, reference_data
+
+
+router = APIRouter()
+
+# Clients must revalidate, but a matching ETag costs no database work
+CACHE_CONTROL = "private, no-cache"
+
+
+@router.get("/", response_model=APIResponse)
+async def get_reference_data(
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    current_user: UserDB = Depends(get_current_active_user)
+):
+    """Get all active species, breeds, allergies, vaccinations, services and products.
+    
+    Send the returned ETag back as If-None-Match to get 304 Not Modified
+    until one of the catalogs changes.
+    """
+    etag = etag_for(await current_versions())
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    
+    response.headers.update(headers)
+    return APIResponse(
+        success=True,
+        message="Reference data retrieved successfully",
+        data=await reference_data(etag)
+    )
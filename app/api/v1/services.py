@@ -6,6 +6,7 @@ from app.crud import service_crud
 from app.schemas.service import ServiceDB, ServiceCreate, ServiceUpdate, ServiceResponse
 from app.schemas.user import UserDB
 from app.schemas.base import APIResponse
+from app.services.fields import FieldSet, InvalidFields
 
 router = APIRouter()
 
@@ -14,6 +15,7 @@ async def get_services(
     status: Optional[str] = Query(None),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,name"),
     current_user: UserDB = Depends(get_current_active_user)
 ):
     collection = database.get_collection(COLLECTIONS["services"])
@@ -23,7 +25,13 @@ async def get_services(
             filters["status"] = True
         elif status == "inactive":
             filters["status"] = False
-    services = await service_crud.get_multi(collection, skip=skip, limit=limit, filters=filters)
+    try:
+        field_set = FieldSet(fields, ServiceResponse)
+    except InvalidFields as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    services = await service_crud.get_multi(collection, skip=skip, limit=limit, filters=filters, fields=field_set.names)
+    if field_set.is_sparse:
+        return APIResponse(success=True, message="Services retrieved successfully", data=[field_set.row(item.model_dump()) for item in services])
     services_response = [
         ServiceResponse(
             id=str(service.id),
@@ -93,7 +101,7 @@ async def update_service_status(
     service = await service_crud.get(collection, service_id)
     if not service:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Service not found")
-    update_result = await service_crud.update(collection, service_id, {"status": status_value})
+    update_result = await service_crud.update(collection, service_id, {"status": status_value}, changed_only=True)
     if not update_result:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to update service status")
     return APIResponse(success=True, message="Service status updated successfully") 
@@ -6,6 +6,7 @@ from app.db.database import database, COLLECTIONS
 from app.crud import species_crud
 from app.schemas.species import SpeciesDB, SpeciesCreate, SpeciesUpdate, SpeciesResponse
 from app.schemas.base import APIResponse
+from app.services.fields import FieldSet, InvalidFields
 
 
 router = APIRouter()
@@ -16,6 +17,7 @@ async def get_species(
     status: Optional[str] = Query(None),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,name"),
     current_user: SpeciesDB = Depends(get_current_active_user)
 ):
     """Get all species, optionally filtered by status."""
@@ -29,7 +31,13 @@ async def get_species(
         elif status == "inactive":
             filters["status"] = False
     
-    species_list = await species_crud.get_multi(collection, skip=skip, limit=limit, filters=filters)
+    try:
+        field_set = FieldSet(fields, SpeciesResponse)
+    except InvalidFields as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    species_list = await species_crud.get_multi(collection, skip=skip, limit=limit, filters=filters, fields=field_set.names)
+    if field_set.is_sparse:
+        return APIResponse(success=True, message="Species retrieved successfully", data=[field_set.row(item.model_dump()) for item in species_list])
     
     species_response = [
         SpeciesResponse(
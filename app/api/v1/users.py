@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query
 from typing import List, Optional
 from pydantic import BaseModel
 
-from app.core.deps import get_current_active_user, get_current_admin_user
+from app.core.deps import get_current_active_user, get_current_admin_user, invalidate_cached_user
 from app.db.database import database, COLLECTIONS
 from app.crud import user_crud
 from app.schemas.user import UserDB, UserCreate, UserUpdate, UserResponse
@@ -31,8 +31,8 @@ async def get_users(
     # Calculate skip for pagination
     skip = (page - 1) * per_page
     
-    # Get total count for pagination
-    total_count = await user_crud.count(collection)
+    # Get total count for pagination (unfiltered, so collection metadata is enough)
+    total_count = await user_crud.count(collection, mode="estimated")
     
     # Get users with pagination
     users = await user_crud.get_multi(collection, skip=skip, limit=per_page)
@@ -180,6 +180,7 @@ async def update_user(
     
     # Update user
     user = await user_crud.update(collection, user_id, user_update)
+    invalidate_cached_user(existing_user.email, user_update.email)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -214,7 +215,8 @@ async def delete_user(
     collection = database.get_collection(COLLECTIONS["users"])
     
     # Check if user exists
-    if not await user_crud.exists(collection, user_id):
+    existing_user = await user_crud.get(collection, user_id)
+    if not existing_user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
@@ -222,6 +224,7 @@ async def delete_user(
     
     # Delete user
     success = await user_crud.delete(collection, user_id)
+    invalidate_cached_user(existing_user.email)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -254,6 +257,7 @@ async def update_user_password(
     
     # Update the password
     await user_crud.update_password(collection, user_id, password_update.password)
+    invalidate_cached_user(user.email)
     
     return APIResponse(
         success=True,
@@ -1,3 +1,4 @@
+import logging
 from fastapi import APIRouter, HTTPException, status, Depends, Query
 from typing import List, Optional
 from bson import ObjectId
@@ -7,17 +8,24 @@ from app.db.database import database, COLLECTIONS
 from app.crud.vaccination_type import vaccination_type_crud
 from app.schemas.vaccination_type import VaccinationTypeDB, VaccinationTypeCreate, VaccinationTypeUpdate, VaccinationTypeResponse
 from app.schemas.base import APIResponse
+from app.services.fields import FieldSet, InvalidFields
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 @router.get("/", response_model=APIResponse)
 async def get_vaccinations(
     status: Optional[str] = Query("active"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,name"),
     current_user=Depends(get_current_active_user)
 ):
     """Get all vaccinations with filtering"""
+    try:
+        field_set = FieldSet(fields, VaccinationTypeResponse)
+    except InvalidFields as e:
+        raise HTTPException(status_code=400, detail=str(e))
     try:
         collection = database.get_collection(COLLECTIONS["vaccinations"])
         
@@ -29,12 +37,14 @@ async def get_vaccinations(
             elif status == "inactive":
                 filters["status"] = False
         
-        print(f"🔍 Fetching vaccinations with filters: {filters}")
+        logger.debug("🔍 Fetching vaccinations with filters: %s", filters)
         
         # Get vaccinations with pagination
-        vaccinations = await vaccination_type_crud.get_multi(collection, skip=skip, limit=limit, filters=filters)
+        vaccinations = await vaccination_type_crud.get_multi(collection, skip=skip, limit=limit, filters=filters, fields=field_set.names)
+        if field_set.is_sparse:
+            return APIResponse(success=True, message=f"Retrieved {len(vaccinations)} vaccinations", data=[field_set.row(item.model_dump()) for item in vaccinations])
         
-        print(f"📊 Found {len(vaccinations)} vaccinations")
+        logger.debug("📊 Found %s vaccinations", len(vaccinations))
         
         # Simple response without complex schema validation
         vaccination_response = []
@@ -50,7 +60,7 @@ async def get_vaccinations(
                     "status": vaccination.status
                 })
             except Exception as e:
-                print(f"⚠️ Error processing vaccination {vaccination.id}: {e}")
+                logger.warning("⚠️ Error processing vaccination %s: %s", vaccination.id, e)
                 continue
         
         return APIResponse(
@@ -60,7 +70,7 @@ async def get_vaccinations(
         )
         
     except Exception as e:
-        print(f"❌ Error in get_vaccinations: {e}")
+        logger.error("❌ Error in get_vaccinations: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to retrieve vaccinations: {str(e)}"
@@ -94,7 +104,7 @@ async def create_vaccination(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error in create_vaccination: {e}")
+        logger.error("❌ Error in create_vaccination: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to create vaccination: {str(e)}"
@@ -126,7 +136,7 @@ async def get_vaccination(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error in get_vaccination: {e}")
+        logger.error("❌ Error in get_vaccination: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to retrieve vaccination: {str(e)}"
@@ -168,7 +178,7 @@ async def update_vaccination(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error in update_vaccination: {e}")
+        logger.error("❌ Error in update_vaccination: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to update vaccination: {str(e)}"
@@ -201,7 +211,7 @@ async def toggle_vaccination_status(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error in toggle_vaccination_status: {e}")
+        logger.error("❌ Error in toggle_vaccination_status: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to toggle vaccination status: {str(e)}"
@@ -221,14 +231,14 @@ async def delete_vaccination(
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Vaccination not found")
         
         # Soft delete by setting status to False
-        await vaccination_type_crud.update(collection, vaccination_id, {"status": False})
+        await vaccination_type_crud.update(collection, vaccination_id, {"status": False}, changed_only=True)
         
         return APIResponse(success=True, message="Vaccination deleted successfully")
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error in delete_vaccination: {e}")
+        logger.error("❌ Error in delete_vaccination: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to delete vaccination: {str(e)}"
@@ -0,0 +1,164 @@
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+import asyncio
+import logging
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """In-process LRU cache with per-entry expiry and hit/miss counters."""
+
+    def __init__(self, max_size: int = 1024, ttl: float = 60.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a live entry, counting the lookup as a hit or miss."""
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Store an entry, evicting the least recently used one when full."""
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            self._data.pop(key, None)
+            return
+
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove an entry and return its value."""
+        entry = self._data.pop(key, None)
+        return entry[1] if entry is not None else default
+
+    def clear(self):
+        """Remove all entries."""
+        self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._data.get(key)
+        return entry is not None and entry[0] > time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache size and hit/miss counters."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+class SWRCache:
+    """Async cache that serves stale entries while a single task refreshes them.
+
+    Entries are fresh for `ttl` seconds and may then be served stale for a
+    further `stale_ttl` seconds while one background task recomputes them.
+    Concurrent misses for the same key await a single shared computation.
+    Failed computations are not cached.
+    """
+
+    def __init__(self, max_size: int = 128, ttl: float = 60.0, stale_ttl: float = 300.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, Tuple[float, float, Any]]" = OrderedDict()
+        self._pending: Dict[Hashable, "asyncio.Task[Any]"] = {}
+
+    async def get_or_compute(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Get a cached value, computing or refreshing it as needed."""
+        if self.ttl <= 0:
+            return await compute()
+
+        now = time.monotonic()
+        entry = self._data.get(key)
+        if entry is not None:
+            fresh_until, stale_until, value = entry
+            if now < fresh_until:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+            if now < stale_until:
+                self.stale_hits += 1
+                self._refresh(key, compute)
+                return value
+
+        self.misses += 1
+        return await asyncio.shield(self._refresh(key, compute))
+
+    def _refresh(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> "asyncio.Task[Any]":
+        """Start a computation for `key` unless one is already running."""
+        task = self._pending.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._compute(key, compute))
+            self._pending[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        return task
+
+    def _finished(self, key: Hashable, task: "asyncio.Task[Any]"):
+        self._pending.pop(key, None)
+        if not task.cancelled():
+            task.exception()  # retrieved here so unawaited background refreshes don't warn
+
+    async def _compute(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            value = await compute()
+        except Exception:
+            if key in self._data:
+                logger.exception("Background refresh failed for %r; serving stale entry", key)
+            raise
+        now = time.monotonic()
+        self._data[key] = (now + self.ttl, now + self.ttl + self.stale_ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+        return value
+
+    def clear(self):
+        """Remove all entries."""
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache size and hit/stale/miss counters."""
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refreshing": len(self._pending),
+            "hit_rate": round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0
+        }
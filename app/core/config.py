@@ -1,8 +1,13 @@
+from pydantic import field_validator
 from pydantic_settings import BaseSettings
 from typing import List, Optional
 import os
 
 
+# Read preference modes accepted by the *_read_preference settings
+READ_PREFERENCE_MODES = ("primary", "primaryPreferred", "secondary", "secondaryPreferred", "nearest")
+
+
 class Settings(BaseSettings):
     """Application settings using Pydantic BaseSettings."""
     
@@ -22,11 +27,68 @@ class Settings(BaseSettings):
     database_name: str = "dogtorvet"
     mongodb_url: Optional[str] = None  # Support for both naming conventions
     
+    # Connection Pool Settings
+    mongo_min_pool_size: int = 0
+    mongo_max_pool_size: int = 100
+    mongo_max_idle_time_ms: Optional[int] = None  # Close pooled connections idle this long
+    mongo_wait_queue_timeout_ms: Optional[int] = 5000  # Fail a request instead of queueing forever for a connection
+    mongo_server_selection_timeout_ms: int = 30000
+    mongo_compressors: str = ""  # e.g. "zstd,snappy,zlib"; zstd/snappy need the zstandard/python-snappy packages
+    analytics_separate_pool: bool = True  # Give analytics its own client so aggregations can't exhaust the CRUD pool
+    analytics_max_pool_size: int = 10
+    
+    # Read Routing (replica sets): "primary", "primaryPreferred", "secondary", "secondaryPreferred" or "nearest"
+    analytics_read_preference: str = "primary"  # /analytics endpoints
+    list_read_preference: str = "primary"  # Paginated list endpoints
+    export_read_preference: str = "primary"  # /export endpoints
+    read_max_staleness_seconds: Optional[int] = None  # Skip secondaries lagging more than this (minimum 90)
+    
     # Security Settings
     secret_key: str = "your-secret-key-here-change-in-production-2025-dogtorvet"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 240
     refresh_token_expire_days: int = 7
+    password_hash_workers: int = 4  # Threads available for bcrypt hashing/verification
+    token_cache_ttl_seconds: int = 300  # Upper bound; entries never outlive the token's exp
+    token_cache_max_size: int = 4096
+    
+    # Query Settings
+    list_join_mode: str = "loader"  # "loader" (batched $in lookups) or "lookup" (server-side $lookup)
+    count_cache_ttl_seconds: int = 30
+    count_cache_max_size: int = 256
+    user_cache_ttl_seconds: int = 60  # 0 disables the authenticated-user cache
+    user_cache_max_size: int = 1024
+    analytics_max_concurrency: int = 8  # Analytics queries in flight per request
+    analytics_cache_ttl_seconds: int = 60  # 0 disables the /analytics response cache
+    analytics_cache_stale_seconds: int = 300  # Serve stale responses this long while refreshing
+    analytics_cache_max_size: int = 64
+    use_transactions: bool = False  # Wrap multi-document writes in a transaction (requires a replica set)
+    bulk_import_batch_size: int = 500  # Rows validated and inserted per insert_many
+    bulk_import_max_errors: int = 1000  # Per-row errors reported by a bulk import
+    export_batch_size: int = 1000  # Rows fetched and encoded per chunk by /export endpoints
+    reference_data_version_ttl_seconds: int = 5  # How long a process trusts its catalog versions before re-reading them
+    reference_data_cache_ttl_seconds: int = 3600  # Upper bound on serving /reference-data without reloading
+    catalog_cache_refresh_seconds: int = 60  # Reload interval of the in-process catalog cache; 0 disables it
+    
+    # Migrations
+    run_migrations_on_startup: bool = True
+    ensure_indexes_on_startup: bool = True
+    
+    # Background Jobs
+    schema_validation_interval_minutes: int = 60  # 0 disables the schema validation job
+    invoice_reconcile_interval_minutes: int = 360  # 0 disables invoice totals reconciliation
+    rollup_rebuild_interval_minutes: int = 1440  # 0 disables the daily rollup rebuild
+    rollup_rebuild_days: int = 7  # Days of rollups recomputed by each rebuild
+    
+    # Logging
+    log_level: str = "INFO"
+    log_format: str = "text"  # "text" or "json"
+    log_levels: str = ""  # Per-module overrides, e.g. "app.api.v1.invoices=DEBUG,pymongo=WARNING"
+    
+    # Metrics
+    metrics_enabled: bool = True  # Command monitoring, Server-Timing headers and /metrics
+    metrics_track_bytes: bool = True  # Measure reply sizes (re-encodes each reply)
+    metrics_token: Optional[str] = None  # Bearer token for scrapers; admins can always read /metrics
     
     # CORS Settings
     allowed_origins: List[str] = [
@@ -50,6 +112,21 @@ class Settings(BaseSettings):
     root_user_email: Optional[str] = None
     root_user_password: Optional[str] = None
     
+    @field_validator("analytics_read_preference", "list_read_preference", "export_read_preference")
+    @classmethod
+    def check_read_preference(cls, value: str) -> str:
+        if value not in READ_PREFERENCE_MODES:
+            raise ValueError(f"must be one of {', '.join(READ_PREFERENCE_MODES)}")
+        return value
+    
+    @field_validator("read_max_staleness_seconds")
+    @classmethod
+    def check_max_staleness(cls, value: Optional[int]) -> Optional[int]:
+        # MongoDB rejects maxStalenessSeconds below 90
+        if value is not None and value < 90:
+            raise ValueError("must be at least 90 seconds")
+        return value
+    
     class Config:
         env_file = ".env"
         case_sensitive = False
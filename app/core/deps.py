@@ -1,7 +1,10 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional
+import hmac
 
+from app.core.cache import TTLCache
+from app.core.config import settings
 from app.core.security import decode_token
 from app.db.database import database, COLLECTIONS
 from app.crud import user_crud
@@ -10,6 +13,29 @@ from app.schemas.user import UserDB, TokenData
 
 security = HTTPBearer()
 
+# Authenticated users keyed by token subject (email)
+user_cache = TTLCache(max_size=settings.user_cache_max_size, ttl=settings.user_cache_ttl_seconds)
+
+
+def invalidate_cached_user(*emails: Optional[str]):
+    """Drop cached users so the next request reloads them from the database."""
+    for email in emails:
+        if email:
+            user_cache.pop(email)
+
+
+async def get_user_by_subject(email: str) -> Optional[UserDB]:
+    """Get the user for a token subject, served from the user cache when fresh."""
+    user = user_cache.get(email)
+    if user is not None:
+        return user
+    
+    collection = database.get_collection(COLLECTIONS["users"])
+    user = await user_crud.get_by_email(collection, email=email)
+    if user is not None:
+        user_cache.set(email, user)
+    return user
+
 
 def check_database_connection():
     """Check if database is connected and raise error if not."""
@@ -32,7 +58,7 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     
     try:
         token = credentials.credentials
-        payload = decode_token(token)
+        payload = await decode_token(token)
         if payload is None:
             raise credentials_exception
         
@@ -44,9 +70,7 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     except Exception:
         raise credentials_exception
     
-    # Get user from database
-    collection = database.get_collection(COLLECTIONS["users"])
-    user = await user_crud.get_by_email(collection, email=token_data.email)
+    user = await get_user_by_subject(token_data.email)
     if user is None:
         raise credentials_exception
     
@@ -78,7 +102,7 @@ async def get_current_user_optional(credentials: Optional[HTTPAuthorizationCrede
     
     try:
         token = credentials.credentials
-        payload = decode_token(token)
+        payload = await decode_token(token)
         if payload is None:
             return None
         
@@ -86,9 +110,22 @@ async def get_current_user_optional(credentials: Optional[HTTPAuthorizationCrede
         if email is None:
             return None
         
-        # Get user from database
-        collection = database.get_collection(COLLECTIONS["users"])
-        user = await user_crud.get_by_email(collection, email=email)
-        return user
+        return await get_user_by_subject(email)
     except Exception:
-        return None 
\ No newline at end of file
+        return None 
+
+
+async def require_metrics_access(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False))
+):
+    """Allow the configured metrics token, otherwise require an active admin user."""
+    if credentials is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if settings.metrics_token and hmac.compare_digest(credentials.credentials, settings.metrics_token):
+        return
+    user = await get_current_user(credentials)
+    await get_current_admin_user(await get_current_active_user(user))
@@ -0,0 +1,98 @@
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+from typing import Dict, Optional
+import copy
+import json
+import logging
+
+from app.core.config import settings
+
+
+# Attributes every LogRecord has; anything else was passed via `extra=`
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+_listener: Optional[QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line, including `extra=` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class DeferredQueueHandler(QueueHandler):
+    """Enqueue records for the listener thread to format.
+
+    The stock QueueHandler formats each record, traceback included, on the
+    logging thread and drops `exc_info`. This one only merges the %-style
+    arguments into the message (so later changes to them do not show) and
+    leaves `exc_info` for the listener's formatter.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def parse_log_levels(spec: str) -> Dict[str, str]:
+    """Parse per-module levels, e.g. "app.api.v1.invoices=DEBUG,pymongo=WARNING"."""
+    levels = {}
+    for item in spec.split(","):
+        if "=" in item:
+            name, level = item.split("=", 1)
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def setup_logging():
+    """Route all logging through a queue drained by a background thread.
+
+    Handlers only enqueue records, so a slow stdout never blocks a request;
+    formatting happens on the listener thread. Messages use %-style
+    arguments, so disabled levels cost no formatting at all.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    handler = logging.StreamHandler()
+    if settings.log_format == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+    queue: SimpleQueue = SimpleQueue()
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(DeferredQueueHandler(queue))
+    root.setLevel(settings.log_level.upper())
+
+    for name, level in parse_log_levels(settings.log_levels).items():
+        logging.getLogger(name).setLevel(level)
+
+    _listener = QueueListener(queue, handler, respect_handler_level=True)
+    _listener.start()
+
+
+def stop_logging():
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
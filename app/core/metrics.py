@@ -0,0 +1,268 @@
+from bisect import bisect_left
+from collections import defaultdict
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import threading
+
+import bson
+from pymongo import monitoring
+
+from app.core.config import settings
+
+
+# Upper bounds for the "DB commands per request" histogram
+DB_COMMAND_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+
+
+class RequestStats:
+    """Database activity recorded for a single HTTP request."""
+
+    def __init__(self):
+        self.commands = 0
+        self.failures = 0
+        self.duration_ms = 0.0
+        self.documents = 0
+        self.bytes = 0
+        self.by_command: Dict[str, List[float]] = defaultdict(lambda: [0, 0.0])  # name -> [count, ms]
+        self._lock = threading.Lock()
+
+    def record(self, command: str, duration_ms: float, documents: int, size: int, failed: bool = False):
+        with self._lock:
+            self.commands += 1
+            self.failures += int(failed)
+            self.duration_ms += duration_ms
+            self.documents += documents
+            self.bytes += size
+            entry = self.by_command[command]
+            entry[0] += 1
+            entry[1] += duration_ms
+
+    def server_timing(self, total_ms: float) -> str:
+        """Render the stats as a Server-Timing header value."""
+        parts = [
+            f'db;dur={self.duration_ms:.1f};desc="{self.commands} commands, '
+            f'{self.documents} docs, {self.bytes} bytes"'
+        ]
+        for command, (count, ms) in sorted(self.by_command.items()):
+            parts.append(f'db-{command};dur={ms:.1f};desc="{count} calls"')
+        parts.append(f"total;dur={total_ms:.1f}")
+        return ", ".join(parts)
+
+
+request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def _documents_in_reply(reply: Dict[str, Any]) -> int:
+    cursor = reply.get("cursor")
+    if isinstance(cursor, dict):
+        batch = cursor.get("firstBatch", cursor.get("nextBatch"))
+        if batch is not None:
+            return len(batch)
+    if "value" in reply:  # findAndModify
+        return int(reply["value"] is not None)
+    return 0
+
+
+class Metrics:
+    """Process-wide counters rendered in Prometheus text format."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.db_commands: Dict[str, List[float]] = defaultdict(lambda: [0, 0, 0.0, 0, 0])  # count, failures, seconds, docs, bytes
+        self.http_requests: Dict[Tuple[str, str, int], int] = defaultdict(int)
+        self.http_duration: Dict[Tuple[str, str], List[float]] = defaultdict(lambda: [0, 0.0])
+        self.http_db_commands: Dict[Tuple[str, str], List[float]] = defaultdict(
+            lambda: [0] * (len(DB_COMMAND_BUCKETS) + 1) + [0]  # buckets..., +Inf, sum
+        )
+        # (client, server) -> [open, in use, waiting, checkouts, checkout failures]
+        self.pools: Dict[Tuple[str, str], List[int]] = defaultdict(lambda: [0, 0, 0, 0, 0])
+        self.pool_max_size: Dict[str, int] = {}
+
+    def record_command(self, command: str, seconds: float, documents: int, size: int, failed: bool):
+        with self._lock:
+            entry = self.db_commands[command]
+            entry[0] += 1
+            entry[1] += int(failed)
+            entry[2] += seconds
+            entry[3] += documents
+            entry[4] += size
+
+    def record_request(self, method: str, route: str, status: int, seconds: float, db_commands: int):
+        with self._lock:
+            self.http_requests[(method, route, status)] += 1
+            duration = self.http_duration[(method, route)]
+            duration[0] += 1
+            duration[1] += seconds
+            histogram = self.http_db_commands[(method, route)]
+            histogram[bisect_left(DB_COMMAND_BUCKETS, db_commands)] += 1
+            histogram[-1] += db_commands
+
+    def record_pool(self, client: str, address: Any, open: int = 0, in_use: int = 0, waiting: int = 0,
+                    checkouts: int = 0, failures: int = 0):
+        """Apply deltas to a connection pool's gauges and counters."""
+        with self._lock:
+            entry = self.pools[(client, _address(address))]
+            for i, delta in enumerate((open, in_use, waiting, checkouts, failures)):
+                entry[i] += delta
+
+    def reset_pool(self, client: str, address: Any):
+        """Forget a pool's connections after it is cleared or closed."""
+        with self._lock:
+            entry = self.pools[(client, _address(address))]
+            entry[0] = entry[1] = entry[2] = 0
+
+    def render(self, caches: Optional[Dict[str, Any]] = None) -> str:
+        """Render all metrics, plus stats for the given caches, as Prometheus text."""
+        lines: List[str] = []
+
+        def family(name: str, kind: str, help_text: str, samples: Iterable[Tuple[str, Any]]):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for suffix_labels, value in samples:
+                lines.append(f"{name}{suffix_labels} {value}")
+
+        with self._lock:
+            commands = sorted(self.db_commands.items())
+            family("mongodb_commands_total", "counter", "MongoDB commands issued.",
+                   ((_labels(command=c), e[0]) for c, e in commands))
+            family("mongodb_command_failures_total", "counter", "MongoDB commands that failed.",
+                   ((_labels(command=c), e[1]) for c, e in commands))
+            family("mongodb_command_seconds_total", "counter", "Time spent in MongoDB commands.",
+                   ((_labels(command=c), round(e[2], 6)) for c, e in commands))
+            family("mongodb_documents_returned_total", "counter", "Documents returned by MongoDB.",
+                   ((_labels(command=c), e[3]) for c, e in commands))
+            family("mongodb_reply_bytes_total", "counter", "BSON bytes received from MongoDB.",
+                   ((_labels(command=c), e[4]) for c, e in commands))
+
+            family("http_requests_total", "counter", "HTTP requests handled.",
+                   ((_labels(method=m, route=r, status=s), n) for (m, r, s), n in sorted(self.http_requests.items())))
+
+            durations = sorted(self.http_duration.items())
+            lines.append("# HELP http_request_duration_seconds Time spent handling HTTP requests.")
+            lines.append("# TYPE http_request_duration_seconds summary")
+            for (method, route), (count, seconds) in durations:
+                lines.append(f"http_request_duration_seconds_sum{_labels(method=method, route=route)} {round(seconds, 6)}")
+                lines.append(f"http_request_duration_seconds_count{_labels(method=method, route=route)} {count}")
+
+            lines.append("# HELP http_request_db_commands MongoDB commands issued per HTTP request.")
+            lines.append("# TYPE http_request_db_commands histogram")
+            for (method, route), histogram in sorted(self.http_db_commands.items()):
+                cumulative = 0
+                for bound, count in zip(list(DB_COMMAND_BUCKETS) + ["+Inf"], histogram[:-1]):
+                    cumulative += count
+                    lines.append(f"http_request_db_commands_bucket{_labels(method=method, route=route, le=bound)} {cumulative}")
+                lines.append(f"http_request_db_commands_sum{_labels(method=method, route=route)} {histogram[-1]}")
+                lines.append(f"http_request_db_commands_count{_labels(method=method, route=route)} {cumulative}")
+
+            pools = sorted(self.pools.items())
+            family("mongodb_pool_connections", "gauge", "Open connections per MongoDB connection pool.",
+                   ((_labels(client=c, server=a), e[0]) for (c, a), e in pools))
+            family("mongodb_pool_connections_in_use", "gauge", "Connections checked out of the pool.",
+                   ((_labels(client=c, server=a), e[1]) for (c, a), e in pools))
+            family("mongodb_pool_wait_queue", "gauge", "Requests waiting for a pooled connection.",
+                   ((_labels(client=c, server=a), e[2]) for (c, a), e in pools))
+            family("mongodb_pool_checkouts_total", "counter", "Connections checked out of the pool.",
+                   ((_labels(client=c, server=a), e[3]) for (c, a), e in pools))
+            family("mongodb_pool_checkout_failures_total", "counter",
+                   "Connection checkouts that failed (e.g. wait queue timeout).",
+                   ((_labels(client=c, server=a), e[4]) for (c, a), e in pools))
+            family("mongodb_pool_max_size", "gauge", "Configured maximum connections per server.",
+                   ((_labels(client=c), size) for c, size in sorted(self.pool_max_size.items())))
+
+        if caches:
+            stats = {name: cache.stats() for name, cache in caches.items()}
+            family("cache_entries", "gauge", "Entries held by in-process caches.",
+                   ((_labels(cache=name), s["size"]) for name, s in stats.items()))
+            family("cache_hits_total", "counter", "In-process cache hits.",
+                   ((_labels(cache=name), s["hits"]) for name, s in stats.items()))
+            family("cache_misses_total", "counter", "In-process cache misses.",
+                   ((_labels(cache=name), s["misses"]) for name, s in stats.items()))
+
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _address(address: Any) -> str:
+    if isinstance(address, tuple):
+        return ":".join(str(part) for part in address)
+    return str(address)
+
+
+def _labels(**labels: Any) -> str:
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+metrics = Metrics()
+
+
+class CommandMetricsListener(monitoring.CommandListener):
+    """Record every MongoDB command in the process metrics and the current request's stats.
+
+    Motor runs pymongo calls on an executor with a copy of the caller's
+    context, so `request_stats` still points at the originating request here.
+    """
+
+    def started(self, event: monitoring.CommandStartedEvent):
+        pass
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent):
+        documents = _documents_in_reply(event.reply)
+        size = len(bson.encode(event.reply)) if settings.metrics_track_bytes else 0
+        self._record(event.command_name, event.duration_micros, documents, size, failed=False)
+
+    def failed(self, event: monitoring.CommandFailedEvent):
+        self._record(event.command_name, event.duration_micros, 0, 0, failed=True)
+
+    @staticmethod
+    def _record(command: str, duration_micros: int, documents: int, size: int, failed: bool):
+        metrics.record_command(command, duration_micros / 1_000_000, documents, size, failed)
+        stats = request_stats.get()
+        if stats is not None:
+            stats.record(command, duration_micros / 1000, documents, size, failed)
+
+
+command_listener = CommandMetricsListener()
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """Track open, in-use and waiting connections for one client's pools."""
+
+    def __init__(self, client: str, max_pool_size: int):
+        self.client = client
+        metrics.pool_max_size[client] = max_pool_size
+
+    def pool_created(self, event):
+        metrics.record_pool(self.client, event.address)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        metrics.reset_pool(self.client, event.address)
+
+    def connection_created(self, event):
+        metrics.record_pool(self.client, event.address, open=1)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        metrics.record_pool(self.client, event.address, open=-1)
+
+    def connection_check_out_started(self, event):
+        metrics.record_pool(self.client, event.address, waiting=1)
+
+    def connection_check_out_failed(self, event):
+        metrics.record_pool(self.client, event.address, waiting=-1, failures=1)
+
+    def connection_checked_out(self, event):
+        metrics.record_pool(self.client, event.address, waiting=-1, in_use=1, checkouts=1)
+
+    def connection_checked_in(self, event):
+        metrics.record_pool(self.client, event.address, in_use=-1)
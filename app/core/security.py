@@ -1,13 +1,26 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Union
+from typing import Dict, Optional, Union
+import asyncio
+import hashlib
+import time
 from jose import jwt
 from passlib.context import CryptContext
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.db.database import database, COLLECTIONS
 
 
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt is deliberately slow; run it on a bounded pool so a burst of logins
+# queues here instead of blocking the event loop for every other request
+password_executor = ThreadPoolExecutor(
+    max_workers=settings.password_hash_workers,
+    thread_name_prefix="password-hash"
+)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash."""
@@ -19,6 +32,41 @@ def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the password hashing pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_executor, verify_password, plain_password, hashed_password)
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password on the password hashing pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_executor, hash_password, password)
+
+
+# Verified token payloads keyed by token digest
+token_cache = TTLCache(max_size=settings.token_cache_max_size, ttl=settings.token_cache_ttl_seconds)
+
+# Digests of tokens revoked by logout, kept until the token would expire anyway.
+# They are stored in MongoDB (a TTL index drops them after expiry) so every
+# worker sees them; this process's own revocations are also held here, with
+# their expiry, so its requests skip the lookup. Nothing is evicted early.
+revoked_tokens: Dict[str, float] = {}
+
+
+def token_digest(token: str) -> str:
+    """Digest used to key a token in the caches without storing the token itself."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _seconds_until_expiry(payload: dict) -> float:
+    """Seconds left before the token's `exp` claim."""
+    exp = payload.get("exp")
+    if exp is None:
+        return float(settings.token_cache_ttl_seconds)
+    return float(exp) - time.time()
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create JWT access token."""
     to_encode = data.copy()
@@ -42,12 +90,72 @@ def create_refresh_token(data: dict) -> str:
     return encoded_jwt
 
 
-def decode_token(token: str) -> Optional[dict]:
-    """Decode JWT token."""
+def _is_revoked_locally(digest: str) -> bool:
+    expires_at = revoked_tokens.get(digest)
+    if expires_at is None:
+        return False
+    if expires_at <= time.time():
+        del revoked_tokens[digest]
+        return False
+    return True
+
+
+async def _is_revoked(digest: str) -> bool:
+    """Whether any worker revoked the token, checking this process first."""
+    if _is_revoked_locally(digest):
+        return True
+    if not database.is_connected():
+        return False
+    collection = database.get_collection(COLLECTIONS["revoked_tokens"])
+    return await collection.find_one({"_id": digest}, {"_id": 1}) is not None
+
+
+async def decode_token(token: str) -> Optional[dict]:
+    """Decode JWT token, reusing the verified payload while it is cached.
+    
+    Revocations by other workers are checked when a token is verified, so a
+    payload this worker has cached stays valid for at most the token cache TTL.
+    """
+    digest = token_digest(token)
+    if _is_revoked_locally(digest):
+        return None
+    
+    payload = token_cache.get(digest)
+    if payload is not None:
+        return payload
+    
     try:
         payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
-        return payload
     except jwt.ExpiredSignatureError:
         return None
-    except jwt.InvalidTokenError:
-        return None 
\ No newline at end of file
+    except jwt.JWTError:
+        return None
+    
+    if await _is_revoked(digest):
+        return None
+    
+    token_cache.set(digest, payload, ttl=min(settings.token_cache_ttl_seconds, _seconds_until_expiry(payload)))
+    return payload
+
+
+async def revoke_token(token: str) -> bool:
+    """Revoke a valid token so decode_token rejects it until it expires."""
+    payload = await decode_token(token)
+    if payload is None:
+        return False
+    
+    digest = token_digest(token)
+    token_cache.pop(digest)
+    expires_at = time.time() + _seconds_until_expiry(payload)
+    # Drop lapsed local entries here rather than capping the store
+    for lapsed in [key for key, expiry in revoked_tokens.items() if expiry <= time.time()]:
+        del revoked_tokens[lapsed]
+    revoked_tokens[digest] = expires_at
+    
+    collection = database.get_collection(COLLECTIONS["revoked_tokens"])
+    await collection.update_one(
+        {"_id": digest},
+        {"$set": {"expires_at": datetime.utcfromtimestamp(expires_at)}},
+        upsert=True
+    )
+    return True
@@ -14,7 +14,7 @@ class CRUDAllergy(CRUDBase[AllergyDB, AllergyCreate, AllergyUpdate]):
         if not ObjectId.is_valid(pet_id):
             return []
         
-        cursor = collection.find({"pet_id": pet_id, "status": True})
+        cursor = collection.find({"pet_id": ObjectId(pet_id), "status": True})
         documents = await cursor.to_list(length=None)
         return [AllergyDB(**doc) for doc in documents]
     
@@ -35,7 +35,7 @@ class CRUDAllergy(CRUDBase[AllergyDB, AllergyCreate, AllergyUpdate]):
         if not ObjectId.is_valid(pet_id):
             return None
         
-        document = await collection.find_one({"pet_id": pet_id, "allergen": allergen, "status": True})
+        document = await collection.find_one({"pet_id": ObjectId(pet_id), "allergen": allergen, "status": True})
         if document:
             return AllergyDB(**document)
         return None
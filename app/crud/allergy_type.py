@@ -3,10 +3,10 @@ from motor.motor_asyncio import AsyncIOMotorCollection
 from bson import ObjectId
 
 from app.schemas.allergy_type import AllergyTypeDB, AllergyTypeCreate, AllergyTypeUpdate
-from .base import CRUDBase
+from .catalog import CRUDCatalog
 
 
-class CRUDAllergyType(CRUDBase[AllergyTypeDB, AllergyTypeCreate, AllergyTypeUpdate]):
+class CRUDAllergyType(CRUDCatalog[AllergyTypeDB, AllergyTypeCreate, AllergyTypeUpdate]):
     """CRUD operations for AllergyType."""
     
     async def get_by_name(self, collection: AsyncIOMotorCollection, name: str) -> Optional[AllergyTypeDB]:
@@ -21,4 +21,4 @@ class CRUDAllergyType(CRUDBase[AllergyTypeDB, AllergyTypeCreate, AllergyTypeUpda
 
 
 # Create instance
-allergy_type_crud = CRUDAllergyType(AllergyTypeDB) 
\ No newline at end of file
+allergy_type_crud = CRUDAllergyType(AllergyTypeDB, "allergies") 
\ No newline at end of file
@@ -15,7 +15,7 @@ class CRUDAppointment(CRUDBase[AppointmentDB, AppointmentCreate, AppointmentUpda
         if not ObjectId.is_valid(client_id):
             return []
         
-        cursor = collection.find({"client_id": client_id, "status": True})
+        cursor = collection.find({"client_id": ObjectId(client_id), "status": True})
         documents = await cursor.to_list(length=None)
         return [AppointmentDB(**doc) for doc in documents]
     
@@ -24,7 +24,7 @@ class CRUDAppointment(CRUDBase[AppointmentDB, AppointmentCreate, AppointmentUpda
         if not ObjectId.is_valid(pet_id):
             return []
         
-        cursor = collection.find({"pet_id": pet_id, "status": True})
+        cursor = collection.find({"pet_id": ObjectId(pet_id), "status": True})
         documents = await cursor.to_list(length=None)
         return [AppointmentDB(**doc) for doc in documents]
     
@@ -33,7 +33,7 @@ class CRUDAppointment(CRUDBase[AppointmentDB, AppointmentCreate, AppointmentUpda
         if not ObjectId.is_valid(veterinarian_id):
             return []
         
-        cursor = collection.find({"veterinarian_id": veterinarian_id, "status": True})
+        cursor = collection.find({"veterinarian_id": ObjectId(veterinarian_id), "status": True})
         documents = await cursor.to_list(length=None)
         return [AppointmentDB(**doc) for doc in documents]
     
@@ -42,7 +42,7 @@ class CRUDAppointment(CRUDBase[AppointmentDB, AppointmentCreate, AppointmentUpda
         if not ObjectId.is_valid(service_id):
             return []
         
-        cursor = collection.find({"service_id": service_id, "status": True})
+        cursor = collection.find({"service_id": ObjectId(service_id), "status": True})
         documents = await cursor.to_list(length=None)
         return [AppointmentDB(**doc) for doc in documents]
     
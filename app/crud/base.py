@@ -1,16 +1,48 @@
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+import logging
+from typing import Any, Dict, Generic, Iterable, List, Optional, Sequence, Tuple, Type, TypeVar, Union
 from pydantic import BaseModel
 from motor.motor_asyncio import AsyncIOMotorCollection
 from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError
 from datetime import datetime, timezone, date, time
 from decimal import Decimal
 
-from app.schemas.base import BaseDBSchema
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.schemas.base import BaseDBSchema, partial_model
+
+logger = logging.getLogger(__name__)
 
 ModelType = TypeVar("ModelType", bound=BaseDBSchema)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
+# Shared cache for CRUDBase.count(mode="cached")
+count_cache = TTLCache(max_size=settings.count_cache_max_size, ttl=settings.count_cache_ttl_seconds)
+
+
+def as_stored(value: Any) -> Any:
+    """Return a document as MongoDB would hand it back after inserting it.
+    
+    BSON datetimes are naive UTC with millisecond precision, so models built
+    from an inserted document match those built from a re-read.
+    """
+    if isinstance(value, dict):
+        return {key: as_stored(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [as_stored(item) for item in value]
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value.replace(microsecond=value.microsecond // 1000 * 1000)
+    return value
+
+
+def projection(fields: Iterable[str]) -> Dict[str, int]:
+    """MongoDB projection for model field names ("id" is stored as `_id`)."""
+    return {"_id" if field == "id" else field: 1 for field in fields}
+
 
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     """Base CRUD operations."""
@@ -28,7 +60,7 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             try:
                 return self.model(**document)
             except Exception as e:
-                print(f"⚠️ Invalid document found for ID {id}: {e}")
+                logger.warning("⚠️ Invalid document found for ID %s: %s", id, e)
                 return None
         return None
     
@@ -37,9 +69,14 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         collection: AsyncIOMotorCollection, 
         skip: int = 0, 
         limit: int = 100,
-        filters: Optional[Dict[str, Any]] = None
+        filters: Optional[Dict[str, Any]] = None,
+        fields: Optional[Sequence[str]] = None
     ) -> List[ModelType]:
-        """Get multiple records."""
+        """Get multiple records.
+        
+        With `fields`, only those fields are fetched and the records are
+        lightweight partial models (see `to_models`).
+        """
         query = {}
         if filters:
             # Convert string IDs to ObjectId for MongoDB queries
@@ -51,25 +88,33 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
                     processed_filters[key] = value
             query.update(processed_filters)
         
-        cursor = collection.find(query).skip(skip).limit(limit)
+        cursor = collection.find(query, projection(fields) if fields else None).skip(skip).limit(limit)
         documents = await cursor.to_list(length=limit)
+        return self.to_models(documents, fields)
+    
+    def to_models(self, documents: List[Dict[str, Any]], fields: Optional[Sequence[str]] = None) -> List[ModelType]:
+        """Build models from raw documents, skipping invalid ones.
         
+        Projected documents pass the projected `fields`; they are validated
+        against a partial model holding just those fields.
+        """
+        model = partial_model(self.model, tuple(sorted(fields))) if fields else self.model
         # Filter out invalid documents that don't have required fields
         valid_documents = []
         for doc in documents:
             try:
                 # Try to create the model instance
-                model_instance = self.model(**doc)
+                model_instance = model(**doc)
                 valid_documents.append(model_instance)
             except Exception as e:
                 # Log the invalid document and skip it
-                print(f"⚠️ Skipping invalid document: {e}")
+                logger.warning("⚠️ Skipping invalid document: %s", e)
                 continue
         
         return valid_documents
     
-    async def create(self, collection: AsyncIOMotorCollection, obj_in: CreateSchemaType) -> ModelType:
-        """Create a new record."""
+    def prepare_document(self, obj_in: CreateSchemaType) -> Dict[str, Any]:
+        """Convert a create schema into the document stored in MongoDB."""
         obj_data = obj_in.model_dump()
         obj_data["created_at"] = datetime.now(timezone.utc)
         obj_data["updated_at"] = datetime.now(timezone.utc)
@@ -94,19 +139,54 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             if key in ["sku"] and (value is None or value == ""):
                 obj_data[key] = None
         
-        result = await collection.insert_one(obj_data)
-        created_document = await collection.find_one({"_id": result.inserted_id})
-        if created_document is not None:
-            return self.model(**created_document)
-        raise RuntimeError("Failed to create document")
+        return obj_data
+    
+    async def create(self, collection: AsyncIOMotorCollection, obj_in: CreateSchemaType) -> ModelType:
+        """Create a new record."""
+        obj_data = self.prepare_document(obj_in)
+        await collection.insert_one(obj_data)  # sets obj_data["_id"]
+        return self.model(**as_stored(obj_data))
+    
+    async def create_many(
+        self,
+        collection: AsyncIOMotorCollection,
+        objs_in: List[CreateSchemaType]
+    ) -> Tuple[List[Tuple[int, Dict[str, Any]]], Dict[int, str]]:
+        """Insert many records with one unordered `insert_many`.
+        
+        Rows that fail (e.g. duplicate keys) do not stop the others, and the
+        inserted documents are returned as written instead of being re-read.
+        Returns ([(index, document)], {index: error}) keyed by position in `objs_in`.
+        """
+        if not objs_in:
+            return [], {}
+        documents = [self.prepare_document(obj_in) for obj_in in objs_in]
+        errors: Dict[int, str] = {}
+        try:
+            await collection.insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                errors[error["index"]] = error.get("errmsg", "Write error")
+        
+        created = [
+            (index, document)
+            for index, document in enumerate(documents)
+            if index not in errors and "_id" in document
+        ]
+        return created, errors
     
     async def update(
         self, 
         collection: AsyncIOMotorCollection, 
         id: str, 
-        obj_in: Union[UpdateSchemaType, Dict[str, Any]]
-    ) -> Optional[ModelType]:
-        """Update a record."""
+        obj_in: Union[UpdateSchemaType, Dict[str, Any]],
+        changed_only: bool = False
+    ) -> Optional[Union[ModelType, Dict[str, Any]]]:
+        """Update a record and return it as stored after the update.
+        
+        Uses a single `find_one_and_update`. With `changed_only`, only the
+        updated fields (plus `_id`) are returned, as a raw document.
+        """
         if not ObjectId.is_valid(id):
             return None
         
@@ -117,7 +197,12 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         
         if update_data:
             update_data["updated_at"] = datetime.now(timezone.utc)
-            
+
+            # Convert string IDs to ObjectId, as prepare_document does on create
+            for key, value in update_data.items():
+                if key.endswith('_id') and isinstance(value, str) and ObjectId.is_valid(value):
+                    update_data[key] = ObjectId(value)
+
             # Convert Decimal objects to float for MongoDB compatibility
             for key, value in update_data.items():
                 if hasattr(value, '__class__') and value.__class__.__name__ == 'Decimal':
@@ -127,15 +212,15 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
                 if key in ["sku"] and (value is None or value == ""):
                     update_data[key] = None
             
-            result = await collection.update_one(
-                {"_id": ObjectId(id)}, 
-                {"$set": update_data}
+            updated_document = await collection.find_one_and_update(
+                {"_id": ObjectId(id)},
+                {"$set": update_data},
+                projection={key: 1 for key in update_data} if changed_only else None,
+                return_document=ReturnDocument.AFTER
             )
             
-            if result.modified_count > 0:
-                updated_document = await collection.find_one({"_id": ObjectId(id)})
-                if updated_document is not None:
-                    return self.model(**updated_document)
+            if updated_document is not None:
+                return updated_document if changed_only else self.model(**updated_document)
         
         return None
     
@@ -151,25 +236,39 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         
         return result.modified_count > 0
     
-    async def count(self, collection: AsyncIOMotorCollection, filters: Optional[Dict[str, Any]] = None) -> int:
-        """Count valid records."""
+    async def count(
+        self,
+        collection: AsyncIOMotorCollection,
+        filters: Optional[Dict[str, Any]] = None,
+        mode: str = "exact"
+    ) -> int:
+        """Count records server-side.
+        
+        Modes:
+        - "exact": `count_documents` with the given filters.
+        - "estimated": collection metadata via `estimated_document_count`;
+          only used for unfiltered counts, otherwise falls back to exact.
+        - "cached": exact count memoised for `count_cache_ttl_seconds`.
+        
+        Schema validity is not checked here; see app.services.schema_validation.
+        """
         query = {}
         if filters:
             query.update(filters)
         
-        cursor = collection.find(query)
-        documents = await cursor.to_list(length=None)
+        if mode == "estimated" and not query:
+            return await collection.estimated_document_count()
         
-        # Count only valid documents
-        valid_count = 0
-        for doc in documents:
-            try:
-                self.model(**doc)
-                valid_count += 1
-            except Exception:
-                continue
+        if mode == "cached":
+            cache_key = (collection.full_name, repr(sorted(query.items())))
+            cached = count_cache.get(cache_key)
+            if cached is not None:
+                return cached
+            total = await collection.count_documents(query)
+            count_cache.set(cache_key, total)
+            return total
         
-        return valid_count
+        return await collection.count_documents(query)
     
     async def exists(self, collection: AsyncIOMotorCollection, id: str) -> bool:
         """Check if record exists and is valid."""
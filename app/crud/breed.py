@@ -3,10 +3,10 @@ from motor.motor_asyncio import AsyncIOMotorCollection
 from bson import ObjectId
 
 from app.schemas.breed import BreedDB, BreedCreate, BreedUpdate
-from .base import CRUDBase
+from .catalog import CRUDCatalog
 
 
-class CRUDBreed(CRUDBase[BreedDB, BreedCreate, BreedUpdate]):
+class CRUDBreed(CRUDCatalog[BreedDB, BreedCreate, BreedUpdate]):
     """CRUD operations for Breed."""
     
     async def get_by_species(self, collection: AsyncIOMotorCollection, species_id: str) -> List[BreedDB]:
@@ -38,4 +38,4 @@ class CRUDBreed(CRUDBase[BreedDB, BreedCreate, BreedUpdate]):
 
 
 # Create instance
-breed_crud = CRUDBreed(BreedDB) 
\ No newline at end of file
+breed_crud = CRUDBreed(BreedDB, "breeds") 
\ No newline at end of file
@@ -0,0 +1,56 @@
+from typing import Any, Dict, List, Optional, Tuple, Type, Union
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+from app.services.catalog_cache import catalog_cache
+from app.services.reference_data import bump_version
+from .base import CRUDBase, ModelType, CreateSchemaType, UpdateSchemaType
+
+
+class CRUDCatalog(CRUDBase[ModelType, CreateSchemaType, UpdateSchemaType]):
+    """CRUD operations for small reference catalogs (species, services, ...).
+    
+    Every successful write bumps the catalog's version, which invalidates
+    /reference-data, and refreshes the written documents in the catalog
+    cache. `catalog` is the catalog's COLLECTIONS key.
+    """
+    
+    def __init__(self, model: Type[ModelType], catalog: str):
+        super().__init__(model)
+        self.catalog = catalog
+    
+    async def _written(self, ids: List[Any]):
+        await bump_version(self.catalog)
+        await catalog_cache.refresh_documents(self.catalog, ids)
+    
+    async def create(self, collection: AsyncIOMotorCollection, obj_in: CreateSchemaType) -> ModelType:
+        created = await super().create(collection, obj_in)
+        await self._written([created.id])
+        return created
+    
+    async def create_many(
+        self,
+        collection: AsyncIOMotorCollection,
+        objs_in: List[CreateSchemaType]
+    ) -> Tuple[List[Tuple[int, Dict[str, Any]]], Dict[int, str]]:
+        created, errors = await super().create_many(collection, objs_in)
+        if created:
+            await self._written([document["_id"] for _, document in created])
+        return created, errors
+    
+    async def update(
+        self,
+        collection: AsyncIOMotorCollection,
+        id: str,
+        obj_in: Union[UpdateSchemaType, Dict[str, Any]],
+        changed_only: bool = False
+    ) -> Optional[Union[ModelType, Dict[str, Any]]]:
+        updated = await super().update(collection, id, obj_in, changed_only=changed_only)
+        if updated is not None:
+            await self._written([id])
+        return updated
+    
+    async def delete(self, collection: AsyncIOMotorCollection, id: str) -> bool:
+        deleted = await super().delete(collection, id)
+        if deleted:
+            await self._written([id])
+        return deleted
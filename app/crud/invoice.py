@@ -1,8 +1,17 @@
+import logging
 from typing import List, Optional
 from motor.motor_asyncio import AsyncIOMotorCollection
 from bson import ObjectId
+from pymongo import ReturnDocument
 from datetime import datetime
 from app.schemas.invoice import InvoiceCreate, InvoiceUpdate, InvoiceDB, InvoiceItemCreate, InvoiceItemUpdate, InvoiceItemDB
+from app.services.counters import allocate_invoice_numbers
+from app.services.search import INVOICE_SEARCH_SOURCES, build_invoice_search_text, refresh_invoice_search
+
+logger = logging.getLogger(__name__)
+
+# References stored as ObjectId
+REFERENCE_FIELDS = ['client_id', 'pet_id']
 
 class CRUDInvoice:
     async def create(self, collection: AsyncIOMotorCollection, invoice_data: InvoiceCreate) -> InvoiceDB:
@@ -11,29 +20,9 @@ class CRUDInvoice:
             invoice_doc = invoice_data.model_dump(exclude_unset=True)
             
             # Auto-generate invoice number with format INV-00YYMM{AUTONUMBER}
-            # Auto number resets each month
-            month_prefix = f'INV-00{now.strftime("%y%m")}'  # YYMM format for monthly reset
-            
-            print(f"🔍 Generating invoice number with prefix: {month_prefix}")
-            
-            # Find the last invoice number for this month
-            last_invoice = await collection.find_one(
-                {'invoice_number': {'$regex': f'^{month_prefix}'}}, 
-                sort=[('invoice_number', -1)]
-            )
-            
-            if last_invoice and last_invoice.get('invoice_number'):
-                # Extract the auto number from the last invoice
-                last_number_str = last_invoice['invoice_number'].replace(month_prefix, '')
-                if last_number_str.isdigit():
-                    auto_number = int(last_number_str) + 1
-                else:
-                    auto_number = 1
-            else:
-                auto_number = 1
-            
-            invoice_number = f'{month_prefix}{str(auto_number).zfill(3)}'
-            print(f"🔍 Generated invoice number: {invoice_number}")
+            # from the per-month counter; the auto number resets each month
+            invoice_number = (await allocate_invoice_numbers(1, now))[0]
+            logger.debug("🔍 Generated invoice number: %s", invoice_number)
             
             # Ensure invoice_number is never null
             if not invoice_number:
@@ -49,6 +38,10 @@ class CRUDInvoice:
                     item_total = item.unit_price * item.quantity * (1 - item.discount_percent / 100)
                     subtotal += item_total
             
+            # Embedded items are returned as InvoiceItemDB, which needs an id
+            for item in invoice_doc.get('items') or []:
+                item.setdefault('id', str(ObjectId()))
+
             invoice_doc['subtotal'] = subtotal
             invoice_doc['total'] = subtotal * (1 - invoice_data.discount_percent / 100)
             
@@ -59,8 +52,12 @@ class CRUDInvoice:
             invoice_doc['created_at'] = now
             invoice_doc['updated_at'] = now
             invoice_doc['status'] = True
+            for key in REFERENCE_FIELDS:
+                if invoice_doc.get(key):
+                    invoice_doc[key] = ObjectId(invoice_doc[key])
+            invoice_doc['search_text'] = await build_invoice_search_text(invoice_doc)
             
-            print(f"🔍 Invoice doc before insert: {invoice_doc}")
+            logger.debug("🔍 Invoice doc before insert: %s", invoice_doc)
             
             # Insert invoice
             result = await collection.insert_one(invoice_doc)
@@ -72,13 +69,11 @@ class CRUDInvoice:
                 if key in invoice_doc and isinstance(invoice_doc[key], ObjectId):
                     invoice_doc[key] = str(invoice_doc[key])
             
-            print(f"🔍 Invoice doc after insert: {invoice_doc}")
+            logger.debug("🔍 Invoice doc after insert: %s", invoice_doc)
             
             return InvoiceDB(**invoice_doc)
         except Exception as e:
-            print(f"❌ Error in CRUD create: {e}")
-            import traceback
-            print(f"❌ CRUD Traceback: {traceback.format_exc()}")
+            logger.exception("❌ Error in CRUD create: %s", e)
             raise e
 
     async def get(self, collection: AsyncIOMotorCollection, invoice_id: str, include_deleted: bool = False) -> Optional[InvoiceDB]:
@@ -88,6 +83,9 @@ class CRUDInvoice:
         doc = await collection.find_one(filters)
         if not doc:
             return None
+        return self._to_model(doc)
+
+    def _to_model(self, doc: dict) -> InvoiceDB:
         doc['id'] = str(doc['_id'])
         for key in ['_id', 'id', 'client_id', 'pet_id']:
             if key in doc and isinstance(doc[key], ObjectId):
@@ -110,8 +108,20 @@ class CRUDInvoice:
     async def update(self, collection: AsyncIOMotorCollection, invoice_id: str, invoice_update: InvoiceUpdate) -> Optional[InvoiceDB]:
         update_data = invoice_update.model_dump(exclude_unset=True)
         update_data['updated_at'] = datetime.utcnow()
-        await collection.update_one({'_id': ObjectId(invoice_id)}, {'$set': update_data})
-        return await self.get(collection, invoice_id)
+        for key in REFERENCE_FIELDS:
+            if update_data.get(key):
+                update_data[key] = ObjectId(update_data[key])
+        doc = await collection.find_one_and_update(
+            {'_id': ObjectId(invoice_id)},
+            {'$set': update_data},
+            return_document=ReturnDocument.AFTER
+        )
+        if any(key in update_data for key in INVOICE_SEARCH_SOURCES):
+            await refresh_invoice_search({'_id': ObjectId(invoice_id)})
+        # Deleted invoices are not returned, as with get()
+        if not doc or not doc.get('status'):
+            return None
+        return self._to_model(doc)
 
     async def delete(self, collection: AsyncIOMotorCollection, invoice_id: str) -> bool:
         result = await collection.update_one({'_id': ObjectId(invoice_id)}, {'$set': {'status': False}})
@@ -1,13 +1,35 @@
-from typing import List, Optional
+import logging
+from typing import List, Optional, Sequence, Tuple
 from motor.motor_asyncio import AsyncIOMotorCollection
 from bson import ObjectId
+from pymongo import ReturnDocument
 from datetime import datetime
+from app.crud.base import projection
+from app.schemas.base import partial_model
 from app.schemas.invoice import InvoiceItemCreate, InvoiceItemUpdate, InvoiceItemDB
 
+logger = logging.getLogger(__name__)
+
+# References stored as ObjectId
+REFERENCE_FIELDS = ['invoice_id', 'service_id', 'product_id']
+
+# Fields net_price is derived from
+PRICE_FIELDS = ['unit_price', 'quantity', 'discount_percent']
+
+# net_price as an aggregation expression (unit price x quantity less item discount)
+NET_PRICE_EXPRESSION = {
+    "$multiply": [
+        {"$ifNull": ["$unit_price", 0]},
+        {"$ifNull": ["$quantity", 0]},
+        {"$subtract": [1, {"$divide": [{"$ifNull": ["$discount_percent", 0]}, 100]}]}
+    ]
+}
+
 class CRUDInvoiceItem:
     async def create(self, collection: AsyncIOMotorCollection, item_data: InvoiceItemCreate, 
                     services_collection: AsyncIOMotorCollection = None, 
-                    products_collection: AsyncIOMotorCollection = None) -> InvoiceItemDB:
+                    products_collection: AsyncIOMotorCollection = None,
+                    session=None) -> InvoiceItemDB:
         now = datetime.utcnow()
         item_doc = item_data.model_dump(exclude_unset=True)
         
@@ -30,7 +52,7 @@ class CRUDInvoiceItem:
                         'snapshot_date': now.isoformat()
                     }
             except Exception as e:
-                print(f"⚠️ Warning: Could not capture service snapshot: {e}")
+                logger.warning("⚠️ Warning: Could not capture service snapshot: %s", e)
         
         if item_data.product_id and products_collection is not None:
             try:
@@ -48,13 +70,16 @@ class CRUDInvoiceItem:
                         'snapshot_date': now.isoformat()
                     }
             except Exception as e:
-                print(f"⚠️ Warning: Could not capture product snapshot: {e}")
+                logger.warning("⚠️ Warning: Could not capture product snapshot: %s", e)
         
         item_doc['created_at'] = now
         item_doc['updated_at'] = now
+        for key in REFERENCE_FIELDS:
+            if item_doc.get(key):
+                item_doc[key] = ObjectId(item_doc[key])
         
         # Insert item
-        result = await collection.insert_one(item_doc)
+        result = await collection.insert_one(item_doc, session=session)
         item_doc['_id'] = result.inserted_id
         item_doc['id'] = str(result.inserted_id)
         
@@ -65,53 +90,79 @@ class CRUDInvoiceItem:
         
         return InvoiceItemDB(**item_doc)
 
-    async def get(self, collection: AsyncIOMotorCollection, item_id: str) -> Optional[InvoiceItemDB]:
-        doc = await collection.find_one({'_id': ObjectId(item_id)})
+    async def get(self, collection: AsyncIOMotorCollection, item_id: str, session=None) -> Optional[InvoiceItemDB]:
+        doc = await collection.find_one({'_id': ObjectId(item_id)}, session=session)
         if not doc:
             return None
+        return self._to_model(doc)
+
+    def _to_model(self, doc: dict) -> InvoiceItemDB:
         doc['id'] = str(doc['_id'])
         for key in ['_id', 'id', 'invoice_id', 'service_id', 'product_id']:
             if key in doc and isinstance(doc[key], ObjectId):
                 doc[key] = str(doc[key])
         return InvoiceItemDB(**doc)
 
-    async def get_by_invoice(self, collection: AsyncIOMotorCollection, invoice_id: str) -> List[InvoiceItemDB]:
-        # Try both ObjectId and string formats for invoice_id
-        cursor = collection.find({'invoice_id': ObjectId(invoice_id)})
+    async def get_by_invoice(self, collection: AsyncIOMotorCollection, invoice_id: str,
+                             fields: Optional[Sequence[str]] = None) -> List[InvoiceItemDB]:
+        """Items of one invoice; with `fields`, only those are fetched (as partial models)."""
+        cursor = collection.find({'invoice_id': ObjectId(invoice_id)}, projection(fields) if fields else None)
         docs = await cursor.to_list(length=None)
-        
-        # If no items found with ObjectId, try with string
-        if not docs:
-            cursor = collection.find({'invoice_id': invoice_id})
-            docs = await cursor.to_list(length=None)
-        
+        return self.to_models(docs, fields)
+    
+    def to_models(self, docs: List[dict], fields: Optional[Sequence[str]] = None) -> List[InvoiceItemDB]:
+        """Build item models from raw documents, stringifying ObjectIds."""
+        model = partial_model(InvoiceItemDB, tuple(sorted(fields))) if fields else InvoiceItemDB
         result = []
         for doc in docs:
             doc['id'] = str(doc['_id'])
             for key in ['_id', 'id', 'invoice_id', 'service_id', 'product_id']:
                 if key in doc and isinstance(doc[key], ObjectId):
                     doc[key] = str(doc[key])
-            result.append(InvoiceItemDB(**doc))
+            result.append(model(**doc))
         return result
 
-    async def update(self, collection: AsyncIOMotorCollection, item_id: str, item_update: InvoiceItemUpdate) -> Optional[InvoiceItemDB]:
+    async def update(self, collection: AsyncIOMotorCollection, item_id: str, item_update: InvoiceItemUpdate,
+                     session=None) -> Optional[Tuple[InvoiceItemDB, InvoiceItemDB]]:
+        """Update an item and return (previous, updated).
+
+        The previous state comes from the write itself, so concurrent edits
+        each see the state they replaced; net_price is recalculated in the
+        same update when price, quantity or discount change.
+        """
+        if not ObjectId.is_valid(item_id):
+            return None
         update_data = item_update.model_dump(exclude_unset=True)
         update_data['updated_at'] = datetime.utcnow()
+        for key in REFERENCE_FIELDS:
+            if update_data.get(key):
+                update_data[key] = ObjectId(update_data[key])
         
-        # Recalculate net price if price, quantity, or discount changed
-        if any(key in update_data for key in ['unit_price', 'quantity', 'discount_percent']):
-            current_item = await self.get(collection, item_id)
-            if current_item:
-                unit_price = update_data.get('unit_price', current_item.unit_price)
-                quantity = update_data.get('quantity', current_item.quantity)
-                discount_percent = update_data.get('discount_percent', current_item.discount_percent)
-                update_data['net_price'] = unit_price * quantity * (1 - discount_percent / 100)
+        # Values are literals: strings starting with "$" must not read as field paths
+        pipeline = [{'$set': {key: {'$literal': value} for key, value in update_data.items()}}]
+        reprices = any(key in update_data for key in PRICE_FIELDS)
+        if reprices:
+            pipeline.append({'$set': {'net_price': NET_PRICE_EXPRESSION}})
         
-        await collection.update_one({'_id': ObjectId(item_id)}, {'$set': update_data})
-        return await self.get(collection, item_id)
+        previous = await collection.find_one_and_update(
+            {'_id': ObjectId(item_id)},
+            pipeline,
+            return_document=ReturnDocument.BEFORE,
+            session=session
+        )
+        if not previous:
+            return None
+        updated = {**previous, **update_data}
+        if reprices:
+            unit_price, quantity, discount_percent = (float(updated.get(key) or 0) for key in PRICE_FIELDS)
+            updated['net_price'] = unit_price * quantity * (1 - discount_percent / 100)
+        return self._to_model(previous), self._to_model(updated)
 
-    async def delete(self, collection: AsyncIOMotorCollection, item_id: str) -> bool:
-        result = await collection.delete_one({'_id': ObjectId(item_id)})
-        return result.deleted_count > 0
+    async def delete(self, collection: AsyncIOMotorCollection, item_id: str, session=None) -> Optional[InvoiceItemDB]:
+        """Delete an item and return it as it was when deleted."""
+        if not ObjectId.is_valid(item_id):
+            return None
+        doc = await collection.find_one_and_delete({'_id': ObjectId(item_id)}, session=session)
+        return self._to_model(doc) if doc else None
 
 invoice_items_crud = CRUDInvoiceItem() 
\ No newline at end of file
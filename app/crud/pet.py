@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Union
 from motor.motor_asyncio import AsyncIOMotorCollection
 from bson import ObjectId
 
@@ -6,15 +6,47 @@ from app.schemas.pet import PetDB, PetCreate, PetUpdate
 from .base import CRUDBase
 
 
+def normalize_nested_references(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert the allergy and vaccination references inside a pet to ObjectId.
+    
+    Top-level `*_id` fields are converted by CRUDBase; these nested ones are
+    not, so they are handled here (and by migration 3 for existing pets).
+    """
+    if data.get("allergies"):
+        data["allergies"] = [
+            ObjectId(value) if isinstance(value, str) and ObjectId.is_valid(value) else value
+            for value in data["allergies"]
+        ]
+    for record in data.get("vaccinations") or []:
+        value = record.get("vaccination_id") if isinstance(record, dict) else None
+        if isinstance(value, str) and ObjectId.is_valid(value):
+            record["vaccination_id"] = ObjectId(value)
+    return data
+
+
 class CRUDPet(CRUDBase[PetDB, PetCreate, PetUpdate]):
     """CRUD operations for Pet."""
     
+    def prepare_document(self, obj_in: PetCreate) -> Dict[str, Any]:
+        return normalize_nested_references(super().prepare_document(obj_in))
+    
+    async def update(
+        self,
+        collection: AsyncIOMotorCollection,
+        id: str,
+        obj_in: Union[PetUpdate, Dict[str, Any]],
+        changed_only: bool = False
+    ) -> Optional[Union[PetDB, Dict[str, Any]]]:
+        if not isinstance(obj_in, dict):
+            obj_in = obj_in.model_dump(exclude_unset=True)
+        return await super().update(collection, id, normalize_nested_references(obj_in), changed_only)
+    
     async def get_by_client(self, collection: AsyncIOMotorCollection, client_id: str) -> List[PetDB]:
         """Get pets by client ID."""
         if not ObjectId.is_valid(client_id):
             return []
         
-        cursor = collection.find({"client_id": client_id, "status": True})
+        cursor = collection.find({"client_id": ObjectId(client_id), "status": True})
         documents = await cursor.to_list(length=None)
         return [PetDB(**doc) for doc in documents]
     
@@ -23,7 +55,7 @@ class CRUDPet(CRUDBase[PetDB, PetCreate, PetUpdate]):
         if not ObjectId.is_valid(species_id):
             return []
         
-        cursor = collection.find({"species_id": species_id, "status": True})
+        cursor = collection.find({"species_id": ObjectId(species_id), "status": True})
         documents = await cursor.to_list(length=None)
         return [PetDB(**doc) for doc in documents]
     
@@ -32,7 +64,7 @@ class CRUDPet(CRUDBase[PetDB, PetCreate, PetUpdate]):
         if not ObjectId.is_valid(breed_id):
             return []
         
-        cursor = collection.find({"breed_id": breed_id, "status": True})
+        cursor = collection.find({"breed_id": ObjectId(breed_id), "status": True})
         documents = await cursor.to_list(length=None)
         return [PetDB(**doc) for doc in documents]
 
@@ -2,10 +2,10 @@ from typing import List, Optional
 from motor.motor_asyncio import AsyncIOMotorCollection
 
 from app.schemas.product import ProductDB, ProductCreate, ProductUpdate
-from .base import CRUDBase
+from .catalog import CRUDCatalog
 
 
-class CRUDProduct(CRUDBase[ProductDB, ProductCreate, ProductUpdate]):
+class CRUDProduct(CRUDCatalog[ProductDB, ProductCreate, ProductUpdate]):
     """CRUD operations for Product."""
     
     async def get_by_name(self, collection: AsyncIOMotorCollection, name: str) -> Optional[ProductDB]:
@@ -46,4 +46,4 @@ class CRUDProduct(CRUDBase[ProductDB, ProductCreate, ProductUpdate]):
 
 
 # Create instance
-product_crud = CRUDProduct(ProductDB) 
\ No newline at end of file
+product_crud = CRUDProduct(ProductDB, "products") 
\ No newline at end of file
@@ -2,10 +2,10 @@ from typing import List, Optional
 from motor.motor_asyncio import AsyncIOMotorCollection
 
 from app.schemas.service import ServiceDB, ServiceCreate, ServiceUpdate
-from .base import CRUDBase
+from .catalog import CRUDCatalog
 
 
-class CRUDService(CRUDBase[ServiceDB, ServiceCreate, ServiceUpdate]):
+class CRUDService(CRUDCatalog[ServiceDB, ServiceCreate, ServiceUpdate]):
     """CRUD operations for Service."""
     
     async def get_by_name(self, collection: AsyncIOMotorCollection, name: str) -> Optional[ServiceDB]:
@@ -28,4 +28,4 @@ class CRUDService(CRUDBase[ServiceDB, ServiceCreate, ServiceUpdate]):
 
 
 # Create instance
-service_crud = CRUDService(ServiceDB) 
\ No newline at end of file
+service_crud = CRUDService(ServiceDB, "services") 
\ No newline at end of file
@@ -2,10 +2,10 @@ from typing import Optional
 from motor.motor_asyncio import AsyncIOMotorCollection
 
 from app.schemas.species import SpeciesDB, SpeciesCreate, SpeciesUpdate
-from .base import CRUDBase
+from .catalog import CRUDCatalog
 
 
-class CRUDSpecies(CRUDBase[SpeciesDB, SpeciesCreate, SpeciesUpdate]):
+class CRUDSpecies(CRUDCatalog[SpeciesDB, SpeciesCreate, SpeciesUpdate]):
     """CRUD operations for Species."""
     
     async def get_by_name(self, collection: AsyncIOMotorCollection, name: str) -> Optional[SpeciesDB]:
@@ -22,4 +22,4 @@ class CRUDSpecies(CRUDBase[SpeciesDB, SpeciesCreate, SpeciesUpdate]):
 
 
 # Create instance
-species_crud = CRUDSpecies(SpeciesDB) 
\ No newline at end of file
+species_crud = CRUDSpecies(SpeciesDB, "species") 
\ No newline at end of file
@@ -15,7 +15,7 @@ class CRUDVaccination(CRUDBase[VaccinationDB, VaccinationCreate, VaccinationUpda
         if not ObjectId.is_valid(pet_id):
             return []
         
-        cursor = collection.find({"pet_id": pet_id, "status": True})
+        cursor = collection.find({"pet_id": ObjectId(pet_id), "status": True})
         documents = await cursor.to_list(length=None)
         return [VaccinationDB(**doc) for doc in documents]
     
@@ -24,7 +24,7 @@ class CRUDVaccination(CRUDBase[VaccinationDB, VaccinationCreate, VaccinationUpda
         if not ObjectId.is_valid(vet_id):
             return []
         
-        cursor = collection.find({"vet_id": vet_id, "status": True})
+        cursor = collection.find({"vet_id": ObjectId(vet_id), "status": True})
         documents = await cursor.to_list(length=None)
         return [VaccinationDB(**doc) for doc in documents]
     
@@ -3,10 +3,10 @@ from motor.motor_asyncio import AsyncIOMotorCollection
 from bson import ObjectId
 
 from app.schemas.vaccination_type import VaccinationTypeDB, VaccinationTypeCreate, VaccinationTypeUpdate
-from .base import CRUDBase
+from .catalog import CRUDCatalog
 
 
-class CRUDVaccinationType(CRUDBase[VaccinationTypeDB, VaccinationTypeCreate, VaccinationTypeUpdate]):
+class CRUDVaccinationType(CRUDCatalog[VaccinationTypeDB, VaccinationTypeCreate, VaccinationTypeUpdate]):
     """CRUD operations for VaccinationType."""
     
     async def get_by_name(self, collection: AsyncIOMotorCollection, name: str) -> Optional[VaccinationTypeDB]:
@@ -21,4 +21,4 @@ class CRUDVaccinationType(CRUDBase[VaccinationTypeDB, VaccinationTypeCreate, Vac
 
 
 # Create instance
-vaccination_type_crud = CRUDVaccinationType(VaccinationTypeDB) 
\ No newline at end of file
+vaccination_type_crud = CRUDVaccinationType(VaccinationTypeDB, "vaccinations") 
\ No newline at end of file
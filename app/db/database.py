@@ -1,12 +1,47 @@
-from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
-from typing import Optional
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection, AsyncIOMotorDatabase
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional
 import asyncio
 import logging
+from pymongo.read_preferences import (
+    Nearest,
+    Primary,
+    PrimaryPreferred,
+    Secondary,
+    SecondaryPreferred,
+)
 from app.core.config import settings
+from app.core.metrics import PoolMetricsListener, command_listener
 
 
 logger = logging.getLogger(__name__)
 
+# Read preference modes accepted in settings, named as in the connection string
+READ_PREFERENCES = {
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
+
+
+def read_preference(policy: Optional[str]) -> Any:
+    """Resolve a read policy to a pymongo read preference.
+    
+    Read-only endpoints opt in by policy name ("list", "export",
+    "analytics"); each maps to a configurable mode. Anything else, including
+    writes and read-your-writes flows, reads from the primary. Secondary
+    modes honour `read_max_staleness_seconds`.
+    """
+    mode = {
+        "list": settings.list_read_preference,
+        "export": settings.export_read_preference,
+        "analytics": settings.analytics_read_preference,
+    }.get(policy or "", "primary")
+    if mode == "primary":
+        return Primary()
+    return READ_PREFERENCES[mode](max_staleness=settings.read_max_staleness_seconds or -1)
+
 
 class Database:
     """Database connection manager."""
@@ -14,8 +49,48 @@ class Database:
     def __init__(self):
         self.client: Optional[AsyncIOMotorClient] = None
         self.db: Optional[AsyncIOMotorDatabase] = None
+        self.analytics_client: Optional[AsyncIOMotorClient] = None
+        self.analytics_db: Optional[AsyncIOMotorDatabase] = None
         self.connected: bool = False
     
+    @staticmethod
+    def _client_options(name: str, max_pool_size: int) -> Dict[str, Any]:
+        """Pool, timeout and compression options for a client."""
+        options: Dict[str, Any] = {
+            "appname": f"{settings.app_name} ({name})",
+            "minPoolSize": min(settings.mongo_min_pool_size, max_pool_size),
+            "maxPoolSize": max_pool_size,
+            "serverSelectionTimeoutMS": settings.mongo_server_selection_timeout_ms,
+        }
+        if settings.mongo_wait_queue_timeout_ms:
+            options["waitQueueTimeoutMS"] = settings.mongo_wait_queue_timeout_ms
+        if settings.mongo_max_idle_time_ms:
+            options["maxIdleTimeMS"] = settings.mongo_max_idle_time_ms
+        if settings.mongo_compressors:
+            # pymongo skips (with a warning) compressors whose package is missing
+            options["compressors"] = settings.mongo_compressors
+        
+        event_listeners = []
+        if settings.metrics_enabled:
+            event_listeners = [command_listener, PoolMetricsListener(name, max_pool_size)]
+        options["event_listeners"] = event_listeners
+        return options
+    
+    def _connect_analytics(self):
+        """Set up the database handle analytics queries run against.
+        
+        With `analytics_separate_pool`, analytics get their own client and
+        pool, so long aggregations queue among themselves instead of
+        holding connections CRUD requests need.
+        """
+        if settings.analytics_separate_pool:
+            self.analytics_client = AsyncIOMotorClient(
+                settings.database_url, **self._client_options("analytics", settings.analytics_max_pool_size)
+            )
+            self.analytics_db = self.analytics_client[settings.database_name]
+        else:
+            self.analytics_db = self.db
+    
     async def connect(self):
         """Connect to MongoDB with retry logic."""
         max_retries = 3
@@ -24,37 +99,47 @@ class Database:
         for attempt in range(max_retries):
             try:
                 logger.info(f"Attempting to connect to MongoDB (attempt {attempt + 1}/{max_retries})")
-                self.client = AsyncIOMotorClient(settings.database_url)
+                self.client = AsyncIOMotorClient(
+                    settings.database_url, **self._client_options("default", settings.mongo_max_pool_size)
+                )
                 
                 # Test connection with shorter timeout
                 await asyncio.wait_for(self.client.admin.command('ping'), timeout=10.0)
                 
                 self.db = self.client[settings.database_name]
+                self._connect_analytics()
                 self.connected = True
                 logger.info(f"✅ Successfully connected to MongoDB database: {settings.database_name}")
                 return
                 
             except Exception as e:
                 logger.error(f"❌ MongoDB connection attempt {attempt + 1} failed: {str(e)}")
+                self._close_clients()
                 if attempt < max_retries - 1:
                     logger.info(f"Retrying in {retry_delay} seconds...")
                     await asyncio.sleep(retry_delay)
                     retry_delay *= 2  # Exponential backoff
                 else:
                     logger.warning("⚠️ Failed to connect to MongoDB after all retries. API will run with limited functionality.")
-                    self.connected = False
-                    self.client = None
-                    self.db = None
     
-    async def disconnect(self):
-        """Disconnect from MongoDB."""
-        if self.client and self.connected:
+    def _close_clients(self):
+        """Close any open clients (and their monitor threads) and reset state."""
+        if self.analytics_client is not None and self.analytics_client is not self.client:
+            self.analytics_client.close()
+        if self.client is not None:
             self.client.close()
-            logger.info("✅ MongoDB connection closed")
-        
         self.connected = False
         self.client = None
         self.db = None
+        self.analytics_client = None
+        self.analytics_db = None
+    
+    async def disconnect(self):
+        """Disconnect from MongoDB."""
+        was_connected = self.client is not None and self.connected
+        self._close_clients()
+        if was_connected:
+            logger.info("✅ MongoDB connection closed")
     
     def get_database(self) -> AsyncIOMotorDatabase:
         """Get database instance."""
@@ -62,15 +147,34 @@ class Database:
             raise RuntimeError("Database not connected")
         return self.db
     
-    def get_collection(self, collection_name: str):
-        """Get collection by name."""
+    def get_collection(self, collection_name: str, read: Optional[str] = None) -> AsyncIOMotorCollection:
+        """Get collection by name, reading per the `read` policy (primary by default)."""
         if not self.connected or self.db is None:
             raise RuntimeError("Database not connected")
-        return self.db[collection_name]
+        if read is None:
+            return self.db[collection_name]
+        return self.db.get_collection(collection_name, read_preference=read_preference(read))
+    
+    def get_analytics_collection(self, collection_name: str) -> AsyncIOMotorCollection:
+        """Get a collection for analytics reads (own pool, "analytics" read policy)."""
+        if not self.connected or self.analytics_db is None:
+            raise RuntimeError("Database not connected")
+        return self.analytics_db.get_collection(collection_name, read_preference=read_preference("analytics"))
     
     def is_connected(self) -> bool:
         """Check if database is connected."""
         return self.connected
+    
+    @asynccontextmanager
+    async def transaction(self):
+        """Yield a session inside a transaction, or None when transactions are disabled."""
+        if not settings.use_transactions or self.client is None:
+            yield None
+            return
+        
+        async with await self.client.start_session() as session:
+            async with session.start_transaction():
+                yield session
 
 
 # Global database instance
@@ -98,5 +202,9 @@ COLLECTIONS = {
     "products": "products",
     "invoices": "invoices",
     "invoice_items": "invoice_items",
-    "audit_logs": "audit_logs"
+    "audit_logs": "audit_logs",
+    "migrations": "migrations",
+    "counters": "counters",
+    "daily_rollups": "daily_rollups",
+    "revoked_tokens": "revoked_tokens"
 } 
\ No newline at end of file
@@ -0,0 +1,178 @@
+from typing import Any, Dict, List
+import logging
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+from app.db.database import COLLECTIONS
+
+
+logger = logging.getLogger(__name__)
+
+ACTIVE = {"status": True}
+
+# Declared indexes per collection. Names are explicit so existing indexes can
+# be matched against the registry when reconciling.
+INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        IndexModel([("email", ASCENDING)], name="email_active_unique",
+                   unique=True, partialFilterExpression=ACTIVE),
+        IndexModel([("status", ASCENDING), ("created_at", DESCENDING)], name="status_created_at"),
+    ],
+    "clients": [
+        IndexModel([("phone_number", ASCENDING)], name="phone_number_active_unique",
+                   unique=True, partialFilterExpression=ACTIVE),
+        IndexModel([("status", ASCENDING), ("created_at", DESCENDING)], name="status_created_at"),
+    ],
+    "pets": [
+        IndexModel([("client_id", ASCENDING), ("status", ASCENDING)], name="client_id_status"),
+        IndexModel([("species_id", ASCENDING)], name="species_id_active", partialFilterExpression=ACTIVE),
+        IndexModel([("breed_id", ASCENDING)], name="breed_id_active", partialFilterExpression=ACTIVE),
+    ],
+    "species": [
+        IndexModel([("name", ASCENDING)], name="name_active", partialFilterExpression=ACTIVE),
+    ],
+    "breeds": [
+        IndexModel([("species_id", ASCENDING), ("name", ASCENDING)], name="species_id_name_active",
+                   partialFilterExpression=ACTIVE),
+    ],
+    "services": [
+        IndexModel([("name", ASCENDING)], name="name_active", partialFilterExpression=ACTIVE),
+        IndexModel([("category", ASCENDING)], name="category_active", partialFilterExpression=ACTIVE),
+    ],
+    "products": [
+        IndexModel([("name", ASCENDING)], name="name_active", partialFilterExpression=ACTIVE),
+    ],
+    "appointments": [
+        IndexModel([("appointment_date", DESCENDING)], name="appointment_date_active",
+                   partialFilterExpression=ACTIVE),
+        IndexModel([("veterinarian_id", ASCENDING), ("appointment_date", DESCENDING)],
+                   name="veterinarian_id_appointment_date"),
+        IndexModel([("client_id", ASCENDING), ("appointment_date", DESCENDING)],
+                   name="client_id_appointment_date"),
+        IndexModel([("pet_id", ASCENDING), ("appointment_date", DESCENDING)],
+                   name="pet_id_appointment_date"),
+        # Keyset pagination: range on (appointment_date, _id) within active rows
+        IndexModel([("status", ASCENDING), ("appointment_date", ASCENDING), ("_id", ASCENDING)],
+                   name="status_appointment_date_id"),
+    ],
+    "invoices": [
+        IndexModel([("invoice_number", ASCENDING)], name="invoice_number_unique",
+                   unique=True, partialFilterExpression={"invoice_number": {"$type": "string"}}),
+        # _id suffix supports keyset pagination on (invoice_date, _id)
+        IndexModel([("status", ASCENDING), ("invoice_date", DESCENDING), ("_id", DESCENDING)],
+                   name="status_invoice_date_id"),
+        IndexModel([("client_id", ASCENDING), ("invoice_date", DESCENDING)], name="client_id_invoice_date"),
+        IndexModel([("pet_id", ASCENDING)], name="pet_id"),
+        # Substring search scans these index keys instead of fetching documents
+        IndexModel([("status", ASCENDING), ("search_text", ASCENDING)], name="status_search_text"),
+    ],
+    "invoice_items": [
+        IndexModel([("invoice_id", ASCENDING)], name="invoice_id"),
+    ],
+    "revoked_tokens": [
+        # Entries are only needed until the revoked token expires
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+    ],
+}
+
+
+def _index_options(spec: Dict[str, Any]) -> Dict[str, Any]:
+    """Extract the options that define an index's behaviour."""
+    return {
+        "key": list(dict(spec["key"]).items()),
+        "unique": bool(spec.get("unique", False)),
+        "partialFilterExpression": spec.get("partialFilterExpression"),
+        "expireAfterSeconds": spec.get("expireAfterSeconds"),
+    }
+
+
+async def index_report(db: AsyncIOMotorDatabase) -> Dict[str, Dict[str, List[str]]]:
+    """Compare declared indexes with the database without changing anything.
+
+    For each collection lists indexes that are missing, declared with
+    different options, present but undeclared, and unused since the server
+    started (from `$indexStats`, where the deployment permits it).
+    """
+    report: Dict[str, Dict[str, List[str]]] = {}
+    for name, collection_name in COLLECTIONS.items():
+        collection = db[collection_name]
+        declared = {model.document["name"]: model.document for model in INDEXES.get(name, [])}
+        existing = {spec["name"]: spec async for spec in collection.list_indexes()}
+
+        missing = [index for index in declared if index not in existing]
+        changed = [
+            index for index in declared
+            if index in existing and _index_options(declared[index]) != _index_options(existing[index])
+        ]
+        extra = [index for index in existing if index != "_id_" and index not in declared]
+
+        unused = []
+        try:
+            async for stats in collection.aggregate([{"$indexStats": {}}]):
+                if stats["name"] != "_id_" and stats.get("accesses", {}).get("ops", 0) == 0:
+                    unused.append(stats["name"])
+        except OperationFailure as e:
+            logger.debug(f"$indexStats unavailable for {collection_name}: {e}")
+
+        if missing or changed or extra or unused:
+            report[name] = {"missing": missing, "changed": changed, "extra": extra, "unused": unused}
+    return report
+
+
+async def ensure_indexes(db: AsyncIOMotorDatabase) -> List[str]:
+    """Create any declared index that does not exist yet.
+
+    Indexes whose options differ from the registry are reported but left
+    alone; rebuilding them is a deliberate operation, not a startup side effect.
+    Indexes are created one at a time, so one that cannot be built does not
+    hold back the others.
+    """
+    created = []
+    for name, models in INDEXES.items():
+        collection = db[COLLECTIONS[name]]
+        existing = {spec["name"]: spec async for spec in collection.list_indexes()}
+
+        for model in models:
+            spec = model.document
+            current = existing.get(spec["name"])
+            if current is not None:
+                if _index_options(spec) != _index_options(current):
+                    logger.warning(f"Index {name}.{spec['name']} differs from the registry; leaving it unchanged")
+                continue
+            try:
+                created.extend(f"{name}.{index}" for index in await collection.create_indexes([model]))
+            except OperationFailure as e:
+                # e.g. a unique index over data that still has duplicates
+                logger.error(f"Failed to create index {name}.{spec['name']}: {e}")
+
+    if created:
+        logger.info(f"Created indexes: {', '.join(created)}")
+    return created
+
+
+if __name__ == "__main__":
+    import argparse
+    import asyncio
+    import json
+
+    from app.db.database import database
+
+    async def main(dry_run: bool):
+        await database.connect()
+        if not database.is_connected():
+            raise SystemExit("Database not connected")
+        try:
+            if not dry_run:
+                await ensure_indexes(database.get_database())
+            print(json.dumps(await index_report(database.get_database()), indent=2))
+        finally:
+            await database.disconnect()
+
+    parser = argparse.ArgumentParser(description="Reconcile MongoDB indexes with the registry")
+    parser.add_argument("--dry-run", action="store_true", help="Only report missing, changed, extra and unused indexes")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(args.dry_run))
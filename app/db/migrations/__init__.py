@@ -0,0 +1,90 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import logging
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.db.database import database, COLLECTIONS
+from app.db.migrations.base import Migration, MigrationState
+from app.db.migrations.m0001_normalize_reference_ids import NormalizeReferenceIds
+from app.db.migrations.m0002_invoice_search_text import BackfillInvoiceSearchText
+from app.db.migrations.m0003_normalize_pet_record_ids import NormalizePetRecordReferenceIds
+
+
+logger = logging.getLogger(__name__)
+
+# Registered migrations, applied in version order
+MIGRATIONS: List[Migration] = [
+    NormalizeReferenceIds(),
+    BackfillInvoiceSearchText(),
+    NormalizePetRecordReferenceIds(),
+]
+
+
+async def get_migration_status(db: Optional[AsyncIOMotorDatabase] = None) -> List[Dict[str, Any]]:
+    """Get the recorded state of every registered migration."""
+    db = db if db is not None else database.get_database()
+    records = {
+        record["_id"]: record
+        async for record in db[COLLECTIONS["migrations"]].find({})
+    }
+    status = []
+    for migration in sorted(MIGRATIONS, key=lambda m: m.version):
+        record = records.get(migration.version, {})
+        status.append({
+            "version": migration.version,
+            "description": migration.description,
+            "status": record.get("status", "pending"),
+            "counts": record.get("counts", {}),
+            "applied_at": record.get("applied_at"),
+            "error": record.get("error")
+        })
+    return status
+
+
+async def run_migrations(db: Optional[AsyncIOMotorDatabase] = None) -> List[int]:
+    """Apply every pending migration in version order.
+
+    Migrations that were interrupted resume from their last checkpoint.
+    Returns the versions applied by this run.
+    """
+    db = db if db is not None else database.get_database()
+    collection = db[COLLECTIONS["migrations"]]
+    applied = []
+
+    for migration in sorted(MIGRATIONS, key=lambda m: m.version):
+        record = await collection.find_one({"_id": migration.version})
+        if record and record.get("status") == "applied":
+            continue
+
+        now = datetime.utcnow()
+        if record is None:
+            record = {
+                "_id": migration.version,
+                "description": migration.description,
+                "checkpoints": {},
+                "counts": {},
+                "created_at": now
+            }
+        record.update({"status": "running", "started_at": now, "updated_at": now, "error": None})
+        await collection.replace_one({"_id": migration.version}, record, upsert=True)
+
+        logger.info(f"Applying migration {migration.version}: {migration.description}")
+        try:
+            await migration.run(db, MigrationState(collection, record))
+        except Exception as e:
+            await collection.update_one(
+                {"_id": migration.version},
+                {"$set": {"status": "failed", "error": str(e), "updated_at": datetime.utcnow()}}
+            )
+            logger.error(f"Migration {migration.version} failed: {e}")
+            raise
+
+        await collection.update_one(
+            {"_id": migration.version},
+            {"$set": {"status": "applied", "applied_at": datetime.utcnow(), "updated_at": datetime.utcnow()}}
+        )
+        logger.info(f"Migration {migration.version} applied: {record.get('counts', {})}")
+        applied.append(migration.version)
+
+    return applied
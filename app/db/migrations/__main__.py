@@ -0,0 +1,35 @@
+"""Run data migrations from the command line.
+
+    python -m app.db.migrations           # apply pending migrations
+    python -m app.db.migrations --status  # show migration state
+"""
+import argparse
+import asyncio
+import logging
+
+from app.db.database import database
+from app.db.migrations import get_migration_status, run_migrations
+
+
+async def main(show_status: bool):
+    await database.connect()
+    if not database.is_connected():
+        raise SystemExit("Database not connected")
+
+    try:
+        if not show_status:
+            applied = await run_migrations()
+            print(f"Applied migrations: {applied or 'none'}")
+        for entry in await get_migration_status():
+            print(f"{entry['version']:>4}  {entry['status']:<8}  {entry['description']}  {entry['counts']}")
+    finally:
+        await database.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply DogTorVet data migrations")
+    parser.add_argument("--status", action="store_true", help="Only show migration status")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(args.status))
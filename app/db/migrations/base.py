@@ -0,0 +1,48 @@
+from datetime import datetime
+from typing import Any, Optional
+
+from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorDatabase
+
+
+class MigrationState:
+    """Progress record for one migration, persisted in the migrations collection.
+
+    Migrations save checkpoints as they go so an interrupted run resumes from
+    the last completed batch instead of starting over.
+    """
+
+    def __init__(self, collection: AsyncIOMotorCollection, record: dict):
+        self.collection = collection
+        self.record = record
+
+    def get_checkpoint(self, key: str) -> Optional[Any]:
+        """Get the saved checkpoint for a step of the migration."""
+        return self.record.get("checkpoints", {}).get(key)
+
+    async def save_checkpoint(self, key: str, value: Any):
+        """Persist the checkpoint for a step of the migration."""
+        self.record.setdefault("checkpoints", {})[key] = value
+        await self.collection.update_one(
+            {"_id": self.record["_id"]},
+            {"$set": {f"checkpoints.{key}": value, "updated_at": datetime.utcnow()}}
+        )
+
+    async def add_count(self, key: str, amount: int):
+        """Increment a progress counter reported in the migration status."""
+        if not amount:
+            return
+        counts = self.record.setdefault("counts", {})
+        counts[key] = counts.get(key, 0) + amount
+        await self.collection.update_one({"_id": self.record["_id"]}, {"$inc": {f"counts.{key}": amount}})
+
+
+class Migration:
+    """Base class for a versioned, resumable data migration."""
+
+    version: int = 0
+    description: str = ""
+    batch_size: int = 500
+
+    async def run(self, db: AsyncIOMotorDatabase, state: MigrationState):
+        """Apply the migration. Must be safe to re-run after an interruption."""
+        raise NotImplementedError
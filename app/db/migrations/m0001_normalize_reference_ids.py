@@ -0,0 +1,67 @@
+from typing import Dict, List
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+
+from app.db.database import COLLECTIONS
+from app.db.migrations.base import Migration, MigrationState
+
+
+# Top-level reference fields per collection that must be stored as ObjectId
+REFERENCE_FIELDS: Dict[str, List[str]] = {
+    "pets": ["client_id", "species_id", "breed_id"],
+    "breeds": ["species_id"],
+    "appointments": ["client_id", "pet_id", "veterinarian_id", "service_id"],
+    "invoices": ["client_id", "pet_id"],
+    "invoice_items": ["invoice_id", "service_id", "product_id"],
+}
+
+
+class NormalizeReferenceIds(Migration):
+    """Convert hex-string `*_id` references to ObjectId."""
+
+    version = 1
+    description = "Normalize *_id reference fields from string to ObjectId"
+    reference_fields = REFERENCE_FIELDS
+
+    async def run(self, db: AsyncIOMotorDatabase, state: MigrationState):
+        for name, fields in self.reference_fields.items():
+            await self._normalize_collection(db, name, fields, state)
+
+    async def _normalize_collection(
+        self,
+        db: AsyncIOMotorDatabase,
+        name: str,
+        fields: List[str],
+        state: MigrationState
+    ):
+        collection = db[COLLECTIONS[name]]
+        query = {"$or": [{field: {"$type": "string"}} for field in fields]}
+        projection = {field: 1 for field in fields}
+
+        while True:
+            last_id = state.get_checkpoint(name)
+            batch_query = dict(query)
+            if last_id is not None:
+                batch_query["_id"] = {"$gt": last_id}
+
+            documents = await collection.find(batch_query, projection) \
+                .sort("_id", 1).limit(self.batch_size).to_list(length=None)
+            if not documents:
+                return
+
+            updates = []
+            for document in documents:
+                converted = {
+                    field: ObjectId(document[field])
+                    for field in fields
+                    if isinstance(document.get(field), str) and ObjectId.is_valid(document[field])
+                }
+                if converted:
+                    updates.append(UpdateOne({"_id": document["_id"]}, {"$set": converted}))
+
+            if updates:
+                await collection.bulk_write(updates, ordered=False)
+            await state.add_count(name, len(updates))
+            await state.save_checkpoint(name, documents[-1]["_id"])
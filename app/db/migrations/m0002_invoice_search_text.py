@@ -0,0 +1,28 @@
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.db.database import COLLECTIONS
+from app.db.migrations.base import Migration, MigrationState
+from app.services.search import INVOICE_SEARCH_SOURCES, write_invoice_search_text
+
+
+class BackfillInvoiceSearchText(Migration):
+    """Populate the denormalized `search_text` field on existing invoices."""
+
+    version = 2
+    description = "Backfill invoice search_text from invoice number, client and pet names"
+
+    async def run(self, db: AsyncIOMotorDatabase, state: MigrationState):
+        collection = db[COLLECTIONS["invoices"]]
+        projection = {field: 1 for field in INVOICE_SEARCH_SOURCES + ("search_text",)}
+
+        while True:
+            last_id = state.get_checkpoint("invoices")
+            query = {"_id": {"$gt": last_id}} if last_id is not None else {}
+
+            documents = await collection.find(query, projection) \
+                .sort("_id", 1).limit(self.batch_size).to_list(length=None)
+            if not documents:
+                return
+
+            await state.add_count("invoices", await write_invoice_search_text(collection, documents))
+            await state.save_checkpoint("invoices", documents[-1]["_id"])
@@ -0,0 +1,64 @@
+from typing import Dict, List
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+
+from app.crud.pet import normalize_nested_references
+from app.db.database import COLLECTIONS
+from app.db.migrations.base import MigrationState
+from app.db.migrations.m0001_normalize_reference_ids import NormalizeReferenceIds
+
+
+# Reference fields left out of migration 1
+PET_RECORD_REFERENCE_FIELDS: Dict[str, List[str]] = {
+    "allergies": ["pet_id"],
+    "vaccinations": ["pet_id", "vet_id"],
+}
+
+
+class NormalizePetRecordReferenceIds(NormalizeReferenceIds):
+    """Convert the remaining hex-string references to ObjectId.
+
+    Covers pet allergy and vaccination records, and the allergy and
+    vaccination references nested inside pets.
+    """
+
+    version = 3
+    description = "Normalize allergy, vaccination and nested pet references from string to ObjectId"
+    reference_fields = PET_RECORD_REFERENCE_FIELDS
+
+    async def run(self, db: AsyncIOMotorDatabase, state: MigrationState):
+        await super().run(db, state)
+        await self._normalize_pets(db, state)
+
+    async def _normalize_pets(self, db: AsyncIOMotorDatabase, state: MigrationState):
+        collection = db[COLLECTIONS["pets"]]
+        query = {"$or": [
+            {"allergies": {"$type": "string"}},
+            {"vaccinations.vaccination_id": {"$type": "string"}}
+        ]}
+        projection = {"allergies": 1, "vaccinations": 1}
+
+        while True:
+            last_id = state.get_checkpoint("pets")
+            batch_query = dict(query)
+            if last_id is not None:
+                batch_query["_id"] = {"$gt": last_id}
+
+            documents = await collection.find(batch_query, projection) \
+                .sort("_id", 1).limit(self.batch_size).to_list(length=None)
+            if not documents:
+                return
+
+            updates = []
+            for document in documents:
+                converted = normalize_nested_references(
+                    {key: document[key] for key in projection if document.get(key)}
+                )
+                if converted:
+                    updates.append(UpdateOne({"_id": document["_id"]}, {"$set": converted}))
+
+            if updates:
+                await collection.bulk_write(updates, ordered=False)
+            await state.add_count("pets", len(updates))
+            await state.save_checkpoint("pets", documents[-1]["_id"])
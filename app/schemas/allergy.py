@@ -1,7 +1,7 @@
 from pydantic import Field
 from typing import Optional
 from enum import Enum
-from .base import BaseDBSchema, BaseCreateSchema, BaseUpdateSchema, BaseResponseSchema
+from .base import BaseDBSchema, BaseCreateSchema, BaseUpdateSchema, BaseResponseSchema, ObjectIdStr
 
 
 class AllergySeverity(str, Enum):
@@ -13,7 +13,7 @@ class AllergySeverity(str, Enum):
 
 class AllergyDB(BaseDBSchema):
     """Allergy database schema"""
-    pet_id: str = Field(..., description="Pet ID reference")
+    pet_id: ObjectIdStr = Field(..., description="Pet ID reference")
     allergen: str = Field(..., min_length=1, max_length=255, description="Allergen name")
     severity: AllergySeverity = Field(default=AllergySeverity.MILD, description="Allergy severity")
     symptoms: Optional[str] = Field(None, max_length=1000, description="Allergy symptoms")
@@ -2,7 +2,7 @@ from pydantic import Field
 from typing import Optional, List
 from datetime import datetime
 from enum import Enum
-from .base import BaseDBSchema, BaseCreateSchema, BaseUpdateSchema, BaseResponseSchema
+from .base import BaseDBSchema, BaseCreateSchema, BaseUpdateSchema, BaseResponseSchema, ObjectIdStr
 
 
 class AppointmentStatus(str, Enum):
@@ -15,10 +15,10 @@ class AppointmentStatus(str, Enum):
 
 class AppointmentDB(BaseDBSchema):
     """Appointment database schema"""
-    pet_id: str = Field(..., description="Pet ID reference")
-    client_id: str = Field(..., description="Client ID reference")
-    veterinarian_id: str = Field(..., description="Veterinarian ID reference")
-    service_id: str = Field(..., description="Service ID reference")
+    pet_id: ObjectIdStr = Field(..., description="Pet ID reference")
+    client_id: ObjectIdStr = Field(..., description="Client ID reference")
+    veterinarian_id: ObjectIdStr = Field(..., description="Veterinarian ID reference")
+    service_id: ObjectIdStr = Field(..., description="Service ID reference")
     appointment_date: datetime = Field(..., description="Appointment date and time")
     duration_minutes: int = Field(default=30, description="Duration in minutes")
     appointment_status: AppointmentStatus = Field(default=AppointmentStatus.SCHEDULED)
@@ -1,6 +1,7 @@
 from datetime import datetime, timezone
-from typing import Optional, Any, Annotated
-from pydantic import BaseModel, Field, BeforeValidator, ConfigDict, field_serializer
+from functools import lru_cache
+from typing import Optional, Any, Annotated, Tuple, Type
+from pydantic import BaseModel, Field, BeforeValidator, ConfigDict, create_model, field_serializer
 from bson import ObjectId
 
 
@@ -13,9 +14,19 @@ def validate_object_id(v: Any) -> ObjectId:
     raise ValueError("Invalid ObjectId")
 
 
+def object_id_to_str(v: Any) -> Any:
+    """Read a stored ObjectId reference as its hex string"""
+    if isinstance(v, ObjectId):
+        return str(v)
+    return v
+
+
 # Create a type alias for MongoDB ObjectId
 PyObjectId = Annotated[ObjectId, BeforeValidator(validate_object_id)]
 
+# Reference stored as ObjectId but exposed as a string
+ObjectIdStr = Annotated[str, BeforeValidator(object_id_to_str)]
+
 
 class BaseSchema(BaseModel):
     """Base schema for all models"""
@@ -66,6 +77,21 @@ class BaseResponseSchema(BaseSchema):
         return value.isoformat() if value else None
 
 
+@lru_cache(maxsize=256)
+def partial_model(model: Type[BaseModel], fields: Tuple[str, ...]) -> Type[BaseModel]:
+    """Lightweight copy of `model` with only `fields` (names it lacks are ignored).
+    
+    Used for sparse fieldsets: types, defaults and aliases are kept, so a
+    projected document is still validated, but only for what was fetched.
+    """
+    definitions = {
+        name: (info.annotation, info)
+        for name, info in model.model_fields.items()
+        if name in fields
+    }
+    return create_model(f"{model.__name__}Partial", __config__=model.model_config, **definitions)
+
+
 class APIResponse(BaseModel):
     """Standard API response wrapper"""
     success: bool = True
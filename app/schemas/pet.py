@@ -3,8 +3,8 @@ from typing import Optional, List, Dict, Any
 from datetime import date
 from enum import Enum
 from .base import BaseDBSchema, BaseCreateSchema, BaseUpdateSchema, BaseResponseSchema
-from app.schemas.base import PyObjectId
-from pydantic import field_serializer
+from app.schemas.base import ObjectIdStr, PyObjectId, object_id_to_str
+from pydantic import field_serializer, field_validator
 from app.schemas.client import ClientResponse
 from app.schemas.breed import BreedResponse
 from app.schemas.species import SpeciesResponse
@@ -44,9 +44,21 @@ class PetDB(BaseDBSchema):
     medical_history: Optional[str] = Field(None, description="Medical history notes")
     client_id: PyObjectId = Field(..., description="Client ID reference")
     sterilized: Optional[bool] = Field(False, description="Whether the pet is sterilized")
-    allergies: Optional[List[str]] = Field(default=[], description="List of allergy IDs")
+    allergies: Optional[List[ObjectIdStr]] = Field(default=[], description="List of allergy IDs")
     vaccinations: Optional[List[Dict[str, Any]]] = Field(default=[], description="List of vaccination records")
 
+    @field_validator('vaccinations', mode='before')
+    @classmethod
+    def vaccination_ids_to_str(cls, value):
+        """Read stored vaccination_id references as hex strings"""
+        if isinstance(value, list):
+            return [
+                {**record, 'vaccination_id': object_id_to_str(record.get('vaccination_id'))}
+                if isinstance(record, dict) and 'vaccination_id' in record else record
+                for record in value
+            ]
+        return value
+
 
 class PetCreate(BaseCreateSchema):
     """Pet creation schema"""
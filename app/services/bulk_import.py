@@ -0,0 +1,187 @@
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, Type
+import json
+import logging
+
+from pydantic import BaseModel, ValidationError
+
+from app.core.config import settings
+from app.crud.base import CRUDBase
+from app.db.database import database, COLLECTIONS
+from app.services.relation_loader import to_object_id
+
+
+logger = logging.getLogger(__name__)
+
+# OpenAPI request body for endpoints that read NDJSON from the raw request stream
+NDJSON_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/x-ndjson": {"schema": {"type": "string", "description": "One JSON object per line"}}}
+    }
+}
+
+
+class BulkImportSpec:
+    """How one resource is validated and inserted by a bulk import.
+
+    `references` maps a field to the collection it must point at (an active
+    document); `unique` maps a field to the error reported when the value is
+    already taken by an active document or repeated in the import.
+    `on_created` receives every batch of inserted documents, e.g. for rollups.
+    """
+
+    def __init__(
+        self,
+        collection: str,
+        schema: Type[BaseModel],
+        crud: CRUDBase,
+        references: Optional[Dict[str, str]] = None,
+        unique: Optional[Dict[str, str]] = None,
+        on_created: Optional[Callable[[List[Dict[str, Any]]], Awaitable[None]]] = None
+    ):
+        self.collection = collection
+        self.schema = schema
+        self.crud = crud
+        self.references = references or {}
+        self.unique = unique or {}
+        self.on_created = on_created
+
+
+class BulkImportResult:
+    """Outcome of a bulk import, reported per input line."""
+
+    def __init__(self, max_errors: int):
+        self.received = 0
+        self.created: List[Dict[str, Any]] = []
+        self.errors: List[Dict[str, Any]] = []
+        self.failed = 0
+        self.max_errors = max_errors
+
+    def add_error(self, row: int, error: str):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"row": row, "error": error})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "received": self.received,
+            "created_count": len(self.created),
+            "failed_count": self.failed,
+            "created": self.created,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors)
+        }
+
+
+async def iter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, bytes]]:
+    """Split a streamed NDJSON body into (line number, line); blank lines are skipped."""
+    buffer = b""
+    line_number = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                yield line_number, line
+    if buffer.strip():
+        yield line_number + 1, buffer
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc']) or 'row'}: {detail['msg']}"
+        for detail in error.errors()
+    )
+
+
+async def _check_batch(
+    spec: BulkImportSpec,
+    rows: List[Tuple[int, BaseModel]],
+    result: BulkImportResult
+) -> List[Tuple[int, BaseModel]]:
+    """Drop rows with missing references or duplicate unique values, one query per field."""
+    rejected: Dict[int, str] = {}
+
+    for field, collection_name in spec.references.items():
+        ids = {to_object_id(getattr(obj, field, None)) for _, obj in rows} - {None}
+        collection = database.get_collection(COLLECTIONS[collection_name])
+        found = {
+            document["_id"]
+            async for document in collection.find({"_id": {"$in": list(ids)}, "status": True}, {"_id": 1})
+        } if ids else set()
+        for row, obj in rows:
+            if row not in rejected and to_object_id(getattr(obj, field, None)) not in found:
+                rejected[row] = f"{field}: referenced document not found"
+
+    for field, message in spec.unique.items():
+        values = [getattr(obj, field, None) for _, obj in rows]
+        collection = database.get_collection(COLLECTIONS[spec.collection])
+        taken = {
+            document[field]
+            async for document in collection.find(
+                {field: {"$in": [v for v in values if v is not None]}, "status": True}, {field: 1}
+            )
+        }
+        for row, obj in rows:
+            value = getattr(obj, field, None)
+            if value is None or row in rejected:
+                continue
+            if value in taken:
+                rejected[row] = f"{field}: {message}"
+            taken.add(value)  # Later rows in the import repeating this value are duplicates
+
+    for row, error in sorted(rejected.items()):
+        result.add_error(row, error)
+    return [(row, obj) for row, obj in rows if row not in rejected]
+
+
+async def _flush(spec: BulkImportSpec, rows: List[Tuple[int, BaseModel]], result: BulkImportResult):
+    rows = await _check_batch(spec, rows, result)
+    if not rows:
+        return
+    collection = database.get_collection(COLLECTIONS[spec.collection])
+    created, errors = await spec.crud.create_many(collection, [obj for _, obj in rows])
+    for index, error in errors.items():
+        result.add_error(rows[index][0], error)
+    for index, document in created:
+        result.created.append({"row": rows[index][0], "id": str(document["_id"])})
+    if created and spec.on_created:
+        await spec.on_created([document for _, document in created])
+
+
+async def run_bulk_import(
+    spec: BulkImportSpec,
+    chunks: AsyncIterator[bytes],
+    batch_size: Optional[int] = None
+) -> BulkImportResult:
+    """Validate and insert NDJSON rows as they stream in, `batch_size` rows per insert.
+
+    Each line is one JSON object in the resource's create schema. Bad lines
+    are reported with their line number and never stop the import.
+    """
+    batch_size = batch_size or settings.bulk_import_batch_size
+    result = BulkImportResult(settings.bulk_import_max_errors)
+    batch: List[Tuple[int, BaseModel]] = []
+
+    async for row, line in iter_ndjson(chunks):
+        result.received += 1
+        try:
+            batch.append((row, spec.schema.model_validate(json.loads(line))))
+        except ValidationError as e:
+            result.add_error(row, _validation_message(e))
+            continue
+        except ValueError as e:  # JSONDecodeError or undecodable bytes
+            result.add_error(row, f"Invalid JSON: {e}")
+            continue
+        if len(batch) >= batch_size:
+            await _flush(spec, batch, result)
+            batch = []
+    if batch:
+        await _flush(spec, batch, result)
+
+    logger.info(
+        "Bulk import into %s: %s received, %s created, %s failed",
+        spec.collection, result.received, len(result.created), result.failed
+    )
+    return result
@@ -0,0 +1,206 @@
+from typing import Any, Dict, Iterable, List, Optional
+import asyncio
+import logging
+import time
+
+from bson import ObjectId
+
+from app.core.config import settings
+from app.db.database import database, COLLECTIONS
+from app.services.relation_loader import to_object_id
+
+
+logger = logging.getLogger(__name__)
+
+# Small reference catalogs held in memory (COLLECTIONS keys)
+CACHED_CATALOGS = ("species", "breeds", "services", "products", "allergies", "vaccinations")
+
+
+class CatalogCache:
+    """Write-through in-process copy of the small catalog collections.
+
+    Each catalog is loaded whole on first use and indexed by `_id` and by
+    name (active documents only), so per-row lookups become dictionary hits.
+    Catalog CRUD writes refresh the written document, and a background job
+    reloads everything every `catalog_cache_refresh_seconds` to pick up
+    writes made by other processes. Documents are raw, as MongoDB returns
+    them, inactive ones included; treat them as read-only.
+
+    With `catalog_cache_refresh_seconds` = 0 the cache is disabled and every
+    lookup queries MongoDB.
+    """
+
+    def __init__(self, catalogs: Iterable[str] = CACHED_CATALOGS):
+        self.catalogs = tuple(catalogs)
+        self.hits = 0
+        self.misses = 0
+        self._by_id: Dict[str, Dict[ObjectId, dict]] = {}
+        self._by_name: Dict[str, Dict[str, dict]] = {}
+        self._loaded_at: Dict[str, float] = {}
+        self._loading: Dict[str, "asyncio.Task[None]"] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return settings.catalog_cache_refresh_seconds > 0
+
+    def caches(self, catalog: str) -> bool:
+        """Whether lookups in `catalog` are served from memory."""
+        return self.enabled and catalog in self.catalogs
+
+    async def _ensure_loaded(self, catalog: str):
+        if catalog in self._loaded_at:
+            return
+        # Concurrent first lookups share one load
+        task = self._loading.get(catalog)
+        if task is None:
+            task = asyncio.ensure_future(self.refresh(catalog))
+            self._loading[catalog] = task
+            task.add_done_callback(lambda _: self._loading.pop(catalog, None))
+        await asyncio.shield(task)
+
+    async def refresh(self, catalog: Optional[str] = None):
+        """Reload one catalog, or every catalog that has been loaded."""
+        if catalog is None:
+            for name in list(self._loaded_at):
+                await self.refresh(name)
+            return
+        collection = database.get_collection(COLLECTIONS[catalog])
+        documents = await collection.find({}).to_list(length=None)
+        self._by_id[catalog] = {document["_id"]: document for document in documents}
+        self._by_name[catalog] = {
+            document["name"]: document
+            for document in documents
+            if document.get("status", True) and document.get("name")
+        }
+        self._loaded_at[catalog] = time.monotonic()
+
+    async def refresh_documents(self, catalog: str, ids: Iterable[Any]):
+        """Re-read documents after they were written (the write-through path).
+
+        The write has already happened, so a failed read only drops the
+        catalog; it is reloaded on next use.
+        """
+        oids = [oid for oid in (to_object_id(value) for value in ids) if oid is not None]
+        if not oids or not self.caches(catalog) or catalog not in self._loaded_at:
+            return
+        try:
+            collection = database.get_collection(COLLECTIONS[catalog])
+            documents = {
+                document["_id"]: document
+                for document in await collection.find({"_id": {"$in": oids}}).to_list(length=None)
+            }
+        except Exception as e:
+            logger.exception("❌ Failed to refresh cached %s: %s", catalog, e)
+            self._loaded_at.pop(catalog, None)
+            return
+
+        by_id, by_name = self._by_id[catalog], self._by_name[catalog]
+        for oid in oids:
+            previous = by_id.pop(oid, None)
+            if previous is not None and by_name.get(previous.get("name")) is previous:
+                del by_name[previous["name"]]
+            document = documents.get(oid)
+            if document is not None:
+                by_id[oid] = document
+                if document.get("status", True) and document.get("name"):
+                    by_name[document["name"]] = document
+
+    async def get_many(self, catalog: str, ids: Iterable[Any]) -> Dict[ObjectId, dict]:
+        """Documents by ID (ObjectId or hex string); unknown IDs are left out.
+
+        IDs missing from the loaded catalog are read from MongoDB in one query.
+        """
+        wanted = {oid for oid in (to_object_id(value) for value in ids) if oid is not None}
+        if not wanted:
+            return {}
+        if not self.caches(catalog):
+            collection = database.get_collection(COLLECTIONS[catalog])
+            documents = await collection.find({"_id": {"$in": list(wanted)}}).to_list(length=None)
+            return {document["_id"]: document for document in documents}
+
+        await self._ensure_loaded(catalog)
+        by_id = self._by_id[catalog]
+        found = {oid: by_id[oid] for oid in wanted if oid in by_id}
+        self.hits += len(found)
+        missing = [oid for oid in wanted if oid not in found]
+        if missing:
+            # Written by another process since the last load: read through and keep
+            self.misses += len(missing)
+            collection = database.get_collection(COLLECTIONS[catalog])
+            if len(missing) == 1:
+                document = await collection.find_one({"_id": missing[0]})
+                documents = [document] if document is not None else []
+            else:
+                documents = await collection.find({"_id": {"$in": missing}}).to_list(length=None)
+            for document in documents:
+                self._add(catalog, document)
+                found[document["_id"]] = document
+        return found
+
+    def _add(self, catalog: str, document: dict):
+        self._by_id[catalog][document["_id"]] = document
+        if document.get("status", True) and document.get("name"):
+            self._by_name[catalog][document["name"]] = document
+
+    async def get(self, catalog: str, id: Any) -> Optional[dict]:
+        """A single document by ID, or None."""
+        oid = to_object_id(id)
+        if oid is None:
+            return None
+        return (await self.get_many(catalog, [oid])).get(oid)
+
+    async def get_by_name(self, catalog: str, name: str) -> Optional[dict]:
+        """The active document with this exact name, or None."""
+        if not self.caches(catalog):
+            return await database.get_collection(COLLECTIONS[catalog]).find_one({"name": name, "status": True})
+        await self._ensure_loaded(catalog)
+        document = self._by_name[catalog].get(name)
+        if document is None:
+            self.misses += 1
+            document = await database.get_collection(COLLECTIONS[catalog]).find_one({"name": name, "status": True})
+            if document is not None:
+                self._add(catalog, document)
+        else:
+            self.hits += 1
+        return document
+
+    async def all(self, catalog: str) -> List[dict]:
+        """Every document in a catalog, inactive ones included."""
+        if not self.caches(catalog):
+            return await database.get_collection(COLLECTIONS[catalog]).find({}).to_list(length=None)
+        await self._ensure_loaded(catalog)
+        return list(self._by_id[catalog].values())
+
+    def clear(self):
+        """Drop every catalog; they reload on next use."""
+        self._by_id.clear()
+        self._by_name.clear()
+        self._loaded_at.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cached document counts and hit/miss counters."""
+        lookups = self.hits + self.misses
+        return {
+            "size": sum(len(documents) for documents in self._by_id.values()),
+            "catalogs": {catalog: len(documents) for catalog, documents in self._by_id.items()},
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+catalog_cache = CatalogCache()
+
+
+async def run_catalog_cache_job():
+    """Periodically reload the loaded catalogs until cancelled."""
+    interval = settings.catalog_cache_refresh_seconds
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            if database.is_connected():
+                await catalog_cache.refresh()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Catalog cache refresh failed: {e}")
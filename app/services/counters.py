@@ -0,0 +1,88 @@
+from datetime import datetime
+from typing import List, Optional, Set
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from app.db.database import database, COLLECTIONS
+
+
+# Counters already seeded by this process
+_seeded: Set[str] = set()
+
+
+async def seed_counter(name: str, value: int):
+    """Raise a counter to at least `value`, creating it if needed."""
+    collection = database.get_collection(COLLECTIONS["counters"])
+    try:
+        await collection.update_one({"_id": name}, {"$max": {"value": value}}, upsert=True)
+    except DuplicateKeyError:
+        # Another writer created the counter concurrently; $max is idempotent
+        await collection.update_one({"_id": name}, {"$max": {"value": value}})
+    _seeded.add(name)
+
+
+async def allocate(name: str, count: int = 1) -> int:
+    """Atomically reserve `count` sequence values and return the last one.
+
+    The reserved block is `last - count + 1 .. last`.
+    """
+    if count < 1:
+        raise ValueError("count must be at least 1")
+
+    collection = database.get_collection(COLLECTIONS["counters"])
+    try:
+        counter = await collection.find_one_and_update(
+            {"_id": name},
+            {"$inc": {"value": count}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+    except DuplicateKeyError:
+        # Concurrent upsert of a new counter; the document exists now
+        counter = await collection.find_one_and_update(
+            {"_id": name},
+            {"$inc": {"value": count}},
+            return_document=ReturnDocument.AFTER
+        )
+    return counter["value"]
+
+
+async def _max_invoice_sequence(prefix: str) -> int:
+    """Highest sequence already used by invoice numbers with this prefix."""
+    collection = database.get_collection(COLLECTIONS["invoices"])
+    pipeline = [
+        {"$match": {"invoice_number": {"$regex": f"^{prefix}"}}},
+        {"$project": {"sequence": {"$convert": {
+            "input": {"$substrCP": ["$invoice_number", len(prefix), 12]},
+            "to": "int",
+            "onError": 0,
+            "onNull": 0
+        }}}},
+        {"$group": {"_id": None, "max": {"$max": "$sequence"}}}
+    ]
+    results = await collection.aggregate(pipeline).to_list(length=1)
+    return results[0]["max"] if results else 0
+
+
+def invoice_number_prefix(now: Optional[datetime] = None) -> str:
+    """Invoice number prefix for the month, format INV-00YYMM."""
+    now = now or datetime.utcnow()
+    return f'INV-00{now.strftime("%y%m")}'
+
+
+async def allocate_invoice_numbers(count: int = 1, now: Optional[datetime] = None) -> List[str]:
+    """Reserve `count` consecutive invoice numbers for the current month.
+
+    Numbers come from a per-month counter, so concurrent creators never
+    receive the same number. The first allocation of a month in each process
+    seeds the counter from existing invoices so numbering continues from
+    data created before the counter existed.
+    """
+    prefix = invoice_number_prefix(now)
+    name = f"invoice_number:{prefix}"
+    if name not in _seeded:
+        await seed_counter(name, await _max_invoice_sequence(prefix))
+
+    last = await allocate(name, count)
+    return [f"{prefix}{str(n).zfill(3)}" for n in range(last - count + 1, last + 1)]
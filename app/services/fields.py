@@ -0,0 +1,73 @@
+from typing import Any, Dict, Iterable, Optional, Tuple, Type, Union
+
+from bson import ObjectId
+from pydantic import BaseModel
+
+from app.crud.base import projection
+from app.schemas.base import partial_model
+
+
+class InvalidFields(ValueError):
+    """Raised when `fields=` names a field the resource does not return."""
+
+
+class FieldSet:
+    """A `fields=` sparse fieldset for a list endpoint.
+
+    `allowed` is the response model whose fields may be requested, or the
+    field names for endpoints that return plain dicts. "id" is always
+    returned, as are relations expanded with `include=`. Without `fields`
+    nothing changes: `names` is None and no projection is applied.
+    """
+
+    def __init__(
+        self,
+        fields: Optional[str],
+        allowed: Union[Type[BaseModel], Iterable[str]],
+        include: Iterable[str] = ()
+    ):
+        if isinstance(allowed, type) and issubclass(allowed, BaseModel):
+            self.model: Optional[Type[BaseModel]] = allowed
+            allowed = allowed.model_fields
+        else:
+            self.model = None
+        allowed = set(allowed) | {"id"}
+
+        requested = {name.strip() for name in (fields or "").split(",") if name.strip()}
+        unknown = sorted(requested - allowed)
+        if unknown:
+            raise InvalidFields(f"Unknown field(s) in fields: {', '.join(unknown)}")
+
+        self.names: Optional[Tuple[str, ...]] = tuple(sorted(requested | {"id"})) if requested else None
+        self.keep = tuple(sorted(set(self.names or ()) | set(include)))
+
+    @property
+    def is_sparse(self) -> bool:
+        return self.names is not None
+
+    def fetched(self, *required: str) -> Optional[Tuple[str, ...]]:
+        """Fields to read from the database: the requested ones plus `required`
+        (sort keys for paging, references for `include=`); None when not sparse."""
+        if not self.is_sparse:
+            return None
+        return tuple(sorted(set(self.names) | set(required)))
+
+    def projection(self, *required: str) -> Optional[Dict[str, int]]:
+        """MongoDB projection for `fetched(*required)`; None when not sparse."""
+        fetched = self.fetched(*required)
+        return projection(fetched) if fetched else None
+
+    def row(self, data: Dict[str, Any]) -> Union[BaseModel, Dict[str, Any]]:
+        """Trim one response row to the fieldset.
+
+        ObjectIds become strings; with a response model the row is validated
+        into its lightweight partial copy.
+        """
+        data = {
+            key: str(value) if isinstance(value, ObjectId) else value
+            for key, value in data.items()
+            if key in self.keep
+        }
+        if self.model is None:
+            return data
+        return partial_model(self.model, self.keep)(**data)
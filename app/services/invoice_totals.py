@@ -0,0 +1,240 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List
+import asyncio
+import logging
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from app.core.config import settings
+from app.crud.invoice_item import NET_PRICE_EXPRESSION
+from app.db.database import database, COLLECTIONS
+from app.services.rollups import apply_rollup_changes, day_key, record_revenue_delta
+
+
+logger = logging.getLogger(__name__)
+
+
+def item_net_price(item: Any) -> float:
+    """Net price of an invoice item (unit price x quantity less item discount)."""
+    if not isinstance(item, dict):
+        item = item.model_dump()
+    unit_price = float(item.get('unit_price') or 0)
+    quantity = float(item.get('quantity') or 0)
+    discount_percent = float(item.get('discount_percent') or 0)
+    return unit_price * quantity * (1 - discount_percent / 100)
+
+
+def _discounted_totals_stage(now: datetime) -> dict:
+    """Pipeline stage deriving discount_amount and total from the stored subtotal."""
+    discount_rate = {"$divide": [{"$ifNull": ["$discount_percent", 0]}, 100]}
+    return {
+        "$set": {
+            "discount_amount": {"$round": [{"$multiply": ["$subtotal", discount_rate]}, 2]},
+            "total": {"$round": [{"$multiply": ["$subtotal", {"$subtract": [1, discount_rate]}]}, 2]},
+            "updated_at": now
+        }
+    }
+
+
+async def apply_item_delta(invoice_id: str, delta: float, session=None):
+    """Atomically shift an invoice's totals by an item's net price change."""
+    if not delta:
+        return
+    invoices_collection = database.get_collection(COLLECTIONS["invoices"])
+    invoice = await invoices_collection.find_one_and_update(
+        {"_id": ObjectId(invoice_id)},
+        [
+            {"$set": {"subtotal": {"$round": [{"$add": [{"$ifNull": ["$subtotal", 0]}, delta]}, 2]}}},
+            _discounted_totals_stage(datetime.utcnow())
+        ],
+        projection={"created_at": 1},
+        session=session
+    )
+    if invoice:
+        await record_revenue_delta(invoice.get("created_at"), delta, session=session)
+
+
+async def refresh_invoice_discount(invoice_id: str, session=None):
+    """Re-derive total and discount_amount after the invoice discount changes."""
+    invoices_collection = database.get_collection(COLLECTIONS["invoices"])
+    await invoices_collection.update_one(
+        {"_id": ObjectId(invoice_id)},
+        [
+            {"$set": {"subtotal": {"$ifNull": ["$subtotal", 0]}}},
+            _discounted_totals_stage(datetime.utcnow())
+        ],
+        session=session
+    )
+
+
+async def recalculate_invoice_totals(invoice_id: str):
+    """Recalculate invoice totals based on its items"""
+    try:
+        logger.debug("🔄 Recalculating totals for invoice: %s", invoice_id)
+
+        # Get all items for this invoice
+        items_collection = database.get_collection(COLLECTIONS["invoice_items"])
+        items = await items_collection.find({"invoice_id": ObjectId(invoice_id)}).to_list(length=None)
+        logger.debug("🔍 Found %s items", len(items))
+
+        # Calculate subtotal from items
+        subtotal = sum(item_net_price(item) for item in items)
+
+        # Get invoice to apply discount
+        invoices_collection = database.get_collection(COLLECTIONS["invoices"])
+        invoice = await invoices_collection.find_one({"_id": ObjectId(invoice_id)})
+
+        if invoice:
+            discount_percent = float(invoice.get('discount_percent', 0))
+            discount_amount = subtotal * (discount_percent / 100)
+            total = subtotal - discount_amount
+
+            # Update invoice with new totals
+            await invoices_collection.update_one(
+                {"_id": ObjectId(invoice_id)},
+                {
+                    "$set": {
+                        "subtotal": round(subtotal, 2),
+                        "total": round(total, 2),
+                        "discount_amount": round(discount_amount, 2),
+                        "updated_at": datetime.utcnow()
+                    }
+                }
+            )
+
+            await record_revenue_delta(
+                invoice.get("created_at"),
+                round(subtotal, 2) - float(invoice.get("subtotal") or 0)
+            )
+
+            logger.debug("💰 Updated invoice %s: subtotal=$%.2f, total=$%.2f, discount=$%.2f", invoice_id, subtotal, total, discount_amount)
+        else:
+            logger.warning("⚠️ Invoice %s not found for total recalculation", invoice_id)
+
+    except Exception as e:
+        logger.exception("❌ Error recalculating invoice totals: %s", e)
+
+
+async def _reconcile_batch(rows: List[Dict[str, Any]]) -> int:
+    """Compare item subtotals against stored invoice totals and fix drift.
+
+    Items embedded in the invoice document count towards its subtotal
+    alongside those in the invoice_items collection.
+    """
+    invoices_collection = database.get_collection(COLLECTIONS["invoices"])
+    subtotals = {row["_id"]: row["subtotal"] for row in rows}
+    invoices = await invoices_collection.find(
+        {"_id": {"$in": list(subtotals)}},
+        {"subtotal": 1, "total": 1, "discount_percent": 1, "created_at": 1, "items": 1}
+    ).to_list(length=None)
+
+    now = datetime.utcnow()
+    updates = []
+    revenue = defaultdict(lambda: defaultdict(float))
+    for invoice in invoices:
+        subtotal = subtotals[invoice["_id"]] + sum(item_net_price(item) for item in invoice.get("items") or [])
+        discount_percent = float(invoice.get("discount_percent") or 0)
+        discount_amount = subtotal * (discount_percent / 100)
+        total = subtotal - discount_amount
+        if abs(total - float(invoice.get("total") or 0)) > 0.01 or abs(subtotal - float(invoice.get("subtotal") or 0)) > 0.01:
+            updates.append(UpdateOne(
+                {"_id": invoice["_id"]},
+                {"$set": {
+                    "subtotal": round(subtotal, 2),
+                    "total": round(total, 2),
+                    "discount_amount": round(discount_amount, 2),
+                    "updated_at": now
+                }}
+            ))
+
+            if invoice.get("created_at"):
+                revenue[day_key(invoice["created_at"])]["revenue"] += round(subtotal, 2) - float(invoice.get("subtotal") or 0)
+
+    if updates:
+        await invoices_collection.bulk_write(updates, ordered=False)
+        await apply_rollup_changes(revenue)
+    return len(updates)
+
+
+async def _itemless_invoice_rows(batch_size: int):
+    """Yield batches of zero-subtotal rows for invoices with totals but no items.
+
+    The grouping in reconcile_invoice_totals only sees invoices that still
+    have items, so one whose items were all deleted would keep its old
+    totals. Invoices with embedded items are left out: their totals do not
+    come from the invoice_items collection.
+    """
+    invoices_collection = database.get_collection(COLLECTIONS["invoices"])
+    items_collection = database.get_collection(COLLECTIONS["invoice_items"])
+    query = {
+        "$or": [{"subtotal": {"$nin": [0, None]}}, {"total": {"$nin": [0, None]}}],
+        "items": {"$in": [None, []]}
+    }
+    last_id = None
+    while True:
+        batch_query = dict(query)
+        if last_id is not None:
+            batch_query["_id"] = {"$gt": last_id}
+        invoices = await invoices_collection.find(batch_query, {"_id": 1}) \
+            .sort("_id", 1).limit(batch_size).to_list(length=None)
+        if not invoices:
+            return
+        last_id = invoices[-1]["_id"]
+
+        ids = [invoice["_id"] for invoice in invoices]
+        with_items = set(await items_collection.distinct("invoice_id", {"invoice_id": {"$in": ids}}))
+        rows = [{"_id": invoice_id, "subtotal": 0.0} for invoice_id in ids if invoice_id not in with_items]
+        if rows:
+            yield rows
+
+
+async def reconcile_invoice_totals(batch_size: int = 200) -> Dict[str, int]:
+    """Recompute every invoice subtotal from its items and repair mismatches.
+
+    Invoices with items in the invoice_items collection are grouped from
+    there; invoices left with totals but no items are reset to zero.
+    Replaces the old read-path repair in get_invoices: item writes keep
+    totals current incrementally, and this job corrects any drift.
+    """
+    items_collection = database.get_collection(COLLECTIONS["invoice_items"])
+    pipeline = [
+        {"$match": {"invoice_id": {"$type": "objectId"}}},
+        {"$group": {"_id": "$invoice_id", "subtotal": {"$sum": NET_PRICE_EXPRESSION}}}
+    ]
+
+    checked = 0
+    fixed = 0
+    batch: List[Dict[str, Any]] = []
+    async for row in items_collection.aggregate(pipeline, allowDiskUse=True):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            fixed += await _reconcile_batch(batch)
+            checked += len(batch)
+            batch = []
+    if batch:
+        fixed += await _reconcile_batch(batch)
+        checked += len(batch)
+
+    async for batch in _itemless_invoice_rows(batch_size):
+        fixed += await _reconcile_batch(batch)
+        checked += len(batch)
+
+    if fixed:
+        logger.warning(f"Invoice reconciliation fixed totals on {fixed} of {checked} invoices")
+    return {"checked": checked, "fixed": fixed}
+
+
+async def run_reconciliation_job():
+    """Periodically reconcile invoice totals until cancelled."""
+    interval = settings.invoice_reconcile_interval_minutes * 60
+    while True:
+        try:
+            if database.is_connected():
+                await reconcile_invoice_totals()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Invoice reconciliation job failed: {e}")
+        await asyncio.sleep(interval)
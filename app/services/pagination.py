@@ -0,0 +1,204 @@
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+from urllib.parse import urlencode
+import base64
+import binascii
+import json
+
+from bson import ObjectId, json_util
+
+
+# Query parameters that select the page; links set their own
+PAGING_PARAMS = ("page", "per_page", "cursor", "skip", "limit")
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded or is not valid for the endpoint."""
+
+
+class InvalidSort(ValueError):
+    """Raised when `sort_by` names a field the endpoint does not sort on."""
+
+
+def encode_cursor(sort_field: str, direction: int, value: Any, id: Any) -> str:
+    """Encode the sort key and _id of the last row on a page as an opaque token."""
+    payload = json_util.dumps({"f": sort_field, "d": direction, "v": value, "id": id})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Tuple[str, int, Any, Any]:
+    """Decode a token from `encode_cursor` into (sort_field, direction, value, id).
+
+    The token comes from the client, so anything `encode_cursor` would not
+    produce is rejected: operator field names, documents or arrays as the
+    value (they would become query operators) and non-ObjectId ids.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json_util.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        sort_field, direction = payload["f"], payload["d"]
+        value, id = payload["v"], payload["id"]
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError, KeyError, TypeError) as e:
+        raise InvalidCursor("Invalid pagination cursor") from e
+    if not isinstance(sort_field, str) or not sort_field or sort_field.startswith("$"):
+        raise InvalidCursor("Invalid pagination cursor")
+    if direction not in (1, -1) or isinstance(value, (dict, list)) or not isinstance(id, ObjectId):
+        raise InvalidCursor("Invalid pagination cursor")
+    return sort_field, direction, value, id
+
+
+def keyset_filter(sort_field: str, direction: int, value: Any, id: Any) -> Dict[str, Any]:
+    """Match rows that sort strictly after (value, id) in the given direction.
+
+    MongoDB sorts missing/null values first, so they need explicit branches:
+    ascending they precede every value, descending they follow every value.
+    """
+    op = "$gt" if direction == 1 else "$lt"
+    if sort_field == "_id":
+        return {"_id": {op: id}}
+
+    same_value = {sort_field: value, "_id": {op: id}}
+    if value is None:
+        if direction == 1:
+            return {"$or": [same_value, {sort_field: {"$ne": None}}]}
+        return same_value
+    after = [{sort_field: {op: value}}, same_value]
+    if direction == -1:
+        after.append({sort_field: None})
+    return {"$or": after}
+
+
+class PageRequest:
+    """Resolved pagination for a list query, by page number or by cursor.
+
+    Page mode keeps the existing `skip` behaviour. Cursor mode turns the
+    position into a range query on the (indexed) sort key plus `_id`, so
+    deep pages cost the same as the first one. The cursor carries its sort
+    key and direction, which take precedence over `sort_by`/`sort_order`.
+
+    `sortable` lists the fields the endpoint may sort on (default: only
+    `sort_field`); `sort_field` and the cursor's sort key must be one of them.
+    """
+
+    def __init__(
+        self,
+        page: int,
+        per_page: int,
+        sort_field: str,
+        direction: int,
+        cursor: Optional[str] = None,
+        sortable: Optional[Iterable[str]] = None
+    ):
+        sortable = set(sortable) if sortable is not None else {sort_field}
+        if sort_field not in sortable:
+            raise InvalidSort(f"Cannot sort by {sort_field!r}; use one of: {', '.join(sorted(sortable))}")
+        self.page = page
+        self.per_page = per_page
+        self.sort_field = sort_field
+        self.direction = direction
+        self.after: Optional[Tuple[Any, Any]] = None
+        if cursor:
+            self.sort_field, self.direction, value, id = decode_cursor(cursor)
+            if self.sort_field not in sortable:
+                raise InvalidCursor("Invalid pagination cursor")
+            self.after = (value, id)
+
+    @property
+    def is_cursor(self) -> bool:
+        return self.after is not None
+
+    @property
+    def skip(self) -> int:
+        return 0 if self.is_cursor else (self.page - 1) * self.per_page
+
+    @property
+    def limit(self) -> int:
+        """Rows to fetch; one extra row tells whether another page exists."""
+        return self.per_page + 1
+
+    @property
+    def sort(self) -> List[Tuple[str, int]]:
+        """Sort spec with `_id` as tie-breaker so every row has a unique position."""
+        if self.sort_field == "_id":
+            return [("_id", self.direction)]
+        return [(self.sort_field, self.direction), ("_id", self.direction)]
+
+    def apply(self, filters: Dict[str, Any]) -> Dict[str, Any]:
+        """Add the keyset condition (cursor mode) to the list filters."""
+        if not self.is_cursor:
+            return filters
+        condition = keyset_filter(self.sort_field, self.direction, *self.after)
+        return {"$and": [filters, condition]} if filters else condition
+
+    def split(self, documents: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Trim the extra row and return (page rows, next cursor or None)."""
+        page = documents[:self.per_page]
+        if len(documents) <= self.per_page or not page:
+            return page, None
+        last = page[-1]
+        return page, encode_cursor(self.sort_field, self.direction, _get_path(last, self.sort_field), last["_id"])
+
+    def meta(self, total: Optional[int], count: int, next_cursor: Optional[str]) -> Dict[str, Any]:
+        """Pagination metadata; cursor pages have no page numbers or totals."""
+        if self.is_cursor:
+            return {
+                "current_page": None,
+                "from": None,
+                "last_page": None,
+                "per_page": self.per_page,
+                "to": None,
+                "total": None,
+                "next_cursor": next_cursor
+            }
+        return {
+            "current_page": self.page,
+            "from": self.skip + 1,
+            "last_page": (total + self.per_page - 1) // self.per_page,
+            "per_page": self.per_page,
+            "to": min(self.skip + count, total),
+            "total": total,
+            "next_cursor": next_cursor
+        }
+
+    def links(
+        self,
+        path: str,
+        total: Optional[int],
+        next_cursor: Optional[str],
+        params: Optional[Mapping[str, Any]] = None
+    ) -> Dict[str, Optional[str]]:
+        """Navigation links; `next` always continues from the cursor.
+
+        `params` are the request's query parameters (e.g. `request.query_params`);
+        everything but the paging ones is carried into each link so filters
+        and sorting survive navigation.
+        """
+        items = params.multi_items() if hasattr(params, "multi_items") else (params or {}).items()
+        carried = [(key, value) for key, value in items if key not in PAGING_PARAMS]
+
+        def link(**paging: Any) -> str:
+            return f"{path}?{urlencode([*paging.items(), ('per_page', self.per_page), *carried])}"
+
+        next_link = link(cursor=next_cursor) if next_cursor else None
+        if self.is_cursor:
+            return {
+                "first": link(page=1),
+                "last": None,
+                "prev": None,
+                "next": next_link
+            }
+        last_page = (total + self.per_page - 1) // self.per_page
+        return {
+            "first": link(page=1),
+            "last": link(page=last_page),
+            "prev": link(page=self.page - 1) if self.page > 1 else None,
+            "next": next_link
+        }
+
+
+def _get_path(document: Dict[str, Any], path: str) -> Any:
+    value: Any = document
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
@@ -0,0 +1,53 @@
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+import asyncio
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+from app.core.config import settings
+
+
+class QueryPlan:
+    """A set of named, independent queries executed concurrently.
+
+    Queries are registered as callables and only started once a slot is free,
+    so at most `max_concurrency` of them hold a connection at a time.
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None):
+        self.max_concurrency = max(1, max_concurrency or settings.analytics_max_concurrency)
+        self._queries: Dict[str, Tuple[Callable[..., Awaitable[Any]], tuple, dict]] = {}
+
+    def add(self, name: str, query: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any) -> "QueryPlan":
+        """Register `query(*args, **kwargs)` under `name`."""
+        self._queries[name] = (query, args, kwargs)
+        return self
+
+    async def run(self) -> Dict[str, Any]:
+        """Run all queries and return their results by name."""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def bounded(query: Callable[..., Awaitable[Any]], args: tuple, kwargs: dict) -> Any:
+            async with semaphore:
+                return await query(*args, **kwargs)
+
+        results = await asyncio.gather(*(bounded(*spec) for spec in self._queries.values()))
+        return dict(zip(self._queries, results))
+
+
+async def count_windows(
+    collection: AsyncIOMotorCollection,
+    field: str,
+    windows: Dict[str, datetime]
+) -> Dict[str, int]:
+    """Count documents with `field` at or after each cutoff in one $facet aggregation."""
+    pipeline = [
+        {"$match": {field: {"$gte": min(windows.values())}}},
+        {"$facet": {
+            name: [{"$match": {field: {"$gte": cutoff}}}, {"$count": "count"}]
+            for name, cutoff in windows.items()
+        }}
+    ]
+    results = await collection.aggregate(pipeline).to_list(length=1)
+    facets = results[0] if results else {}
+    return {name: facets[name][0]["count"] if facets.get(name) else 0 for name in windows}
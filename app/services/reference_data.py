@@ -0,0 +1,127 @@
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import logging
+import time
+
+from app.core.cache import SWRCache
+from app.core.config import settings
+from app.db.database import database, COLLECTIONS
+from app.services.counters import allocate
+from app.services.exports import export_value
+
+
+logger = logging.getLogger(__name__)
+
+# Catalogs served by /reference-data (COLLECTIONS keys) and the fields each
+# picker needs besides `id`; only active documents are included
+REFERENCE_CATALOGS: Dict[str, Tuple[str, ...]] = {
+    "species": ("name",),
+    "breeds": ("name", "species_id"),
+    "allergies": ("name", "description"),
+    "vaccinations": ("name", "description", "duration_months"),
+    "services": ("name", "price", "duration", "category", "service_type"),
+    "products": ("name", "price", "category", "sku"),
+}
+
+# Bump when the payload shape changes so clients drop ETags from older builds
+REFERENCE_DATA_FORMAT = 1
+
+VERSION_COUNTER_PREFIX = "catalog_version:"
+
+# Catalog versions as last read from (or written to) the counters collection
+_versions: Dict[str, int] = {}
+_versions_read_at: Optional[float] = None
+
+# Payloads keyed by ETag, which every API write changes; the TTL only bounds
+# how long edits made outside the API go unnoticed
+reference_data_cache = SWRCache(max_size=4, ttl=settings.reference_data_cache_ttl_seconds, stale_ttl=0)
+
+
+async def bump_version(catalog: str):
+    """Record a write to a reference catalog, invalidating /reference-data.
+
+    Called by the catalog CRUD classes after every successful write. The
+    write has already happened, so failures are logged and the cached
+    versions are re-read on the next request instead.
+    """
+    global _versions_read_at
+    if catalog not in REFERENCE_CATALOGS:
+        return
+    try:
+        version = await allocate(f"{VERSION_COUNTER_PREFIX}{catalog}")
+    except Exception as e:
+        logger.exception("❌ Failed to bump %s version: %s", catalog, e)
+        _versions_read_at = None
+        return
+    _versions[catalog] = max(_versions.get(catalog, 0), version)
+
+
+async def current_versions() -> Dict[str, int]:
+    """Catalog versions, re-read at most every `reference_data_version_ttl_seconds`.
+
+    Writes in this process update the versions immediately; the TTL bounds
+    how long other processes keep serving the previous ETag.
+    """
+    global _versions_read_at
+    now = time.monotonic()
+    if _versions_read_at is None or now - _versions_read_at >= settings.reference_data_version_ttl_seconds:
+        names = {f"{VERSION_COUNTER_PREFIX}{catalog}": catalog for catalog in REFERENCE_CATALOGS}
+        collection = database.get_collection(COLLECTIONS["counters"])
+        async for counter in collection.find({"_id": {"$in": list(names)}}):
+            _versions[names[counter["_id"]]] = counter["value"]
+        _versions_read_at = now
+    return dict(_versions)
+
+
+def etag_for(versions: Dict[str, int]) -> str:
+    """Strong ETag derived from the catalog versions."""
+    parts = "-".join(str(versions.get(catalog, 0)) for catalog in REFERENCE_CATALOGS)
+    return f'"rd{REFERENCE_DATA_FORMAT}-{parts}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches `etag` (weak comparison, as for GET)."""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in [candidate.removeprefix("W/") for candidate in candidates]
+
+
+async def _load_catalog(catalog: str, fields: Tuple[str, ...]) -> List[Dict[str, Any]]:
+    # Primary reads: a lagging secondary would cache old data under the new ETag
+    collection = database.get_collection(COLLECTIONS[catalog])
+    projection = {field: 1 for field in fields}
+    cursor = collection.find({"status": True}, projection).sort("name", 1)
+    return [
+        {"id": str(document["_id"]), **{field: export_value(document.get(field)) for field in fields}}
+        async for document in cursor
+    ]
+
+
+async def _load_reference_data() -> Dict[str, List[Dict[str, Any]]]:
+    catalogs = await asyncio.gather(*(
+        _load_catalog(catalog, fields) for catalog, fields in REFERENCE_CATALOGS.items()
+    ))
+    return dict(zip(REFERENCE_CATALOGS, catalogs))
+
+
+async def reference_data(etag: str) -> Dict[str, List[Dict[str, Any]]]:
+    """All reference catalogs for `etag` (from `current_versions`), loaded once per ETag."""
+    return await reference_data_cache.get_or_compute(etag, _load_reference_data)
+
+
+async def _bump_all():
+    await database.connect()
+    if not database.is_connected():
+        raise SystemExit("Database not connected")
+    try:
+        for catalog in REFERENCE_CATALOGS:
+            await bump_version(catalog)
+        print(f"Reference data ETag is now {etag_for(await current_versions())}")
+    finally:
+        await database.disconnect()
+
+
+if __name__ == "__main__":
+    # Invalidate /reference-data after editing catalogs outside the API (seeds, shell fixes)
+    asyncio.run(_bump_all())
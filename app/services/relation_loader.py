@@ -0,0 +1,81 @@
+from typing import Any, Dict, Iterable, List, Optional
+from bson import ObjectId
+
+from app.db.database import database, COLLECTIONS
+
+
+def to_object_id(value: Any) -> Optional[ObjectId]:
+    """Coerce a stored reference (ObjectId or hex string) to an ObjectId."""
+    if isinstance(value, ObjectId):
+        return value
+    if isinstance(value, str) and ObjectId.is_valid(value):
+        return ObjectId(value)
+    return None
+
+
+class RelationLoader:
+    """Batch loader for related documents, scoped to a single request.
+
+    Every referenced ID on a page is collected and fetched with one `$in`
+    query per collection. Results (including misses) are cached so the same
+    species, service or client is never fetched twice within the request.
+    Catalogs held by the catalog cache are served from memory instead.
+    """
+
+    def __init__(self, read: Optional[str] = None):
+        self.read = read  # Read policy for fetches; see app.db.database.read_preference
+        self._cache: Dict[str, Dict[ObjectId, Optional[dict]]] = {}
+
+    def prime(self, collection_name: str, documents: Iterable[dict]):
+        """Seed the cache with documents that were already fetched."""
+        cache = self._cache.setdefault(collection_name, {})
+        for document in documents:
+            if document and "_id" in document:
+                cache[document["_id"]] = document
+
+    async def load_many(self, collection_name: str, ids: Iterable[Any]) -> Dict[ObjectId, dict]:
+        """Load documents by ID, fetching only those not already cached."""
+        cache = self._cache.setdefault(collection_name, {})
+        wanted = {oid for oid in (to_object_id(value) for value in ids) if oid is not None}
+        missing = [oid for oid in wanted if oid not in cache]
+
+        if missing:
+            from app.services.catalog_cache import catalog_cache  # imports to_object_id from this module
+            if catalog_cache.caches(collection_name):
+                documents = list((await catalog_cache.get_many(collection_name, missing)).values())
+            else:
+                collection = database.get_collection(COLLECTIONS[collection_name], read=self.read)
+                documents = await collection.find({"_id": {"$in": missing}}).to_list(length=None)
+            for oid in missing:
+                cache[oid] = None
+            for document in documents:
+                cache[document["_id"]] = document
+
+        return {oid: cache[oid] for oid in wanted if cache.get(oid) is not None}
+
+    async def load(self, collection_name: str, id: Any) -> Optional[dict]:
+        """Load a single document by ID."""
+        oid = to_object_id(id)
+        if oid is None:
+            return None
+        documents = await self.load_many(collection_name, [oid])
+        return documents.get(oid)
+
+    def get(self, collection_name: str, id: Any) -> Optional[dict]:
+        """Get a document that has already been loaded."""
+        oid = to_object_id(id)
+        if oid is None:
+            return None
+        return self._cache.get(collection_name, {}).get(oid)
+
+
+def collect_ids(rows: List[dict], field: str) -> List[Any]:
+    """Collect every reference stored in `field` across rows (scalar or list)."""
+    ids = []
+    for row in rows:
+        value = row.get(field)
+        if isinstance(value, list):
+            ids.extend(value)
+        elif value is not None:
+            ids.append(value)
+    return ids
@@ -0,0 +1,180 @@
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+from app.core.config import settings
+from app.db.database import COLLECTIONS
+from app.services.relation_loader import RelationLoader
+
+
+class Relation:
+    """Declarative description of a reference from one collection to another."""
+
+    def __init__(
+        self,
+        collection: str,
+        local_field: str,
+        many: bool = False,
+        nested: Optional[Dict[str, "Relation"]] = None
+    ):
+        self.collection = collection
+        self.local_field = local_field
+        self.many = many
+        self.nested = nested or {}
+
+    @property
+    def alias(self) -> str:
+        """Field the joined documents are stored under in aggregation output."""
+        return f"_rel_{self.collection}"
+
+
+# Relations that list endpoints can expand with `include=`
+RESOURCE_RELATIONS: Dict[str, Dict[str, Relation]] = {
+    "appointments": {
+        "client": Relation("clients", "client_id"),
+        "pet": Relation("pets", "pet_id", nested={"species": Relation("species", "species_id")}),
+        "user": Relation("users", "veterinarian_id"),
+        "service": Relation("services", "service_id"),
+    },
+    "invoices": {
+        "client": Relation("clients", "client_id"),
+        "pet": Relation("pets", "pet_id", nested={"species": Relation("species", "species_id")}),
+    },
+    "pets": {
+        "client": Relation("clients", "client_id"),
+        "species": Relation("species", "species_id"),
+        "breed": Relation("breeds", "breed_id"),
+        "allergies": Relation("allergies", "allergies", many=True),
+        "vaccinations": Relation("vaccinations", "vaccinations.vaccination_id", many=True),
+    },
+}
+
+JOIN_MODES = ("loader", "lookup")
+
+
+class InvalidJoinMode(ValueError):
+    """Raised when `join_mode` is not one of JOIN_MODES."""
+
+
+def resolve_join_mode(join_mode: Optional[str]) -> str:
+    """The relation join strategy for a list request: `join_mode` or the configured default."""
+    mode = join_mode or settings.list_join_mode
+    if mode not in JOIN_MODES:
+        raise InvalidJoinMode(f"Invalid join_mode {mode!r}; use one of: {', '.join(JOIN_MODES)}")
+    return mode
+
+
+def _as_object_id(expression: Any) -> dict:
+    """Aggregation expression converting a stored reference to ObjectId.
+
+    References are stored both as ObjectId and as hex strings, so the join
+    must normalise before comparing against `_id`.
+    """
+    return {"$convert": {"input": expression, "to": "objectId", "onError": None, "onNull": None}}
+
+
+def build_lookup_stage(relation: Relation) -> dict:
+    """Build the `$lookup` stage for a relation, including nested relations."""
+    if relation.many:
+        match = {"$in": ["$_id", {
+            "$map": {
+                "input": {"$ifNull": ["$$ref", []]},
+                "as": "item",
+                "in": _as_object_id("$$item")
+            }
+        }]}
+    else:
+        match = {"$eq": ["$_id", _as_object_id("$$ref")]}
+
+    pipeline: List[dict] = [{"$match": {"$expr": match}}]
+    for nested in relation.nested.values():
+        pipeline.append(build_lookup_stage(nested))
+
+    return {
+        "$lookup": {
+            "from": COLLECTIONS[relation.collection],
+            "let": {"ref": f"${relation.local_field}"},
+            "pipeline": pipeline,
+            "as": relation.alias
+        }
+    }
+
+
+def build_list_pipeline(
+    resource: str,
+    filters: Dict[str, Any],
+    sort: List[Tuple[str, int]],
+    skip: int,
+    limit: int,
+    include_fields: List[str],
+    projection: Optional[Dict[str, int]] = None
+) -> List[dict]:
+    """Build a pipeline returning one page with its relations joined.
+
+    `$match`, `$sort`, `$skip` and `$limit` lead the pipeline so the sort can
+    use an index and only the page's rows reach the joins.
+    """
+    relations = RESOURCE_RELATIONS.get(resource, {})
+
+    pipeline: List[dict] = [{"$match": filters}]
+    if sort:
+        pipeline.append({"$sort": dict(sort)})
+    pipeline.append({"$skip": skip})
+    pipeline.append({"$limit": limit})
+    if projection:
+        pipeline.append({"$project": projection})
+    for name in include_fields:
+        if name in relations:
+            pipeline.append(build_lookup_stage(relations[name]))
+    return pipeline
+
+
+def relation_fields(resource: str, include_fields: List[str]) -> List[str]:
+    """Top-level fields the given `include=` relations join on."""
+    relations = RESOURCE_RELATIONS.get(resource, {})
+    return [relations[name].local_field.split(".")[0] for name in include_fields if name in relations]
+
+
+def _prime_relations(document: dict, relations: Dict[str, Relation], loader: RelationLoader):
+    """Move joined documents out of a result row and into the loader cache."""
+    for relation in relations.values():
+        joined = document.pop(relation.alias, None)
+        if joined is None:
+            continue
+        for related in joined:
+            _prime_relations(related, relation.nested, loader)
+        loader.prime(relation.collection, joined)
+
+
+async def run_list_query(
+    collection: AsyncIOMotorCollection,
+    resource: str,
+    filters: Dict[str, Any],
+    sort: List[Tuple[str, int]],
+    skip: int,
+    limit: int,
+    include_fields: List[str],
+    loader: RelationLoader,
+    projection: Optional[Dict[str, int]] = None,
+    count: bool = True
+) -> Tuple[List[dict], Optional[int]]:
+    """Fetch a page and its included relations in one aggregation.
+
+    Related documents are primed into `loader`, so handlers can stitch the
+    response exactly as they do for the Python-side join. A `projection`
+    trims page rows before the joins; it must keep the joined references.
+    With `count`, the total is counted concurrently; otherwise it is None.
+    """
+    pipeline = build_list_pipeline(resource, filters, sort, skip, limit, include_fields, projection)
+    page = collection.aggregate(pipeline).to_list(length=None)
+    if count:
+        documents, total_count = await asyncio.gather(page, collection.count_documents(filters))
+    else:
+        documents, total_count = await page, None
+
+    relations = RESOURCE_RELATIONS.get(resource, {})
+    for document in documents:
+        _prime_relations(document, relations, loader)
+
+    return documents, total_count
@@ -0,0 +1,262 @@
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional
+import asyncio
+import logging
+
+from pymongo import ReadPreference, ReplaceOne, UpdateOne
+
+from app.core.config import settings
+from app.db.database import database, COLLECTIONS
+
+
+logger = logging.getLogger(__name__)
+
+# day ("YYYY-MM-DD") -> dotted field -> increment
+RollupChanges = Dict[str, Dict[str, float]]
+
+
+def day_start(value: datetime) -> datetime:
+    """Midnight (naive UTC) of the day a timestamp falls on."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def day_key(value: datetime) -> str:
+    """Rollup document id for the day a timestamp falls on."""
+    return day_start(value).strftime("%Y-%m-%d")
+
+
+def _key_part(value: Any) -> str:
+    return str(getattr(value, "value", value))
+
+
+def _appointment_fields(appointment: Optional[Dict[str, Any]]) -> RollupChanges:
+    """Counters a single appointment contributes to its day's rollup."""
+    if not appointment or not appointment.get("status", True) or not appointment.get("appointment_date"):
+        return {}
+    fields = {"appointments.total": 1}
+    if appointment.get("appointment_status"):
+        fields[f"appointments.by_status.{_key_part(appointment['appointment_status'])}"] = 1
+    if appointment.get("service_id"):
+        fields[f"appointments.by_service.{_key_part(appointment['service_id'])}"] = 1
+    if appointment.get("veterinarian_id"):
+        fields[f"appointments.by_vet.{_key_part(appointment['veterinarian_id'])}"] = 1
+    return {day_key(appointment["appointment_date"]): fields}
+
+
+async def apply_rollup_changes(changes: RollupChanges, session=None):
+    """$inc the given counters on their day documents, creating days as needed.
+
+    Rollups are derived data: failures are logged rather than failing the
+    write that triggered them, and the periodic rebuild repairs any drift.
+    """
+    updates = []
+    for day, fields in changes.items():
+        increments = {field: amount for field, amount in fields.items() if amount}
+        if increments:
+            updates.append(UpdateOne(
+                {"_id": day},
+                {"$inc": increments, "$setOnInsert": {"date": datetime.strptime(day, "%Y-%m-%d")}},
+                upsert=True
+            ))
+    if not updates:
+        return
+    try:
+        collection = database.get_collection(COLLECTIONS["daily_rollups"])
+        await collection.bulk_write(updates, ordered=False, session=session)
+    except Exception as e:
+        logger.exception("❌ Failed to update daily rollups: %s", e)
+
+
+async def record_appointment_change(
+    before: Optional[Dict[str, Any]],
+    after: Optional[Dict[str, Any]],
+    session=None
+):
+    """Move an appointment's contribution from its old state to its new one."""
+    changes: RollupChanges = defaultdict(lambda: defaultdict(int))
+    for day, fields in _appointment_fields(before).items():
+        for field, amount in fields.items():
+            changes[day][field] -= amount
+    for day, fields in _appointment_fields(after).items():
+        for field, amount in fields.items():
+            changes[day][field] += amount
+    await apply_rollup_changes(changes, session=session)
+
+
+async def record_created(counter: str, created_at: Optional[datetime], session=None):
+    """Count a new client, pet or invoice ("new_clients", "new_pets", "invoices")."""
+    if created_at is not None:
+        await apply_rollup_changes({day_key(created_at): {counter: 1}}, session=session)
+
+
+async def record_created_many(counter: str, created_ats: Iterable[Optional[datetime]], session=None):
+    """Count a batch of new records with a single rollup write."""
+    changes: RollupChanges = defaultdict(lambda: defaultdict(int))
+    for created_at in created_ats:
+        if created_at is not None:
+            changes[day_key(created_at)][counter] += 1
+    await apply_rollup_changes(changes, session=session)
+
+
+async def record_appointments_created(appointments: Iterable[Dict[str, Any]], session=None):
+    """Count a batch of new appointments with a single rollup write."""
+    changes: RollupChanges = defaultdict(lambda: defaultdict(int))
+    for appointment in appointments:
+        for day, fields in _appointment_fields(appointment).items():
+            for field, amount in fields.items():
+                changes[day][field] += amount
+    await apply_rollup_changes(changes, session=session)
+
+
+async def record_revenue_delta(created_at: Optional[datetime], delta: float, session=None):
+    """Shift revenue for the day an invoice was created on."""
+    if created_at is not None and delta:
+        await apply_rollup_changes({day_key(created_at): {"revenue": round(delta, 2)}}, session=session)
+
+
+def _empty_rollup(day: datetime) -> Dict[str, Any]:
+    return {
+        "_id": day.strftime("%Y-%m-%d"),
+        "date": day,
+        "appointments": {"total": 0, "by_status": {}, "by_service": {}, "by_vet": {}},
+        "revenue": 0.0,
+        "invoices": 0,
+        "new_clients": 0,
+        "new_pets": 0
+    }
+
+
+def _source(name: str):
+    # Rebuilds run on the analytics pool but read the primary: they overwrite
+    # counters that are maintained on the primary, so they must not lag it.
+    return database.get_analytics_collection(COLLECTIONS[name]).with_options(read_preference=ReadPreference.PRIMARY)
+
+
+def _by_day(field: str) -> Dict[str, Any]:
+    return {"$dateToString": {"format": "%Y-%m-%d", "date": f"${field}"}}
+
+
+async def rebuild_rollups(start: datetime, end: datetime, include_today: bool = False) -> Dict[str, int]:
+    """Recompute the rollups for every closed day in [start, end] from the source collections.
+
+    Day documents are replaced with the recomputed counters, so an `$inc`
+    landing between the aggregation and the write would be lost. Today
+    takes those on every write and is skipped unless `include_today` (for
+    backfills while nothing else writes).
+    """
+    first_day = day_start(start)
+    until = day_start(end) + timedelta(days=1)
+    if not include_today:
+        until = min(until, day_start(datetime.utcnow()))
+    if until <= first_day:
+        return {"days": 0, "written": 0, "removed": 0}
+    rollups: Dict[str, Dict[str, Any]] = {}
+
+    def rollup_for(day: str) -> Dict[str, Any]:
+        if day not in rollups:
+            rollups[day] = _empty_rollup(datetime.strptime(day, "%Y-%m-%d"))
+        return rollups[day]
+
+    appointments_collection = _source("appointments")
+    pipeline = [
+        {"$match": {"appointment_date": {"$gte": first_day, "$lt": until}, "status": True}},
+        {"$group": {
+            "_id": {
+                "day": _by_day("appointment_date"),
+                "status": "$appointment_status",
+                "service": {"$toString": "$service_id"},
+                "vet": {"$toString": "$veterinarian_id"}
+            },
+            "count": {"$sum": 1}
+        }}
+    ]
+    async for row in appointments_collection.aggregate(pipeline):
+        appointments = rollup_for(row["_id"]["day"])["appointments"]
+        appointments["total"] += row["count"]
+        for group, key in (("by_status", "status"), ("by_service", "service"), ("by_vet", "vet")):
+            if row["_id"].get(key):
+                counts = appointments[group]
+                counts[row["_id"][key]] = counts.get(row["_id"][key], 0) + row["count"]
+
+    invoices_collection = _source("invoices")
+    pipeline = [
+        {"$match": {"created_at": {"$gte": first_day, "$lt": until}}},
+        {"$group": {
+            "_id": _by_day("created_at"),
+            "count": {"$sum": 1},
+            "revenue": {"$sum": {"$ifNull": ["$subtotal", 0]}}
+        }}
+    ]
+    async for row in invoices_collection.aggregate(pipeline):
+        rollup = rollup_for(row["_id"])
+        rollup["invoices"] = row["count"]
+        rollup["revenue"] = round(row["revenue"], 2)
+
+    for name, counter in (("clients", "new_clients"), ("pets", "new_pets")):
+        pipeline = [
+            {"$match": {"created_at": {"$gte": first_day, "$lt": until}}},
+            {"$group": {"_id": _by_day("created_at"), "count": {"$sum": 1}}}
+        ]
+        async for row in _source(name).aggregate(pipeline):
+            rollup_for(row["_id"])[counter] = row["count"]
+
+    collection = database.get_collection(COLLECTIONS["daily_rollups"])
+    day_range = {"$gte": first_day.strftime("%Y-%m-%d"), "$lt": until.strftime("%Y-%m-%d")}
+    if rollups:
+        await collection.bulk_write(
+            [ReplaceOne({"_id": day}, rollup, upsert=True) for day, rollup in rollups.items()],
+            ordered=False
+        )
+    removed = await collection.delete_many({"_id": {**day_range, "$nin": list(rollups)}})
+    return {"days": (until - first_day).days, "written": len(rollups), "removed": removed.deleted_count}
+
+
+async def get_rollups(start: datetime, end: datetime) -> List[Dict[str, Any]]:
+    """Get the rollup documents for [start, end], oldest first."""
+    collection = database.get_analytics_collection(COLLECTIONS["daily_rollups"])
+    cursor = collection.find(
+        {"_id": {"$gte": day_key(start), "$lte": day_key(end)}}
+    ).sort("_id", 1)
+    return await cursor.to_list(length=None)
+
+
+async def run_rollup_job():
+    """Periodically rebuild the rollups of recent closed days until cancelled."""
+    interval = settings.rollup_rebuild_interval_minutes * 60
+    while True:
+        try:
+            if database.is_connected():
+                end = datetime.utcnow()
+                await rebuild_rollups(end - timedelta(days=settings.rollup_rebuild_days), end)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Daily rollup rebuild failed: {e}")
+        await asyncio.sleep(interval)
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    async def main(days: int, include_today: bool):
+        await database.connect()
+        if not database.is_connected():
+            raise SystemExit("Database not connected")
+        try:
+            end = datetime.utcnow()
+            print(json.dumps(await rebuild_rollups(end - timedelta(days=days), end, include_today), indent=2))
+        finally:
+            await database.disconnect()
+
+    parser = argparse.ArgumentParser(description="Backfill daily analytics rollups")
+    parser.add_argument("--days", type=int, default=365, help="Number of past days to rebuild")
+    parser.add_argument("--include-today", action="store_true",
+                        help="Also rebuild today (only while the API is not taking writes)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(args.days, args.include_today))
@@ -0,0 +1,91 @@
+from datetime import datetime, timezone
+from typing import Any, Dict
+import asyncio
+import logging
+
+from app.core.config import settings
+from app.db.database import database, COLLECTIONS
+from app.crud import (
+    user_crud,
+    client_crud,
+    pet_crud,
+    species_crud,
+    breed_crud,
+    service_crud,
+    product_crud,
+)
+from app.crud.allergy_type import allergy_type_crud
+from app.crud.vaccination_type import vaccination_type_crud
+
+
+logger = logging.getLogger(__name__)
+
+# Collections whose documents are checked against their DB schema
+VALIDATED_COLLECTIONS = {
+    "users": user_crud,
+    "clients": client_crud,
+    "pets": pet_crud,
+    "species": species_crud,
+    "breeds": breed_crud,
+    "services": service_crud,
+    "products": product_crud,
+    "allergies": allergy_type_crud,
+    "vaccinations": vaccination_type_crud,
+}
+
+# Latest report per collection, populated by the background job
+latest_reports: Dict[str, Dict[str, Any]] = {}
+
+
+async def validate_collection(name: str, batch_size: int = 500, sample_size: int = 20) -> Dict[str, Any]:
+    """Stream a collection and report documents that fail schema validation."""
+    crud = VALIDATED_COLLECTIONS[name]
+    collection = database.get_collection(COLLECTIONS[name])
+
+    checked = 0
+    invalid_ids = []
+    invalid_count = 0
+    async for document in collection.find({}, batch_size=batch_size):
+        checked += 1
+        try:
+            crud.model(**document)
+        except Exception:
+            invalid_count += 1
+            if len(invalid_ids) < sample_size:
+                invalid_ids.append(str(document.get("_id")))
+
+    report = {
+        "collection": name,
+        "checked": checked,
+        "invalid": invalid_count,
+        "invalid_sample": invalid_ids,
+        "validated_at": datetime.now(timezone.utc).isoformat()
+    }
+    latest_reports[name] = report
+    return report
+
+
+async def validate_all() -> Dict[str, Dict[str, Any]]:
+    """Validate every registered collection."""
+    for name in VALIDATED_COLLECTIONS:
+        report = await validate_collection(name)
+        if report["invalid"]:
+            logger.warning(
+                "Schema validation: %s has %d invalid of %d documents (sample: %s)",
+                name, report["invalid"], report["checked"], report["invalid_sample"]
+            )
+    return latest_reports
+
+
+async def run_validation_job():
+    """Periodically validate collections until cancelled."""
+    interval = settings.schema_validation_interval_minutes * 60
+    while True:
+        try:
+            if database.is_connected():
+                await validate_all()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Schema validation job failed: {e}")
+        await asyncio.sleep(interval)
@@ -0,0 +1,92 @@
+from typing import Any, Dict, List, Optional
+import logging
+import re
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import UpdateOne
+
+from app.db.database import database, COLLECTIONS
+from app.services.relation_loader import RelationLoader, collect_ids
+
+
+logger = logging.getLogger(__name__)
+
+# Invoice fields that feed `search_text`; changing any of them needs a refresh
+INVOICE_SEARCH_SOURCES = ("invoice_number", "client_id", "pet_id")
+
+
+def normalize(value: Optional[str]) -> str:
+    """Lowercase and trim a value for storage in or matching against `search_text`."""
+    return (value or "").strip().lower()
+
+
+def invoice_search_text(
+    invoice_number: Optional[str],
+    client_name: Optional[str],
+    pet_name: Optional[str]
+) -> str:
+    """Denormalized, lowercased text an invoice is searched by.
+
+    Parts are joined with a newline, which a search term cannot contain, so a
+    match never spans two fields.
+    """
+    return "\n".join(normalize(part) for part in (invoice_number, client_name, pet_name))
+
+
+def search_filter(term: str) -> Dict[str, Any]:
+    """Case-insensitive substring match on `search_text`."""
+    return {"search_text": {"$regex": re.escape(normalize(term))}}
+
+
+async def build_invoice_search_text(invoice: Dict[str, Any], loader: Optional[RelationLoader] = None) -> str:
+    """Compute `search_text` for an invoice document, loading the client and pet names."""
+    loader = loader or RelationLoader()
+    client = await loader.load("clients", invoice.get("client_id"))
+    pet = await loader.load("pets", invoice.get("pet_id"))
+    return invoice_search_text(
+        invoice.get("invoice_number"),
+        client.get("name") if client else None,
+        pet.get("name") if pet else None
+    )
+
+
+async def refresh_invoice_search(filters: Dict[str, Any], batch_size: int = 500) -> int:
+    """Recompute `search_text` for every invoice matching `filters`.
+
+    Called after an invoice's number or references change and after a client
+    or pet is renamed. Names are batch-loaded per chunk of invoices. Search is
+    derived data, so failures are logged rather than failing the write.
+    Returns the number of invoices rewritten.
+    """
+    collection = database.get_collection(COLLECTIONS["invoices"])
+    projection = {field: 1 for field in INVOICE_SEARCH_SOURCES + ("search_text",)}
+    updated = 0
+    try:
+        cursor = collection.find(filters, projection).sort("_id", 1).batch_size(batch_size)
+        batch: List[Dict[str, Any]] = []
+        async for invoice in cursor:
+            batch.append(invoice)
+            if len(batch) >= batch_size:
+                updated += await write_invoice_search_text(collection, batch)
+                batch = []
+        if batch:
+            updated += await write_invoice_search_text(collection, batch)
+    except Exception as e:
+        logger.exception("❌ Failed to refresh invoice search text: %s", e)
+    return updated
+
+
+async def write_invoice_search_text(collection: AsyncIOMotorCollection, invoices: List[Dict[str, Any]]) -> int:
+    """Store fresh `search_text` on a batch of invoices; returns how many changed."""
+    loader = RelationLoader()
+    await loader.load_many("clients", collect_ids(invoices, "client_id"))
+    await loader.load_many("pets", collect_ids(invoices, "pet_id"))
+
+    updates = []
+    for invoice in invoices:
+        text = await build_invoice_search_text(invoice, loader)
+        if invoice.get("search_text") != text:
+            updates.append(UpdateOne({"_id": invoice["_id"]}, {"$set": {"search_text": text}}))
+    if updates:
+        await collection.bulk_write(updates, ordered=False)
+    return len(updates)
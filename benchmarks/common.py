@@ -0,0 +1,75 @@
+"""Shared helpers for the HTTP benchmarks.
+
+Benchmarks run against a live API (``BENCH_BASE_URL``, default
+``http://localhost:8000``) and log in with ``BENCH_EMAIL`` /
+``BENCH_PASSWORD`` (defaults to the configured admin user).
+"""
+import os
+import statistics
+import time
+from typing import Dict, List, Optional
+
+import aiohttp
+
+from app.core.config import settings
+
+
+BASE_URL = os.getenv("BENCH_BASE_URL", "http://localhost:8000")
+EMAIL = os.getenv("BENCH_EMAIL", settings.admin_email)
+PASSWORD = os.getenv("BENCH_PASSWORD", settings.admin_password)
+
+
+async def login(session: aiohttp.ClientSession) -> Dict[str, str]:
+    """Log in and return the Authorization header."""
+    async with session.post(
+        f"{BASE_URL}/api/v1/auth/login",
+        json={"email": EMAIL, "password": PASSWORD}
+    ) as response:
+        response.raise_for_status()
+        body = await response.json()
+    return {"Authorization": f"Bearer {body['data']['access_token']}"}
+
+
+async def time_request(
+    session: aiohttp.ClientSession,
+    path: str,
+    headers: Optional[Dict[str, str]] = None
+) -> Dict[str, float]:
+    """Issue one GET and return its latency (ms) and payload size (bytes)."""
+    start = time.perf_counter()
+    async with session.get(f"{BASE_URL}{path}", headers=headers) as response:
+        payload = await response.read()
+        response.raise_for_status()
+    return {"ms": (time.perf_counter() - start) * 1000, "bytes": len(payload)}
+
+
+async def measure(
+    session: aiohttp.ClientSession,
+    path: str,
+    headers: Optional[Dict[str, str]] = None,
+    repeat: int = 20
+) -> Dict[str, float]:
+    """Time `repeat` sequential requests to `path`."""
+    samples: List[Dict[str, float]] = []
+    for _ in range(repeat):
+        samples.append(await time_request(session, path, headers))
+    return summarize([sample["ms"] for sample in samples], samples[-1]["bytes"])
+
+
+def summarize(latencies: List[float], payload_bytes: float = 0) -> Dict[str, float]:
+    """Summarise latency samples."""
+    ordered = sorted(latencies)
+    return {
+        "p50_ms": round(statistics.median(ordered), 2),
+        "p95_ms": round(ordered[max(0, int(len(ordered) * 0.95) - 1)], 2),
+        "mean_ms": round(statistics.fmean(ordered), 2),
+        "bytes": payload_bytes
+    }
+
+
+def print_table(title: str, rows: Dict[str, Dict[str, float]]):
+    """Print results as an aligned table."""
+    print(f"\n{title}")
+    print(f"{'case':<40} {'p50 ms':>10} {'p95 ms':>10} {'mean ms':>10} {'bytes':>10}")
+    for name, result in rows.items():
+        print(f"{name:<40} {result['p50_ms']:>10} {result['p95_ms']:>10} {result['mean_ms']:>10} {result['bytes']:>10}")
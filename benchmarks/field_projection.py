@@ -0,0 +1,44 @@
+"""Compare full list responses with sparse ``fields=`` responses.
+
+Each list endpoint is fetched once with whole documents and once with a
+dropdown-style fieldset; payload size and latency are reported side by side.
+
+Usage: python -m benchmarks.field_projection [--per-page 100] [--repeat 20]
+"""
+import argparse
+import asyncio
+
+import aiohttp
+
+from benchmarks.common import login, measure, print_table
+
+
+# (path, sparse fieldset) per endpoint; paths take per_page or limit as query parameters
+CASES = {
+    "pets": ("/api/v1/pets/?per_page={n}", "name,client_id"),
+    "appointments": ("/api/v1/appointments/?per_page={n}", "appointment_date,appointment_status"),
+    "invoices": ("/api/v1/invoices/?per_page={n}", "invoice_number,total"),
+    "invoice-items": ("/api/v1/invoice-items/?limit={n}", "item_name,net_price"),
+    "clients": ("/api/v1/clients/?limit={n}", "name"),
+    "services": ("/api/v1/services/?limit={n}", "name,price"),
+    "products": ("/api/v1/products/?limit={n}", "name,price"),
+}
+
+
+async def main(per_page: int, repeat: int):
+    results: dict = {}
+    async with aiohttp.ClientSession() as session:
+        headers = await login(session)
+        for name, (path, fields) in CASES.items():
+            path = path.format(n=per_page)
+            results[f"{name} [full]"] = await measure(session, path, headers, repeat)
+            results[f"{name} [sparse]"] = await measure(session, f"{path}&fields={fields}", headers, repeat)
+    print_table(f"Full vs projected list responses (per_page={per_page})", results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--per-page", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.per_page, args.repeat))
@@ -0,0 +1,83 @@
+"""Check invoice number allocation under concurrency.
+
+Runs N coroutines that each allocate numbers at the same time, once with
+the legacy "find last number, then insert" approach and once with the
+counters collection, and reports duplicates and throughput. Uses a scratch
+collection and counter, which are removed afterwards.
+
+Usage: python -m benchmarks.invoice_numbers [--workers 50] [--per-worker 20] [--block 10]
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from collections import Counter
+from typing import List
+
+from app.db.database import database, COLLECTIONS
+from app.services.counters import allocate
+
+
+PREFIX = "BENCH-"
+
+
+async def legacy_allocate(collection) -> str:
+    """Previous approach: read the highest number, add one, insert."""
+    last = await collection.find_one({"number": {"$regex": f"^{PREFIX}"}}, sort=[("number", -1)])
+    next_number = int(last["number"][len(PREFIX):]) + 1 if last else 1
+    number = f"{PREFIX}{str(next_number).zfill(6)}"
+    await collection.insert_one({"number": number})
+    return number
+
+
+async def counter_allocate(name: str, block: int) -> List[str]:
+    last = await allocate(name, block)
+    return [f"{PREFIX}{str(n).zfill(6)}" for n in range(last - block + 1, last + 1)]
+
+
+def report(label: str, numbers: List[str], elapsed: float):
+    duplicates = sum(count - 1 for count in Counter(numbers).values() if count > 1)
+    print(f"{label:<28} {len(numbers):>7} numbers  {duplicates:>6} duplicates  "
+          f"{len(numbers) / elapsed:>9.1f} numbers/s")
+
+
+async def main(workers: int, per_worker: int, block: int):
+    await database.connect()
+    if not database.is_connected():
+        raise SystemExit("Database not connected")
+
+    db = database.get_database()
+    scratch = db[f"bench_invoice_numbers_{uuid.uuid4().hex[:8]}"]
+    counter_name = f"bench:{uuid.uuid4().hex}"
+    try:
+        async def legacy_worker():
+            return [await legacy_allocate(scratch) for _ in range(per_worker)]
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(legacy_worker() for _ in range(workers)))
+        report("legacy find+insert", [n for numbers in results for n in numbers], time.perf_counter() - started)
+
+        async def counter_worker(size: int):
+            numbers = []
+            for _ in range(per_worker // size or 1):
+                numbers.extend(await counter_allocate(counter_name, size))
+            return numbers
+
+        for size in (1, block):
+            await db[COLLECTIONS["counters"]].delete_one({"_id": counter_name})
+            started = time.perf_counter()
+            results = await asyncio.gather(*(counter_worker(size) for _ in range(workers)))
+            report(f"counter (block={size})", [n for numbers in results for n in numbers], time.perf_counter() - started)
+    finally:
+        await scratch.drop()
+        await db[COLLECTIONS["counters"]].delete_one({"_id": counter_name})
+        await database.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=50)
+    parser.add_argument("--per-worker", type=int, default=20)
+    parser.add_argument("--block", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.workers, args.per_worker, args.block))
@@ -0,0 +1,30 @@
+"""Compare the Python-side relation loader with server-side $lookup joins.
+
+Usage: python -m benchmarks.list_joins
+"""
+import asyncio
+
+import aiohttp
+
+from benchmarks.common import login, measure, print_table
+
+
+CASES = {
+    "appointments": "/api/v1/appointments/?per_page=100&include=client,pet,user,service",
+    "invoices": "/api/v1/invoices/?per_page=100&include=client,pet",
+    "pets": "/api/v1/pets/?per_page=100&include=client,species,breed,allergies,vaccinations",
+}
+
+
+async def main():
+    async with aiohttp.ClientSession() as session:
+        headers = await login(session)
+        results = {}
+        for name, path in CASES.items():
+            for mode in ("loader", "lookup"):
+                results[f"{name} [{mode}]"] = await measure(session, f"{path}&join_mode={mode}", headers)
+        print_table("List endpoint joins (per_page=100)", results)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,61 @@
+"""Measure how a burst of logins affects the latency of other endpoints.
+
+Times a cheap authenticated endpoint on its own, then again while
+`--logins` concurrent clients hammer /auth/login. With bcrypt running on the
+password hashing pool the probe latency should stay close to the baseline.
+
+Usage: python -m benchmarks.login_storm [--logins 50] [--repeat 50]
+"""
+import argparse
+import asyncio
+import time
+
+import aiohttp
+
+from benchmarks.common import BASE_URL, EMAIL, PASSWORD, login, measure, print_table, summarize
+
+
+PROBE_PATH = "/api/v1/auth/me"
+
+
+async def login_loop(session: aiohttp.ClientSession, stop: asyncio.Event, latencies: list):
+    """Log in repeatedly until told to stop."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        async with session.post(
+            f"{BASE_URL}/api/v1/auth/login",
+            json={"email": EMAIL, "password": PASSWORD}
+        ) as response:
+            await response.read()
+        latencies.append((time.perf_counter() - start) * 1000)
+
+
+async def main(logins: int, repeat: int):
+    connector = aiohttp.TCPConnector(limit=logins + 10)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        headers = await login(session)
+        results = {"probe, idle": await measure(session, PROBE_PATH, headers, repeat)}
+
+        stop = asyncio.Event()
+        login_latencies: list = []
+        storm_started = time.perf_counter()
+        storm = [asyncio.create_task(login_loop(session, stop, login_latencies)) for _ in range(logins)]
+        await asyncio.sleep(1)  # let the storm build up
+
+        results[f"probe, {logins} concurrent logins"] = await measure(session, PROBE_PATH, headers, repeat)
+
+        stop.set()
+        await asyncio.gather(*storm)
+        elapsed = time.perf_counter() - storm_started
+        results["login"] = summarize(login_latencies)
+
+        print_table("Login storm", results)
+        print(f"\nlogins completed: {len(login_latencies)} ({len(login_latencies) / elapsed:.1f}/s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.logins, args.repeat))
@@ -0,0 +1,63 @@
+"""Compare offset (page=N) pagination with keyset (cursor) pagination.
+
+For each list endpoint, times page 1, 100 and 1000 fetched with
+``?page=N`` against the same rows fetched with the cursor that ends
+page N-1. Deep pages are only as deep as the data allows; pages past the
+end of a collection are skipped.
+
+Usage: python -m benchmarks.pagination [--per-page 20] [--repeat 20]
+"""
+import argparse
+import asyncio
+
+import aiohttp
+
+import benchmarks.common as common
+from benchmarks.common import login, measure, print_table
+
+
+ENDPOINTS = {
+    "appointments": "/api/v1/appointments/",
+    "invoices": "/api/v1/invoices/",
+    "pets": "/api/v1/pets/",
+}
+PAGES = (1, 100, 1000)
+
+
+async def cursor_for_page(session: aiohttp.ClientSession, path: str, headers: dict, page: int, per_page: int):
+    """Return the cursor that continues right after page `page`, or None past the end."""
+    async with session.get(
+        f"{common.BASE_URL}{path}?page={page}&per_page={per_page}", headers=headers
+    ) as response:
+        response.raise_for_status()
+        body = await response.json()
+    return body["data"]["meta"].get("next_cursor")
+
+
+async def main(per_page: int, repeat: int):
+    results: dict = {}
+    async with aiohttp.ClientSession() as session:
+        headers = await login(session)
+        for name, path in ENDPOINTS.items():
+            for page in PAGES:
+                if page == 1:
+                    cursor_path = f"{path}?per_page={per_page}"
+                else:
+                    cursor = await cursor_for_page(session, path, headers, page - 1, per_page)
+                    if cursor is None:
+                        print(f"{name}: fewer than {page} pages, skipping")
+                        continue
+                    cursor_path = f"{path}?cursor={cursor}&per_page={per_page}"
+                results[f"{name} page={page}"] = await measure(
+                    session, f"{path}?page={page}&per_page={per_page}", headers, repeat
+                )
+                results[f"{name} cursor@{page}"] = await measure(session, cursor_path, headers, repeat)
+    print_table(f"Offset vs cursor pagination (per_page={per_page})", results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--per-page", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.per_page, args.repeat))
@@ -0,0 +1,66 @@
+"""Show which replica set member serves each read policy, and how fast.
+
+Runs ``--repeat`` small finds per read policy ("primary", "list", "export",
+"analytics") through ``database.get_collection`` / ``get_analytics_collection``
+and tallies the member each cursor was served by. Point ``MONGODB_URL`` at a
+replica set and set e.g. ``LIST_READ_PREFERENCE=secondaryPreferred`` to see
+list reads move off the primary. A throwaway local replica set:
+
+    docker run -d --name rs0 -p 27017:27017 mongo:7 --replSet rs0
+    docker exec rs0 mongosh --eval 'rs.initiate()'
+
+(add two more ``mongod --replSet rs0`` members with ``rs.add()`` for real
+secondaries; a single member only has a primary).
+
+Usage: python -m benchmarks.read_routing [--collection appointments] [--repeat 50]
+"""
+import argparse
+import asyncio
+import time
+from collections import Counter
+from typing import Dict, List
+
+from app.db.database import database, COLLECTIONS, read_preference
+from benchmarks.common import print_table, summarize
+
+
+POLICIES = ("primary", "list", "export", "analytics")
+
+
+async def main(collection_name: str, repeat: int):
+    await database.connect()
+    if not database.is_connected():
+        raise SystemExit("Database not connected")
+
+    results: Dict[str, Dict[str, float]] = {}
+    try:
+        client = database.client
+        primary = client.primary
+        print(f"primary: {primary}; secondaries: {sorted(client.secondaries) or 'none'}")
+        for policy in POLICIES:
+            if policy == "analytics":
+                collection = database.get_analytics_collection(COLLECTIONS[collection_name])
+            else:
+                collection = database.get_collection(COLLECTIONS[collection_name], read=policy)
+            served: Counter = Counter()
+            latencies: List[float] = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                cursor = collection.find({}, {"_id": 1}).limit(20)
+                await cursor.to_list(length=20)
+                latencies.append((time.perf_counter() - started) * 1000)
+                served["primary" if cursor.address == primary else "secondary"] += 1
+            print(f"{policy:<10} {read_preference(policy).document} -> {dict(served)}")
+            results[policy] = summarize(latencies)
+    finally:
+        await database.disconnect()
+
+    print_table(f"Reads by policy ({collection_name}, {repeat} finds each)", results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--collection", default="appointments", choices=sorted(COLLECTIONS))
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.collection, args.repeat))
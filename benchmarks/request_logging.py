@@ -0,0 +1,77 @@
+"""Compare request latency with debug logging against production logging.
+
+Starts the API twice on a scratch port, once with LOG_LEVEL=DEBUG and once
+with LOG_LEVEL=INFO, sends the server output to a file (as a process
+manager would) and times the same list endpoints against each instance.
+
+Usage: python -m benchmarks.request_logging [--port 8765] [--repeat 30]
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+
+import aiohttp
+
+import benchmarks.common as common
+from benchmarks.common import login, measure, print_table
+
+
+CASES = {
+    "appointments": "/api/v1/appointments/?per_page=100",
+    "invoices": "/api/v1/invoices/?per_page=100",
+    "pets": "/api/v1/pets/?per_page=100",
+}
+
+
+async def wait_until_ready(session: aiohttp.ClientSession, timeout: float = 60.0):
+    """Poll /health until the server answers."""
+    deadline = asyncio.get_running_loop().time() + timeout
+    while True:
+        try:
+            async with session.get(f"{common.BASE_URL}/health") as response:
+                if response.status == 200:
+                    return
+        except aiohttp.ClientError:
+            pass
+        if asyncio.get_running_loop().time() > deadline:
+            raise SystemExit("Server did not start in time")
+        await asyncio.sleep(0.5)
+
+
+async def run_mode(level: str, port: int, repeat: int, results: dict):
+    env = dict(os.environ, LOG_LEVEL=level)
+    with tempfile.TemporaryFile() as output:
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+            env=env, stdout=output, stderr=subprocess.STDOUT
+        )
+        try:
+            async with aiohttp.ClientSession() as session:
+                await wait_until_ready(session)
+                headers = await login(session)
+                for name, path in CASES.items():
+                    results[f"{name} [{level}]"] = await measure(session, path, headers, repeat)
+        finally:
+            server.terminate()
+            server.wait()
+        output.seek(0, os.SEEK_END)
+        print(f"{level}: {output.tell() / 1024:.1f}KB of log output")
+
+
+async def main(port: int, repeat: int):
+    common.BASE_URL = f"http://127.0.0.1:{port}"
+    results: dict = {}
+    for level in ("DEBUG", "INFO"):
+        await run_mode(level, port, repeat, results)
+    print_table("Request latency by log level (per_page=100)", results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+    asyncio.run(main(args.port, args.repeat))
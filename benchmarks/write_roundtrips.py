@@ -0,0 +1,93 @@
+"""Compare CRUD write latency with and without the read-back round trip.
+
+Creates and updates documents in a scratch collection through
+``CRUDBase``, once the previous way (``insert_one``/``update_one`` followed by
+``find_one``) and once the current way (model built from the inserted
+document, ``find_one_and_update`` for updates). The scratch collection is
+dropped afterwards.
+
+Usage: python -m benchmarks.write_roundtrips [--repeat 200]
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, List
+
+from bson import ObjectId
+
+from app.crud.species import species_crud
+from app.db.database import database
+from app.schemas.species import SpeciesCreate, SpeciesUpdate
+from benchmarks.common import print_table, summarize
+
+
+async def legacy_create(collection, obj_in: SpeciesCreate):
+    """Previous approach: insert, then read the document back."""
+    result = await collection.insert_one(species_crud.prepare_document(obj_in))
+    return species_crud.model(**await collection.find_one({"_id": result.inserted_id}))
+
+
+async def legacy_update(collection, id: str, obj_in: SpeciesUpdate):
+    """Previous approach: update, then read the document back."""
+    await collection.update_one({"_id": ObjectId(id)}, {"$set": obj_in.model_dump(exclude_unset=True)})
+    return species_crud.model(**await collection.find_one({"_id": ObjectId(id)}))
+
+
+async def timed(repeat: int, operation: Callable[[int], Awaitable]) -> Dict[str, float]:
+    latencies: List[float] = []
+    for i in range(repeat):
+        started = time.perf_counter()
+        await operation(i)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return summarize(latencies)
+
+
+async def main(repeat: int):
+    await database.connect()
+    if not database.is_connected():
+        raise SystemExit("Database not connected")
+
+    db = database.get_database()
+    scratch = db[f"bench_write_roundtrips_{uuid.uuid4().hex[:8]}"]
+    results: Dict[str, Dict[str, float]] = {}
+    try:
+        def new(i: int) -> SpeciesCreate:
+            return SpeciesCreate(name=f"bench-{i}", description="benchmark")
+
+        def change(i: int) -> SpeciesUpdate:
+            return SpeciesUpdate(description=f"updated {i}")
+
+        legacy_ids, current_ids = [], []
+        results["create: insert + find_one"] = await timed(
+            repeat, lambda i: _collect(legacy_ids, legacy_create(scratch, new(i)))
+        )
+        results["create: insert only"] = await timed(
+            repeat, lambda i: _collect(current_ids, species_crud.create(scratch, new(i)))
+        )
+        results["update: update_one + find_one"] = await timed(
+            repeat, lambda i: legacy_update(scratch, legacy_ids[i], change(i))
+        )
+        results["update: find_one_and_update"] = await timed(
+            repeat, lambda i: species_crud.update(scratch, current_ids[i], change(i))
+        )
+        results["update: changed fields only"] = await timed(
+            repeat, lambda i: species_crud.update(scratch, current_ids[i], change(i + repeat), changed_only=True)
+        )
+    finally:
+        await scratch.drop()
+        await database.disconnect()
+
+    print_table(f"CRUD write latency ({repeat} sequential writes)", results)
+
+
+async def _collect(ids: List[str], create: Awaitable):
+    model = await create
+    ids.append(str(model.id))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.repeat))
@@ -1,19 +1,36 @@
-from fastapi import FastAPI, Request
+from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from contextlib import asynccontextmanager
+import asyncio
+import atexit
 import logging
+import time
 
 from app.core.config import settings
+from app.core.logs import setup_logging, stop_logging
 from app.db.database import database
 from app.api.v1 import api_router
 from app.schemas.user import UserCreate, UserRole
 from app.crud import user_crud
 from app.db.database import COLLECTIONS
+from app.core.deps import require_metrics_access, user_cache
+from app.core.security import password_executor, token_cache
+from app.core.metrics import RequestStats, metrics, request_stats
+from app.crud.base import count_cache
+from app.api.v1.analytics import analytics_cache
+from app.services.reference_data import reference_data_cache
+from app.services.catalog_cache import catalog_cache, run_catalog_cache_job
+from app.services.schema_validation import run_validation_job
+from app.services.invoice_totals import run_reconciliation_job
+from app.services.rollups import run_rollup_job
+from app.db.migrations import run_migrations
+from app.db.indexes import ensure_indexes
 
 
 # Configure logging
-logging.basicConfig(level=logging.INFO)
+setup_logging()
+atexit.register(stop_logging)
 logger = logging.getLogger(__name__)
 
 
@@ -27,6 +44,19 @@ async def lifespan(app: FastAPI):
     
     # Only proceed with database operations if connected
     if database.is_connected():
+        if settings.run_migrations_on_startup:
+            try:
+                await run_migrations()
+            except Exception as e:
+                logger.error(f"❌ Error applying migrations: {e}")
+        
+        # After migrations, which may clean up data a unique index would reject
+        if settings.ensure_indexes_on_startup:
+            try:
+                await ensure_indexes(database.get_database())
+            except Exception as e:
+                logger.error(f"❌ Error ensuring indexes: {e}")
+        
         logger.info("✅ Database connected - proceeding with admin user setup")
         try:
             collection = database.get_collection(COLLECTIONS["users"])
@@ -53,10 +83,27 @@ async def lifespan(app: FastAPI):
         logger.warning("⚠️ Database not connected - skipping admin user setup")
         logger.info("📚 API documentation will still be available at /docs")
     
+    # Start background jobs
+    background_tasks = []
+    if settings.schema_validation_interval_minutes > 0:
+        background_tasks.append(asyncio.create_task(run_validation_job()))
+    if settings.invoice_reconcile_interval_minutes > 0:
+        background_tasks.append(asyncio.create_task(run_reconciliation_job()))
+    if settings.rollup_rebuild_interval_minutes > 0:
+        background_tasks.append(asyncio.create_task(run_rollup_job()))
+    if settings.catalog_cache_refresh_seconds > 0:
+        background_tasks.append(asyncio.create_task(run_catalog_cache_job()))
+    
     yield
     
+    # Stop background jobs
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    
     # Disconnect from database
     await database.disconnect()
+    password_executor.shutdown(wait=False, cancel_futures=True)
     logger.info("👋 DogTorVet API v2.0 shutdown complete")
 
 
@@ -77,6 +124,38 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request instrumentation
+_route_paths = {}
+
+
+def _route_path(request: Request) -> str:
+    """Get the route template for a request, e.g. /api/v1/pets/{pet_id}."""
+    endpoint = request.scope.get("endpoint")
+    if endpoint is None:
+        return "unmatched"
+    if not _route_paths:
+        _route_paths.update({route.endpoint: route.path for route in app.routes if hasattr(route, "endpoint")})
+    return _route_paths.get(endpoint, "unmatched")
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    if not settings.metrics_enabled:
+        return await call_next(request)
+
+    stats = RequestStats()
+    token = request_stats.set(stats)
+    started = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        request_stats.reset(token)
+    elapsed = time.perf_counter() - started
+
+    response.headers["Server-Timing"] = stats.server_timing(elapsed * 1000)
+    metrics.record_request(request.method, _route_path(request), response.status_code, elapsed, stats.commands)
+    return response
+
 # Include API router
 app.include_router(api_router, prefix="/api/v1")
 
@@ -111,9 +190,25 @@ async def health_check():
         "message": "DogTorVet API v2.0 is running",
         "version": settings.app_version,
         "database_connected": database.is_connected(),
-        "environment": settings.environment
+        "environment": settings.environment,
+        "user_cache": user_cache.stats(),
+        "token_cache": token_cache.stats(),
+        "analytics_cache": analytics_cache.stats(),
+        "reference_data_cache": reference_data_cache.stats(),
+        "catalog_cache": catalog_cache.stats()
     }
 
+@app.get("/metrics", response_class=PlainTextResponse, dependencies=[Depends(require_metrics_access)])
+async def prometheus_metrics():
+    return metrics.render({
+        "count": count_cache,
+        "user": user_cache,
+        "token": token_cache,
+        "analytics": analytics_cache,
+        "reference_data": reference_data_cache,
+        "catalog": catalog_cache
+    })
+
 # Run the application
 if __name__ == "__main__":
     import uvicorn
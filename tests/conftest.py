@@ -0,0 +1,48 @@
+import asyncio
+import os
+import uuid
+
+import pytest
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.db.database import database
+from app.services.catalog_cache import catalog_cache
+
+# Tests that need MongoDB run against a throwaway database on this server
+# and are skipped when it cannot be reached
+TEST_MONGODB_URL = os.environ.get("TEST_MONGODB_URL", "mongodb://localhost:27017")
+
+
+@pytest.fixture
+def with_database():
+    """Run `test(db)` in a fresh event loop against a throwaway database.
+
+    The database is wired into `app.db.database`, so services and endpoint
+    functions can be called directly, and dropped afterwards.
+    """
+    def run(test):
+        async def main():
+            client = AsyncIOMotorClient(TEST_MONGODB_URL, serverSelectionTimeoutMS=1000)
+            try:
+                await client.admin.command("ping")
+            except Exception as e:
+                client.close()
+                pytest.skip(f"MongoDB not reachable at {TEST_MONGODB_URL}: {e}")
+
+            name = f"dogtorvet_test_{uuid.uuid4().hex[:12]}"
+            database.client = client
+            database.db = database.analytics_db = client[name]
+            database.connected = True
+            catalog_cache.clear()
+            try:
+                return await test(database.db)
+            finally:
+                catalog_cache.clear()
+                await client.drop_database(name)
+                database.connected = False
+                database.client = database.db = database.analytics_db = None
+                client.close()
+
+        return asyncio.run(main())
+
+    return run
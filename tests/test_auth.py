@@ -0,0 +1,58 @@
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.api.v1.auth import logout
+from app.core.security import (
+    create_access_token,
+    create_refresh_token,
+    decode_token,
+    revoke_token,
+    revoked_tokens,
+    token_cache,
+)
+from app.db.database import COLLECTIONS
+from app.schemas.user import UserDB
+
+USER = UserDB(first_name="Test", last_name="User", email="test@example.com", password="x" * 60, role="admin")
+
+
+def bearer(token: str) -> HTTPAuthorizationCredentials:
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+def test_revocation_is_shared_through_the_database(with_database):
+    async def test(db):
+        token = create_access_token({"sub": USER.email})
+        assert (await decode_token(token))["sub"] == USER.email
+
+        assert await revoke_token(token)
+        assert await decode_token(token) is None
+        assert await db[COLLECTIONS["revoked_tokens"]].count_documents({}) == 1
+
+        # Another worker has neither the local revocation nor the cached payload
+        revoked_tokens.clear()
+        token_cache.clear()
+        assert await decode_token(token) is None
+        assert not await revoke_token("not-a-token")
+
+    with_database(test)
+
+
+def test_logout_rejects_another_users_refresh_token(with_database):
+    async def test(db):
+        access_token = create_access_token({"sub": USER.email})
+        other_refresh_token = create_refresh_token({"sub": "someone@example.com"})
+
+        with pytest.raises(HTTPException) as error:
+            await logout(bearer(access_token), other_refresh_token, current_user=USER)
+        assert error.value.status_code == 400
+        assert await decode_token(access_token) is not None
+        assert await decode_token(other_refresh_token) is not None
+
+        refresh_token = create_refresh_token({"sub": USER.email, "jti": "own"})
+        await logout(bearer(access_token), refresh_token, current_user=USER)
+        assert await decode_token(access_token) is None
+        assert await decode_token(refresh_token) is None
+
+    with_database(test)
@@ -0,0 +1,31 @@
+import asyncio
+
+from app.services.bulk_import import iter_ndjson
+
+
+def lines(*chunks):
+    async def body():
+        for chunk in chunks:
+            yield chunk
+
+    async def collect():
+        return [item async for item in iter_ndjson(body())]
+
+    return asyncio.run(collect())
+
+
+def test_lines_split_across_chunks():
+    assert lines(b'{"a": 1}\n{"b"', b': 2}\n') == [(1, b'{"a": 1}'), (2, b'{"b": 2}')]
+
+
+def test_blank_lines_are_skipped_but_counted():
+    assert lines(b'{"a": 1}\n\n  \n{"b": 2}\n') == [(1, b'{"a": 1}'), (4, b'{"b": 2}')]
+
+
+def test_last_line_without_newline():
+    assert lines(b'{"a": 1}\n', b'{"b": 2}') == [(1, b'{"a": 1}'), (2, b'{"b": 2}')]
+
+
+def test_empty_body():
+    assert lines() == []
+    assert lines(b"", b"\n") == []
@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+import app.core.cache as cache_module
+from app.core.cache import SWRCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache_module, "time", clock)
+    return clock
+
+
+def counting(values):
+    calls = []
+
+    async def compute():
+        calls.append(len(calls))
+        await asyncio.sleep(0)
+        return values[len(calls) - 1]
+
+    return compute, calls
+
+
+def test_concurrent_misses_share_one_computation(clock):
+    async def run():
+        cache = SWRCache(ttl=60, stale_ttl=60)
+        compute, calls = counting(["a"])
+        results = await asyncio.gather(*(cache.get_or_compute("k", compute) for _ in range(10)))
+        return cache, calls, results
+
+    cache, calls, results = asyncio.run(run())
+    assert results == ["a"] * 10
+    assert len(calls) == 1
+    assert cache.stats()["misses"] == 10
+
+
+def test_stale_entry_is_served_while_one_refresh_runs(clock):
+    async def run():
+        cache = SWRCache(ttl=60, stale_ttl=60)
+        compute, calls = counting(["old", "new"])
+        await cache.get_or_compute("k", compute)
+        clock.now += 61
+        stale = [await cache.get_or_compute("k", compute) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        return stale, await cache.get_or_compute("k", compute), calls, cache
+
+    stale, fresh, calls, cache = asyncio.run(run())
+    assert stale == ["old"] * 3
+    assert fresh == "new"
+    assert len(calls) == 2
+    assert cache.stats()["stale_hits"] == 3
+
+
+def test_expired_entry_is_recomputed(clock):
+    async def run():
+        cache = SWRCache(ttl=60, stale_ttl=60)
+        compute, calls = counting(["old", "new"])
+        await cache.get_or_compute("k", compute)
+        clock.now += 121
+        return await cache.get_or_compute("k", compute)
+
+    assert asyncio.run(run()) == "new"
+
+
+def test_failures_are_not_cached(clock):
+    async def run():
+        cache = SWRCache(ttl=60, stale_ttl=60)
+        attempts = []
+
+        async def compute():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise RuntimeError("boom")
+            return "ok"
+
+        with pytest.raises(RuntimeError):
+            await cache.get_or_compute("k", compute)
+        return await cache.get_or_compute("k", compute), len(cache)
+
+    assert asyncio.run(run()) == ("ok", 1)
+
+
+def test_zero_ttl_bypasses_the_cache(clock):
+    async def run():
+        cache = SWRCache(ttl=0)
+        compute, calls = counting(["a", "b"])
+        return [await cache.get_or_compute("k", compute) for _ in range(2)], len(cache)
+
+    assert asyncio.run(run()) == (["a", "b"], 0)
@@ -0,0 +1,28 @@
+from bson import ObjectId
+
+from app.db.database import COLLECTIONS
+from app.services.catalog_cache import catalog_cache
+
+
+def test_lookups_read_through_documents_written_after_load(with_database):
+    async def test(db):
+        species = db[COLLECTIONS["species"]]
+        dog, cat, bird = ObjectId(), ObjectId(), ObjectId()
+        await species.insert_one({"_id": dog, "name": "Dog", "status": True})
+        assert (await catalog_cache.get("species", dog))["name"] == "Dog"
+
+        # Written by another process after the catalog was loaded
+        await species.insert_many([
+            {"_id": cat, "name": "Cat", "status": True},
+            {"_id": bird, "name": "Bird", "status": True},
+        ])
+        assert (await catalog_cache.get("species", str(cat)))["name"] == "Cat"
+        assert set(await catalog_cache.get_many("species", [dog, bird, ObjectId()])) == {dog, bird}
+        assert (await catalog_cache.get_by_name("species", "Bird"))["_id"] == bird
+
+        # Documents read through are kept
+        await species.delete_many({"_id": {"$in": [cat, bird]}})
+        assert (await catalog_cache.get("species", cat))["name"] == "Cat"
+        assert await catalog_cache.get("species", ObjectId()) is None
+
+    with_database(test)
@@ -0,0 +1,43 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+import app.services.counters as counters
+from app.db.database import COLLECTIONS
+from app.services.counters import allocate, allocate_invoice_numbers, invoice_number_prefix
+
+
+def test_invoice_number_prefix_is_per_month():
+    assert invoice_number_prefix(datetime(2024, 5, 31)) == "INV-002405"
+    assert invoice_number_prefix(datetime(2024, 6, 1)) == "INV-002406"
+
+
+def test_allocate_rejects_empty_blocks():
+    with pytest.raises(ValueError):
+        asyncio.run(allocate("invoices", 0))
+
+
+def test_concurrent_allocations_continue_from_existing_invoices(with_database, monkeypatch):
+    monkeypatch.setattr(counters, "_seeded", set())
+    now = datetime(2024, 5, 15)
+    prefix = invoice_number_prefix(now)
+
+    async def test(db):
+        await db[COLLECTIONS["invoices"]].insert_many([
+            {"invoice_number": f"{prefix}999"},
+            {"invoice_number": f"{prefix}1000"},
+            {"invoice_number": "INV-002404050"},
+            {"invoice_number": None},
+        ])
+        blocks = await asyncio.gather(
+            *(allocate_invoice_numbers(1, now) for _ in range(20)),
+            allocate_invoice_numbers(5, now)
+        )
+
+        numbers = [number for block in blocks for number in block]
+        assert sorted(int(number[len(prefix):]) for number in numbers) == list(range(1001, 1026))
+        block = [int(number[len(prefix):]) for number in blocks[-1]]
+        assert block == list(range(block[0], block[0] + 5))
+
+    with_database(test)
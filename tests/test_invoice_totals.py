@@ -0,0 +1,81 @@
+from datetime import datetime
+
+from bson import ObjectId
+
+from app.api.v1.invoice_items import create_invoice_item, delete_invoice_item, update_invoice_item
+from app.api.v1.invoices import create_invoice
+from app.db.database import COLLECTIONS
+from app.schemas.invoice import InvoiceCreate, InvoiceItemCreate, InvoiceItemUpdate
+from app.schemas.user import UserDB
+from app.services.invoice_totals import item_net_price, reconcile_invoice_totals
+from app.services.rollups import day_key, record_revenue_delta
+
+USER = UserDB(first_name="Test", last_name="User", email="test@example.com", password="x" * 60, role="admin")
+
+
+def item(invoice_id: str, unit_price: float, quantity: int = 1, discount_percent: float = 0.0) -> InvoiceItemCreate:
+    return InvoiceItemCreate(
+        invoice_id=invoice_id, item_type="product", item_name="Food", unit_price=unit_price,
+        quantity=quantity, discount_percent=discount_percent, net_price=unit_price * quantity
+    )
+
+
+async def new_invoice(**fields) -> dict:
+    response = await create_invoice(
+        InvoiceCreate(client_id=str(ObjectId()), invoice_date=datetime.utcnow().isoformat(), **fields),
+        current_user=USER
+    )
+    return response.data
+
+
+def test_item_net_price_applies_quantity_and_discount():
+    assert item_net_price({"unit_price": 20, "quantity": 3, "discount_percent": 50}) == 30
+    assert item_net_price(item("x", 12.5, quantity=2)) == 25
+    assert item_net_price({}) == 0
+
+
+def test_item_writes_shift_invoice_totals(with_database):
+    async def test(db):
+        invoice_id = (await new_invoice(discount_percent=10))["id"]
+        invoices = db[COLLECTIONS["invoices"]]
+
+        first = await create_invoice_item(item(invoice_id, 50.0, quantity=2), current_user=USER)
+        second = await create_invoice_item(item(invoice_id, 40.0, discount_percent=25), current_user=USER)
+        invoice = await invoices.find_one({"_id": ObjectId(invoice_id)})
+        assert (invoice["subtotal"], invoice["discount_amount"], invoice["total"]) == (130.0, 13.0, 117.0)
+
+        await update_invoice_item(first.data["id"], InvoiceItemUpdate(quantity=1), current_user=USER)
+        await delete_invoice_item(second.data["id"], current_user=USER)
+        invoice = await invoices.find_one({"_id": ObjectId(invoice_id)})
+        assert (invoice["subtotal"], invoice["total"]) == (50.0, 45.0)
+
+    with_database(test)
+
+
+def test_reconcile_repairs_drifted_and_itemless_invoices(with_database):
+    async def test(db):
+        invoices = db[COLLECTIONS["invoices"]]
+        drifted = (await new_invoice())["id"]
+        emptied = (await new_invoice())["id"]
+        embedded = (await new_invoice(items=[item("pending", 15.0)]))["id"]
+        await create_invoice_item(item(drifted, 20.0), current_user=USER)
+        removed = await create_invoice_item(item(emptied, 30.0), current_user=USER)
+        await db[COLLECTIONS["invoice_items"]].delete_one({"_id": ObjectId(removed.data["id"])})
+        # Drift the stored totals (and the revenue counted for them)
+        await invoices.update_one({"_id": ObjectId(drifted)}, {"$set": {"subtotal": 99.0, "total": 99.0}})
+        await record_revenue_delta(datetime.utcnow(), 79.0)
+
+        result = await reconcile_invoice_totals()
+
+        assert result["fixed"] == 2
+        totals = {
+            str(invoice["_id"]): (invoice["subtotal"], invoice["total"])
+            async for invoice in invoices.find({})
+        }
+        assert totals == {drifted: (20.0, 20.0), emptied: (0.0, 0.0), embedded: (15.0, 15.0)}
+        # Revenue follows the repaired subtotals: 20 + 0 + 15
+        rollup = await db[COLLECTIONS["daily_rollups"]].find_one({"_id": day_key(datetime.utcnow())})
+        assert rollup["revenue"] == 35.0
+        assert (await reconcile_invoice_totals())["fixed"] == 0
+
+    with_database(test)
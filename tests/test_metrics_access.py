@@ -0,0 +1,46 @@
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from fastapi.testclient import TestClient
+
+import main
+from app.core.config import settings
+from app.core.deps import require_metrics_access, user_cache
+from app.core.security import create_access_token
+from app.db.database import COLLECTIONS
+
+
+@pytest.fixture
+def metrics_token(monkeypatch):
+    monkeypatch.setattr(settings, "metrics_token", "scrape-secret")
+    return "scrape-secret"
+
+
+def test_metrics_need_credentials(metrics_token):
+    client = TestClient(main.app)
+
+    assert client.get("/metrics").status_code == 401
+    response = client.get("/metrics", headers={"Authorization": f"Bearer {metrics_token}"})
+    assert response.status_code == 200
+    assert "# TYPE" in response.text
+
+
+def test_metrics_allow_admins_only(with_database, metrics_token):
+    async def test(db):
+        await db[COLLECTIONS["users"]].insert_many([
+            {"first_name": "A", "last_name": "Admin", "email": "admin@example.com", "password": "x" * 60,
+             "role": "admin", "status": True},
+            {"first_name": "V", "last_name": "Vet", "email": "vet@example.com", "password": "x" * 60,
+             "role": "vet", "status": True},
+        ])
+        user_cache.clear()
+
+        def bearer(email: str) -> HTTPAuthorizationCredentials:
+            return HTTPAuthorizationCredentials(scheme="Bearer", credentials=create_access_token({"sub": email}))
+
+        await require_metrics_access(bearer("admin@example.com"))
+        with pytest.raises(HTTPException) as error:
+            await require_metrics_access(bearer("vet@example.com"))
+        assert error.value.status_code == 403
+
+    with_database(test)
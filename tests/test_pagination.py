@@ -0,0 +1,145 @@
+import base64
+from datetime import datetime
+
+import pytest
+from bson import ObjectId, json_util
+from starlette.datastructures import QueryParams
+
+from app.services.pagination import (
+    InvalidCursor,
+    InvalidSort,
+    PageRequest,
+    decode_cursor,
+    encode_cursor,
+    keyset_filter,
+)
+
+
+def token(payload) -> str:
+    return base64.urlsafe_b64encode(json_util.dumps(payload).encode()).decode().rstrip("=")
+
+
+def test_cursor_round_trip():
+    id = ObjectId()
+    value = datetime(2025, 1, 4, 9, 30)
+    assert decode_cursor(encode_cursor("appointment_date", -1, value, id)) == ("appointment_date", -1, value, id)
+
+
+def test_cursor_round_trip_null_value():
+    id = ObjectId()
+    assert decode_cursor(encode_cursor("total", 1, None, id)) == ("total", 1, None, id)
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    base64.urlsafe_b64encode(b"not json").decode(),
+    base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+    token({"f": "total", "d": 1, "v": 1}),
+    token(["total", 1, 1]),
+    token({"f": "total", "d": 2, "v": 1, "id": ObjectId()}),
+    token({"f": 5, "d": 1, "v": 1, "id": ObjectId()}),
+    token({"f": "", "d": 1, "v": 1, "id": ObjectId()}),
+])
+def test_malformed_cursor(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor)
+
+
+@pytest.mark.parametrize("payload", [
+    {"f": "$where", "d": 1, "v": "sleep(100) || true", "id": ObjectId()},
+    {"f": "total", "d": 1, "v": {"$gt": 0}, "id": ObjectId()},
+    {"f": "total", "d": 1, "v": [1, 2], "id": ObjectId()},
+    {"f": "total", "d": 1, "v": 1, "id": {"$exists": True}},
+    {"f": "total", "d": 1, "v": 1, "id": "5f1d7f0e2c3b4a5d6e7f8091"},
+])
+def test_cursor_rejects_operators_and_bad_ids(payload):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(token(payload))
+
+
+def test_keyset_filter_on_id():
+    id = ObjectId()
+    assert keyset_filter("_id", 1, id, id) == {"_id": {"$gt": id}}
+    assert keyset_filter("_id", -1, id, id) == {"_id": {"$lt": id}}
+
+
+def test_keyset_filter_ascending():
+    id = ObjectId()
+    assert keyset_filter("total", 1, 10, id) == {"$or": [
+        {"total": {"$gt": 10}},
+        {"total": 10, "_id": {"$gt": id}},
+    ]}
+
+
+def test_keyset_filter_descending_includes_nulls():
+    id = ObjectId()
+    assert keyset_filter("total", -1, 10, id) == {"$or": [
+        {"total": {"$lt": 10}},
+        {"total": 10, "_id": {"$lt": id}},
+        {"total": None},
+    ]}
+
+
+def test_keyset_filter_null_ascending_continues_into_values():
+    id = ObjectId()
+    assert keyset_filter("total", 1, None, id) == {"$or": [
+        {"total": None, "_id": {"$gt": id}},
+        {"total": {"$ne": None}},
+    ]}
+
+
+def test_keyset_filter_null_descending_stays_in_nulls():
+    id = ObjectId()
+    assert keyset_filter("total", -1, None, id) == {"total": None, "_id": {"$lt": id}}
+
+
+def test_page_request_rejects_unknown_sort_field():
+    with pytest.raises(InvalidSort):
+        PageRequest(1, 10, "password", 1, sortable=("invoice_date", "total"))
+
+
+def test_page_request_rejects_cursor_for_other_field():
+    cursor = encode_cursor("password", 1, "x", ObjectId())
+    with pytest.raises(InvalidCursor):
+        PageRequest(1, 10, "invoice_date", -1, cursor, sortable=("invoice_date", "total"))
+
+
+def test_page_request_defaults_to_its_own_sort_field():
+    with pytest.raises(InvalidCursor):
+        PageRequest(1, 10, "_id", 1, encode_cursor("name", 1, "Rex", ObjectId()))
+
+
+def test_page_request_cursor_sets_sort_and_filter():
+    id = ObjectId()
+    paging = PageRequest(3, 10, "invoice_date", -1, encode_cursor("total", 1, 5, id), ("invoice_date", "total"))
+    assert paging.is_cursor and paging.skip == 0
+    assert paging.sort == [("total", 1), ("_id", 1)]
+    assert paging.apply({"status": True}) == {"$and": [{"status": True}, keyset_filter("total", 1, 5, id)]}
+
+
+def test_page_request_split_returns_next_cursor():
+    paging = PageRequest(1, 2, "total", 1)
+    rows = [{"_id": ObjectId(), "total": n} for n in (1, 2, 3)]
+    page, next_cursor = paging.split(rows)
+    assert page == rows[:2]
+    assert decode_cursor(next_cursor) == ("total", 1, 2, rows[1]["_id"])
+    assert paging.split(rows[:2]) == (rows[:2], None)
+
+
+def test_links_carry_filters_but_not_paging_params():
+    paging = PageRequest(2, 10, "invoice_date", -1)
+    params = QueryParams("client_id=abc&page=2&per_page=10&date_from=2024-01-01&sort_by=total")
+    links = paging.links("/api/v1/invoices", 35, "tok", params)
+    assert links == {
+        "first": "/api/v1/invoices?page=1&per_page=10&client_id=abc&date_from=2024-01-01&sort_by=total",
+        "last": "/api/v1/invoices?page=4&per_page=10&client_id=abc&date_from=2024-01-01&sort_by=total",
+        "prev": "/api/v1/invoices?page=1&per_page=10&client_id=abc&date_from=2024-01-01&sort_by=total",
+        "next": "/api/v1/invoices?cursor=tok&per_page=10&client_id=abc&date_from=2024-01-01&sort_by=total",
+    }
+
+
+def test_cursor_links_keep_filters():
+    cursor = encode_cursor("_id", 1, None, ObjectId())
+    links = PageRequest(1, 5, "_id", 1, cursor).links("/api/v1/pets", None, "next", {"cursor": cursor, "status": "active"})
+    assert links["next"] == "/api/v1/pets?cursor=next&per_page=5&status=active"
+    assert links["last"] is None and links["prev"] is None
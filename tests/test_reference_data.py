@@ -0,0 +1,27 @@
+import pytest
+
+from app.services.reference_data import etag_for, etag_matches
+
+
+ETAG = '"rd1-3-0-1-0-2-0"'
+
+
+@pytest.mark.parametrize("header, matches", [
+    (None, False),
+    ("", False),
+    (ETAG, True),
+    (f"W/{ETAG}", True),
+    (f'"other", {ETAG}', True),
+    (f'"other",W/{ETAG}', True),
+    ("*", True),
+    ('"rd1-3-0-1-0-2-1"', False),
+    (ETAG.strip('"'), False),
+])
+def test_etag_matches(header, matches):
+    assert etag_matches(header, ETAG) is matches
+
+
+def test_etag_changes_with_any_version():
+    versions = {"species": 3, "allergies": 1}
+    assert etag_for(versions) != etag_for({**versions, "products": 1})
+    assert etag_for(versions) == etag_for(dict(versions))
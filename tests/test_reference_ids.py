@@ -0,0 +1,51 @@
+from datetime import datetime
+
+from bson import ObjectId
+
+from app.crud.appointment import appointment_crud
+from app.db.database import COLLECTIONS
+from app.db.migrations import run_migrations
+from app.schemas.appointment import AppointmentDB
+from app.schemas.pet import PetDB
+
+
+def test_stored_object_id_references_read_as_strings():
+    pet_id, allergy_id, vaccination_id = ObjectId(), ObjectId(), ObjectId()
+    appointment = AppointmentDB(
+        pet_id=pet_id, client_id=ObjectId(), veterinarian_id=ObjectId(), service_id=str(ObjectId()),
+        appointment_date=datetime(2024, 5, 1)
+    )
+    pet = PetDB(
+        name="Rex", dob="2020-01-01", weight=10, species_id=ObjectId(), client_id=ObjectId(),
+        allergies=[allergy_id], vaccinations=[{"vaccination_id": vaccination_id, "date": "2024-05-01"}]
+    )
+
+    assert appointment.pet_id == str(pet_id)
+    assert pet.allergies == [str(allergy_id)]
+    assert pet.vaccinations[0]["vaccination_id"] == str(vaccination_id)
+
+
+def test_migrations_normalize_references_and_crud_reads_them(with_database):
+    async def test(db):
+        client_id, pet_id, vet_id, allergy_id = (str(ObjectId()) for _ in range(4))
+        await db[COLLECTIONS["appointments"]].insert_one({
+            "pet_id": pet_id, "client_id": client_id, "veterinarian_id": vet_id,
+            "service_id": str(ObjectId()), "appointment_date": datetime(2024, 5, 1), "status": True
+        })
+        await db[COLLECTIONS["vaccinations"]].insert_one({"pet_id": pet_id, "vet_id": vet_id})
+        await db[COLLECTIONS["pets"]].insert_one({
+            "_id": ObjectId(pet_id), "allergies": [allergy_id], "vaccinations": [{"vaccination_id": allergy_id}]
+        })
+
+        await run_migrations(db)
+
+        vaccination = await db[COLLECTIONS["vaccinations"]].find_one({})
+        pet = await db[COLLECTIONS["pets"]].find_one({})
+        assert vaccination["pet_id"] == ObjectId(pet_id) and vaccination["vet_id"] == ObjectId(vet_id)
+        assert pet["allergies"] == [ObjectId(allergy_id)]
+        assert pet["vaccinations"] == [{"vaccination_id": ObjectId(allergy_id)}]
+
+        appointments = await appointment_crud.get_by_client(db[COLLECTIONS["appointments"]], client_id)
+        assert [appointment.pet_id for appointment in appointments] == [pet_id]
+
+    with_database(test)
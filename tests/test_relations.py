@@ -0,0 +1,80 @@
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from app.core.config import settings
+from app.db.database import COLLECTIONS
+from app.services.relation_loader import RelationLoader
+from app.services.relations import (
+    InvalidJoinMode,
+    build_list_pipeline,
+    relation_fields,
+    resolve_join_mode,
+    run_list_query,
+)
+
+
+def test_resolve_join_mode(monkeypatch):
+    monkeypatch.setattr(settings, "list_join_mode", "lookup")
+    assert resolve_join_mode(None) == "lookup"
+    assert resolve_join_mode("loader") == "loader"
+    with pytest.raises(InvalidJoinMode):
+        resolve_join_mode("facet")
+
+
+def test_list_pipeline_pages_before_joining():
+    pipeline = build_list_pipeline(
+        "invoices", {"status": True}, [("invoice_date", -1), ("_id", -1)], 20, 10,
+        ["pet", "unknown", "client"], {"client_id": 1, "pet_id": 1}
+    )
+
+    assert [next(iter(stage)) for stage in pipeline] == [
+        "$match", "$sort", "$skip", "$limit", "$project", "$lookup", "$lookup"
+    ]
+    assert pipeline[1] == {"$sort": {"invoice_date": -1, "_id": -1}}
+    assert [stage["$lookup"]["from"] for stage in pipeline[5:]] == ["pets", "clients"]
+    # The pet's species is joined inside the pet lookup
+    assert pipeline[5]["$lookup"]["pipeline"][1]["$lookup"]["from"] == "species"
+
+
+def test_relation_fields_are_top_level():
+    assert relation_fields("pets", ["species", "vaccinations", "owner"]) == ["species_id", "vaccinations"]
+
+
+def test_lookup_joins_string_and_object_id_references(with_database):
+    async def test(db):
+        client_id, pet_id, species_id = ObjectId(), ObjectId(), ObjectId()
+        allergy_ids = [ObjectId(), ObjectId()]
+        await db[COLLECTIONS["clients"]].insert_one({"_id": client_id, "name": "Jane"})
+        await db[COLLECTIONS["species"]].insert_one({"_id": species_id, "name": "Dog"})
+        await db[COLLECTIONS["allergies"]].insert_many([{"_id": oid, "name": "Pollen"} for oid in allergy_ids])
+        await db[COLLECTIONS["pets"]].insert_one({
+            "_id": pet_id, "name": "Rex", "species_id": str(species_id), "client_id": client_id,
+            "allergies": [str(allergy_ids[0]), allergy_ids[1]], "status": True
+        })
+        await db[COLLECTIONS["appointments"]].insert_many([
+            {"client_id": client_id, "pet_id": str(pet_id), "appointment_date": datetime(2024, 5, 1), "status": True},
+            {"client_id": ObjectId(), "pet_id": None, "appointment_date": datetime(2024, 5, 2), "status": True},
+        ])
+
+        loader = RelationLoader()
+        appointments, total = await run_list_query(
+            db[COLLECTIONS["appointments"]], "appointments", {"status": True}, [("appointment_date", 1)],
+            0, 10, ["client", "pet"], loader
+        )
+        assert total == 2
+        assert all(not key.startswith("_rel_") for row in appointments for key in row)
+        assert loader.get("clients", client_id)["name"] == "Jane"
+        assert loader.get("pets", pet_id)["name"] == "Rex"
+        assert loader.get("species", species_id)["name"] == "Dog"
+
+        loader = RelationLoader()
+        pets, total = await run_list_query(
+            db[COLLECTIONS["pets"]], "pets", {"status": True}, [("_id", 1)], 0, 10, ["allergies"], loader,
+            count=False
+        )
+        assert total is None and len(pets) == 1
+        assert all(loader.get("allergies", oid) for oid in allergy_ids)
+
+    with_database(test)
@@ -0,0 +1,55 @@
+from datetime import datetime
+
+from bson import ObjectId
+
+from app.api.v1.invoice_items import create_invoice_item, update_invoice_item
+from app.api.v1.invoices import create_invoice
+from app.db.database import COLLECTIONS
+from app.schemas.invoice import InvoiceCreate, InvoiceItemCreate, InvoiceItemUpdate
+from app.schemas.user import UserDB
+from app.services.rollups import _appointment_fields, day_key, rebuild_rollups
+
+USER = UserDB(first_name="Test", last_name="User", email="test@example.com", password="x" * 60, role="admin")
+
+
+def item(invoice_id: str, net_price: float, **extra) -> InvoiceItemCreate:
+    return InvoiceItemCreate(
+        invoice_id=invoice_id, item_type="service", item_name="Consultation",
+        unit_price=net_price, quantity=1, net_price=net_price, **extra
+    )
+
+
+def test_appointment_fields_skip_inactive_appointments():
+    appointment = {"appointment_date": datetime(2024, 5, 1), "appointment_status": "completed"}
+
+    assert _appointment_fields(appointment) == {"2024-05-01": {
+        "appointments.total": 1, "appointments.by_status.completed": 1
+    }}
+    assert _appointment_fields({**appointment, "status": False}) == {}
+    assert _appointment_fields(None) == {}
+
+
+def test_incremental_revenue_matches_rebuild(with_database):
+    async def test(db):
+        now = datetime.utcnow()
+        # Subtotal from embedded items, then from separately added and edited items
+        await create_invoice(InvoiceCreate(
+            client_id=str(ObjectId()), invoice_date=now.isoformat(),
+            items=[item("pending", 40.0), item("pending", 12.5)]
+        ), current_user=USER)
+        created = await create_invoice(
+            InvoiceCreate(client_id=str(ObjectId()), invoice_date=now.isoformat()), current_user=USER
+        )
+        invoice_id = created.data["id"]
+        added = await create_invoice_item(item(invoice_id, 30.0), current_user=USER)
+        await update_invoice_item(added.data["id"], InvoiceItemUpdate(unit_price=25.0, net_price=25.0), current_user=USER)
+
+        rollups = db[COLLECTIONS["daily_rollups"]]
+        incremental = await rollups.find_one({"_id": day_key(now)})
+        await rebuild_rollups(now, now, include_today=True)
+        rebuilt = await rollups.find_one({"_id": day_key(now)})
+
+        assert incremental["invoices"] == rebuilt["invoices"] == 2
+        assert incremental["revenue"] == rebuilt["revenue"] == 77.5
+
+    with_database(test)
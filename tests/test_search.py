@@ -0,0 +1,45 @@
+from datetime import datetime
+
+from bson import ObjectId
+
+from app.api.v1.invoices import create_invoice
+from app.db.database import COLLECTIONS
+from app.schemas.invoice import InvoiceCreate
+from app.schemas.user import UserDB
+from app.services.search import invoice_search_text, refresh_invoice_search, search_filter
+
+USER = UserDB(first_name="Test", last_name="User", email="test@example.com", password="x" * 60, role="admin")
+
+
+def test_search_text_is_normalized_per_field():
+    assert invoice_search_text("INV-002405001", " Jane Doe ", None) == "inv-002405001\njane doe\n"
+
+
+def test_search_filter_matches_literal_substrings():
+    assert search_filter(" Doe (Jr.) ") == {"search_text": {"$regex": r"doe\ \(jr\.\)"}}
+
+
+def test_invoices_are_found_by_client_and_pet_names(with_database):
+    async def test(db):
+        client_id, pet_id = ObjectId(), ObjectId()
+        await db[COLLECTIONS["clients"]].insert_one({"_id": client_id, "name": "Jane Doe"})
+        await db[COLLECTIONS["pets"]].insert_one({"_id": pet_id, "name": "Rex"})
+        created = await create_invoice(InvoiceCreate(
+            client_id=str(client_id), pet_id=str(pet_id), invoice_date=datetime.utcnow().isoformat()
+        ), current_user=USER)
+        invoices = db[COLLECTIONS["invoices"]]
+
+        async def search(term: str):
+            return [str(invoice["_id"]) async for invoice in invoices.find(search_filter(term))]
+
+        assert await search("jane") == await search("REX") == [created.data["id"]]
+        assert await search(created.data["invoice_number"].lower()) == [created.data["id"]]
+        # Terms do not match across fields
+        assert await search("doe rex") == []
+
+        await db[COLLECTIONS["clients"]].update_one({"_id": client_id}, {"$set": {"name": "Jane Smith"}})
+        assert await refresh_invoice_search({"client_id": client_id}) == 1
+        assert await search("doe") == []
+        assert await search("smith") == [created.data["id"]]
+
+    with_database(test)